@@ -0,0 +1,282 @@
+"""
+Lug'at va saqlash qismining asosiy yo'llari uchun mikrobenchmarklar.
+
+    python benchmarks/bench.py --users 50 --words 5000
+    python benchmarks/bench.py --backend sqlite --output results.json
+    python benchmarks/bench.py --save-baseline
+
+Natijalar (ops/s, kechikish percentillari, eng katta RSS) JSON ga yoziladi va
+benchmarks/baseline.json bilan solishtiriladi. Sekinlashuv chegaradan oshsa
+chiqish kodi 1 bo'ladi. Tarjima tarmoqsiz (soxta funksiya) bajariladi
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import string
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'main')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Baseline bilan solishtirish: ops/s shuncha foizdan ko'p tushsa - regressiya
+DEFAULT_THRESHOLD = 25.0
+
+
+def random_word(rng, length):
+    return ''.join(rng.choices(string.ascii_lowercase, k=length))
+
+
+def generate_catalog(rng, count):
+    """
+    Takrorlanmaydigan soxta so'zlar (so'z, tarjima, misol)
+    """
+    words = set()
+    while len(words) < count:
+        words.add(random_word(rng, rng.randint(4, 10)))
+    return [
+        {'word': word, 'translation': word[::-1], 'example': f"I use {word} every day."}
+        for word in sorted(words)
+    ]
+
+
+# Telegram obyektlari o'rniga oddiy soxta update (handlerlarni to'g'ridan-to'g'ri chaqirish uchun)
+def fake_update(user_id):
+    async def noop(*args, **kwargs):
+        return None
+
+    query = SimpleNamespace(
+        from_user=SimpleNamespace(id=user_id),
+        data='',
+        answer=noop,
+        edit_message_text=noop,
+    )
+    return SimpleNamespace(callback_query=query, effective_user=query.from_user)
+
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def measure(name, operation, repeat, results, rounds):
+    """
+    operation() ni repeat marta bajarish (rounds marta) - eng tez raund natijasi
+    yoziladi, shunda boshqa jarayonlar ta'siri kamayadi
+    """
+    best = None
+    for round_number in range(rounds):
+        samples = []
+        started = time.perf_counter()
+        for n in range(round_number * repeat, (round_number + 1) * repeat):
+            t = time.perf_counter()
+            operation(n)
+            samples.append(time.perf_counter() - t)
+        total = time.perf_counter() - started
+        if best is None or total < best[0]:
+            best = (total, sorted(samples))
+
+    total, samples = best
+    results[name] = {
+        'ops': repeat,
+        'ops_per_sec': round(repeat / total, 1),
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 4),
+        'p95_ms': round(percentile(samples, 0.95) * 1000, 4),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 4),
+    }
+    print(f"  {name:<28} {results[name]['ops_per_sec']:>12} ops/s   "
+          f"p50 {results[name]['p50_ms']:.3f} ms   p99 {results[name]['p99_ms']:.3f} ms")
+
+
+def run_benchmarks(users, words, repeat, rounds, seed):
+    rng = random.Random(seed)
+    import main
+    import translation
+
+    # Tarjima - tarmoqsiz
+    async def fake_translate(word, source_lang='en', target_lang='uz', user_id=None):
+        return word[::-1]
+
+    main.translate_word = fake_translate
+    translation.translate_word = fake_translate
+
+    loop = asyncio.new_event_loop()
+    run = loop.run_until_complete
+    results = {}
+
+    # Ma'lumotlar: katalog + har bir foydalanuvchining progressi
+    t = time.perf_counter()
+    main.add_words_to_vocabulary(generate_catalog(rng, words))
+    user_ids = list(range(1, users + 1))
+    for user_id in user_ids:
+        vocab = main.load_user_vocabulary(user_id)
+        for i in rng.sample(range(len(vocab)), min(len(vocab), 200)):
+            main.record_review(user_id, vocab.word_id(i), rng.choice((1, 3, 4)))
+        main.user_data[user_id] = {
+            'test_mode': False, 'test_words': [], 'words_to_learn': [],
+            'current_word_index': 0, 'correct_answers': 0,
+        }
+    main.user_cache.flush()
+    print(f"  tayyorlash: {users} foydalanuvchi x {words} so'z, {time.perf_counter() - t:.2f} s")
+
+    def cold_load(n):
+        user_id = user_ids[n % users]
+        main.user_cache.invalidate(user_id)
+        main.load_user_vocabulary(user_id)
+
+    def warm_load(n):
+        main.load_user_vocabulary(user_ids[n % users])
+
+    def save(n):
+        user_id = user_ids[n % users]
+        vocab = main.load_user_vocabulary(user_id)
+        main.record_review(user_id, vocab.word_id(n % len(vocab)), 4)
+        main.save_user_vocabulary(user_id, vocab)
+        main.user_cache.flush()
+
+    def add_word(n):
+        run(main.add_word_to_vocabulary(f"benchword{n}x", user_id=user_ids[0]))
+
+    def add_word_fanout(n):
+        # Yangi so'z barcha (keshdagi) foydalanuvchilarga ko'rinishi kerak
+        run(main.add_word_to_vocabulary(f"fanoutword{n}x", user_id=user_ids[0]))
+        for user_id in user_ids:
+            main.load_user_vocabulary(user_id)
+
+    def delete_word(n):
+        user_id = user_ids[n % users]
+        vocab = main.load_user_vocabulary(user_id)
+        main.delete_user_word(user_id, vocab.word(vocab.nth_active(n % 100)))
+
+    def stats(n):
+        run(main.show_stats(fake_update(user_ids[n % users]), None))
+
+    def quiz(n):
+        update = fake_update(user_ids[n % users])
+        run(main.start_test(update, None))
+        session = main.user_data[update.callback_query.from_user.id]
+        while session['current_word_index'] < len(session['test_words']):
+            session['current_word_index'] += 1
+            run(main.show_next_test_question(update, None))
+
+    measure('load_user_vocabulary_cold', cold_load, max(1, repeat // 10), results, rounds)
+    measure('load_user_vocabulary_warm', warm_load, repeat * 10, results, rounds)
+    measure('save_user_vocabulary', save, max(1, repeat // 10), results, rounds)
+    measure('add_word_to_vocabulary', add_word, max(1, repeat // 10), results, rounds)
+    measure('add_word_fanout', add_word_fanout, max(1, repeat // 20), results, rounds)
+    measure('delete_user_word', delete_word, repeat, results, rounds)
+    measure('show_stats', stats, repeat, results, rounds)
+    measure('quiz', quiz, repeat, results, rounds)
+
+    run(main.on_shutdown(None))
+    loop.close()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Baseline dan sekinlashgan benchmarklar ro'yxati
+    """
+    regressions = []
+    for name, current in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if not previous:
+            continue
+        change = (current['ops_per_sec'] - previous['ops_per_sec']) / previous['ops_per_sec'] * 100
+        marker = ''
+        if change < -threshold:
+            regressions.append(name)
+            marker = '  <-- REGRESSIYA'
+        print(f"  {name:<28} {previous['ops_per_sec']:>12} -> {current['ops_per_sec']:>12} ops/s "
+              f"({change:+.1f}%){marker}")
+
+    previous_rss = baseline.get('peak_rss_mb')
+    if previous_rss:
+        change = (results['peak_rss_mb'] - previous_rss) / previous_rss * 100
+        marker = ''
+        if change > threshold:
+            regressions.append('peak_rss_mb')
+            marker = '  <-- REGRESSIYA'
+        print(f"  {'peak_rss_mb':<28} {previous_rss:>12} -> {results['peak_rss_mb']:>12} MB    ({change:+.1f}%){marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lug'at va saqlash benchmarklari")
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--words', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--backend', choices=['file', 'sqlite'], default='file')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="ruxsat etilgan sekinlashuv, foizda")
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+    baseline_file = os.path.abspath(args.baseline)
+
+    # Har bir ishga tushirish bo'sh vaqtinchalik papkada (bot fayllari nisbiy yo'llarda)
+    workdir = tempfile.mkdtemp(prefix='lugat-bench-')
+    os.chdir(workdir)
+    os.environ['STORAGE_BACKEND'] = args.backend
+    os.environ.setdefault('token', 'bench')
+    sys.path.insert(0, MAIN_DIR)
+
+    try:
+        print(f"⏱ Benchmark ({args.backend}):")
+        benchmarks = run_benchmarks(args.users, args.words, args.repeat, args.rounds, args.seed)
+    finally:
+        os.chdir(BENCH_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        'params': {'users': args.users, 'words': args.words, 'repeat': args.repeat, 'rounds': args.rounds,
+                   'seed': args.seed, 'backend': args.backend},
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        # Linux da ru_maxrss kilobaytlarda
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'benchmarks': benchmarks,
+    }
+    print(f"  peak RSS: {results['peak_rss_mb']} MB")
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Natijalar: {output}")
+
+    if args.save_baseline:
+        with open(baseline_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Baseline yangilandi: {baseline_file}")
+        return 0
+
+    if not os.path.exists(baseline_file):
+        print("Baseline topilmadi - solishtirilmadi")
+        return 0
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('params') != results['params']:
+        print("⚠️ Baseline boshqa parametrlar bilan olingan - natijalar taqqoslanmaydi")
+        return 0
+
+    print(f"📊 Baseline bilan solishtirish (chegara {args.threshold}%):")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"❌ Sekinlashgan: {', '.join(regressions)}")
+        return 1
+    print("✅ Regressiya yo'q")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,462 @@
+"""
+Yuklama sinovi: mahalliy soxta Telegram Bot API va tarjima provayderlari.
+
+    python benchmarks/loadtest.py --users 1000 --concurrency 200
+    python benchmarks/loadtest.py --users 200 --translate-latency 300 --translate-failure 0.1
+
+Bot alohida jarayonda ishga tushiriladi (TELEGRAM_API_URL, GOOGLE_URL va
+MYMEMORY_URL shu serverga qaratiladi). Har bir soxta foydalanuvchi stsenariyni
+bajaradi: /start -> avtomatik qo'shish -> learn_10 -> test -> statistika.
+Har bir qadam uchun update yuborilgandan botning yakuniy javobigacha (tugmali
+xabar) bo'lgan vaqt o'lchanadi.
+
+--no-spawn bilan bot ishga tushirilmaydi - uni o'zingiz ko'rsatilgan
+muhit o'zgaruvchilari bilan ishga tushirasiz
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import shutil
+import signal
+import string
+import sys
+import tempfile
+import time
+from aiohttp import web
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_SCRIPT = os.path.join(os.path.dirname(BENCH_DIR), 'main', 'main.py')
+
+TOKEN = '123456:LOADTEST'
+BOT_USER = {'id': 123456, 'is_bot': True, 'first_name': 'Lugat', 'username': 'lugat_loadtest_bot'}
+
+# Bot bilan ishlashda xato deb hisoblanadigan javoblar
+ERROR_MARKERS = ('Xatolik',)
+
+
+class ChatState:
+    """
+    Bitta chatga bot yuborgan xabarlar (vaqti bilan)
+    """
+
+    __slots__ = ('events', 'changed', 'message_ids')
+
+    def __init__(self):
+        self.events = []
+        self.changed = asyncio.Event()
+        self.message_ids = itertools.count(1)
+
+    def record(self, method, message):
+        self.events.append((time.perf_counter(), method, message))
+        self.changed.set()
+
+
+class FakeBotAPI:
+    """
+    getUpdates, sendMessage, editMessageText va answerCallbackQuery ni
+    bajaradigan minimal Bot API, hamda Google/MyMemory o'rnini bosuvchi tarjima
+    """
+
+    def __init__(self, translate_latency=0.05, translate_failure=0.0, seed=1):
+        self.translate_latency = translate_latency
+        self.translate_failure = translate_failure
+        self.rng = random.Random(seed)
+        self.chats = {}
+        self.updates = []
+        self.update_ids = itertools.count(1)
+        self.new_update = asyncio.Event()
+        self.polling = asyncio.Event()
+        self.calls = {}
+        self.translations = 0
+        self.translation_failures = 0
+
+    def chat(self, chat_id):
+        state = self.chats.get(chat_id)
+        if state is None:
+            state = self.chats[chat_id] = ChatState()
+        return state
+
+    def push_update(self, update):
+        update['update_id'] = next(self.update_ids)
+        self.updates.append(update)
+        self.new_update.set()
+
+    async def _params(self, request):
+        if request.content_type == 'application/json':
+            return await request.json()
+        params = dict(await request.post())
+        # PTB murakkab qiymatlarni (reply_markup) JSON satr sifatida yuboradi
+        for key in ('reply_markup', 'entities', 'allowed_updates'):
+            if isinstance(params.get(key), str):
+                params[key] = json.loads(params[key])
+        return params
+
+    def _message(self, chat_id, message_id, params):
+        message = {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': BOT_USER,
+            'text': params.get('text', ''),
+        }
+        if params.get('reply_markup'):
+            message['reply_markup'] = params['reply_markup']
+        return message
+
+    async def get_updates(self, params):
+        offset = int(params.get('offset') or 0)
+        limit = int(params.get('limit') or 100)
+        timeout = float(params.get('timeout') or 0)
+        self.polling.set()
+
+        # Tasdiqlangan update lar o'chiriladi
+        if offset:
+            self.updates = [update for update in self.updates if update['update_id'] >= offset]
+        if not self.updates and timeout:
+            self.new_update.clear()
+            try:
+                await asyncio.wait_for(self.new_update.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.updates[:limit]
+
+    async def handle_bot_method(self, request):
+        method = request.match_info['method']
+        params = await self._params(request)
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+        if method == 'getMe':
+            result = BOT_USER
+        elif method == 'getUpdates':
+            result = await self.get_updates(params)
+        elif method == 'sendMessage':
+            chat_id = int(params['chat_id'])
+            state = self.chat(chat_id)
+            result = self._message(chat_id, next(state.message_ids), params)
+            state.record(method, result)
+        elif method == 'editMessageText':
+            chat_id = int(params['chat_id'])
+            result = self._message(chat_id, int(params['message_id']), params)
+            self.chat(chat_id).record(method, result)
+        else:
+            # answerCallbackQuery, deleteWebhook va boshqalar
+            result = True
+        return web.json_response({'ok': True, 'result': result})
+
+    async def _translate(self, word):
+        # Kechikish: o'rtacha qiymat atrofida tasodifiy
+        await asyncio.sleep(self.translate_latency * self.rng.uniform(0.5, 1.5))
+        self.translations += 1
+        if self.rng.random() < self.translate_failure:
+            self.translation_failures += 1
+            return None
+        return word[::-1]
+
+    async def handle_google(self, request):
+        word = request.query.get('q', '')
+        translation = await self._translate(word)
+        if translation is None:
+            return web.Response(status=503)
+        return web.json_response([[[translation, word, None, None]]])
+
+    async def handle_mymemory(self, request):
+        word = request.query.get('q', '')
+        translation = await self._translate(word)
+        if translation is None:
+            return web.json_response({'responseStatus': 503, 'responseData': {'translatedText': ''}})
+        return web.json_response({'responseStatus': 200, 'responseData': {'translatedText': translation}})
+
+    def create_app(self):
+        app = web.Application()
+        app.router.add_post('/bot{token}/{method}', self.handle_bot_method)
+        app.router.add_get('/translate_a/single', self.handle_google)
+        app.router.add_get('/get', self.handle_mymemory)
+        return app
+
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def latency_summary(samples):
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2),
+    }
+
+
+class Driver:
+    """
+    Soxta foydalanuvchilar: update yuborish va botning javobini kutish
+    """
+
+    def __init__(self, api, timeout=30.0, settle=1.5, think=0.0, words=3, seed=1):
+        self.api = api
+        self.timeout = timeout
+        self.settle = settle
+        self.think = think
+        self.words = words
+        self.rng = random.Random(seed)
+        self.latencies = {}
+        self.errors = {}
+        self.completed = 0
+
+    def _user(self, user_id):
+        return {'id': user_id, 'is_bot': False, 'first_name': f"User{user_id}"}
+
+    def _error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    async def _wait_response(self, state, mark, started):
+        """
+        Tugmali xabar kelguncha kutish; tugmasiz javobdan keyin settle soniya
+        boshqa xabar kelmasa - shu javob yakuniy hisoblanadi
+        """
+        deadline = started + self.timeout
+        while True:
+            for index in range(mark, len(state.events)):
+                if state.events[index][2].get('reply_markup'):
+                    return index
+            now = time.perf_counter()
+            if len(state.events) > mark:
+                wait = min(state.events[-1][0] + self.settle, deadline) - now
+                if wait <= 0:
+                    return len(state.events) - 1
+            else:
+                wait = deadline - now
+                if wait <= 0:
+                    return None
+            state.changed.clear()
+            try:
+                await asyncio.wait_for(state.changed.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def step(self, name, user_id, update):
+        state = self.api.chat(user_id)
+        mark = len(state.events)
+        started = time.perf_counter()
+        self.api.push_update(update)
+
+        index = await self._wait_response(state, mark, started)
+        if index is None:
+            self._error(f"{name}: timeout")
+            return None
+        finished, _, message = state.events[index]
+        self.latencies.setdefault(name, []).append(finished - started)
+        if any(marker in message.get('text', '') for marker in ERROR_MARKERS):
+            self._error(f"{name}: bot xatosi")
+        if self.think:
+            await asyncio.sleep(self.think * self.rng.uniform(0.5, 1.5))
+        return message
+
+    async def send_text(self, name, user_id, text):
+        message = {
+            'message_id': self.rng.randint(1, 2 ** 31),
+            'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private'},
+            'from': self._user(user_id),
+            'text': text,
+        }
+        if text.startswith('/'):
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+        return await self.step(name, user_id, {'message': message})
+
+    async def click(self, name, user_id, message, data):
+        callback = {
+            'id': str(self.rng.randint(1, 2 ** 62)),
+            'from': self._user(user_id),
+            'chat_instance': str(user_id),
+            'data': data,
+            'message': message,
+        }
+        return await self.step(name, user_id, {'callback_query': callback})
+
+    @staticmethod
+    def buttons(message):
+        markup = (message or {}).get('reply_markup') or {}
+        return [button.get('callback_data') for row in markup.get('inline_keyboard', []) for button in row]
+
+    async def run_user(self, user_id):
+        """
+        Stsenariy: /start -> so'z qo'shish -> learn_10 -> test -> statistika
+        """
+        message = await self.send_text('start', user_id, '/start')
+        if message is None:
+            return
+
+        for _ in range(self.words):
+            message = await self.click('auto_add', user_id, message, 'auto_add') or message
+            word = ''.join(self.rng.choices(string.ascii_lowercase, k=self.rng.randint(6, 10)))
+            reply = await self.send_text('add_word', user_id, word)
+            if reply is not None and reply.get('reply_markup'):
+                message = reply
+
+        message = await self.click('learn', user_id, message, 'learn_10') or message
+        for _ in range(20):
+            next_buttons = [data for data in self.buttons(message) if data and data.startswith('next_')]
+            if not next_buttons:
+                break
+            message = await self.click('next_word', user_id, message, next_buttons[0]) or message
+
+        message = await self.click('test', user_id, message, 'test') or message
+        for _ in range(20):
+            answers = [data for data in self.buttons(message) if data and data.startswith('answer_')]
+            if not answers:
+                break
+            message = await self.click('answer', user_id, message, self.rng.choice(answers)) or message
+
+        await self.click('stats', user_id, message, 'stats')
+        self.completed += 1
+
+    async def run(self, users, concurrency, ramp, first_user_id=10_000_000):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(n):
+            # Foydalanuvchilar ramp soniya ichida bir tekis qo'shiladi
+            if ramp:
+                await asyncio.sleep(ramp * n / users)
+            async with semaphore:
+                try:
+                    await self.run_user(first_user_id + n)
+                except Exception as e:
+                    self._error(f"driver: {type(e).__name__}")
+                    print(f"Stsenariyda xato: {e}")
+
+        await asyncio.gather(*(run_one(n) for n in range(users)))
+
+
+def bot_environment(port, limits):
+    base = f"http://127.0.0.1:{port}"
+    environment = {
+        'token': TOKEN,
+        'TELEGRAM_API_URL': f"{base}/bot",
+        'GOOGLE_URL': f"{base}/translate_a/single",
+        'MYMEMORY_URL': f"{base}/get",
+        'BOT_MODE': 'polling',
+    }
+    if not limits:
+        # Telegram cheklovlari o'chiriladi - botning o'zi o'lchanadi
+        environment.update({
+            'OUTBOX_GLOBAL_RATE': '1000000', 'OUTBOX_GLOBAL_BURST': '1000000',
+            'OUTBOX_CHAT_RATE': '1000000', 'OUTBOX_CHAT_BURST': '1000000',
+        })
+    return environment
+
+
+async def run_loadtest(args):
+    api = FakeBotAPI(args.translate_latency / 1000, args.translate_failure, args.seed)
+    runner = web.AppRunner(api.create_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', args.port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    environment = bot_environment(port, args.telegram_limits)
+
+    process = None
+    workdir = None
+    log = None
+    try:
+        if args.no_spawn:
+            print("Botni quyidagi muhit bilan ishga tushiring:")
+            for key, value in environment.items():
+                print(f"  export {key}={value}")
+        else:
+            workdir = tempfile.mkdtemp(prefix='lugat-loadtest-')
+            log = open(os.path.join(workdir, 'bot.log'), 'w')
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, MAIN_SCRIPT,
+                cwd=workdir, env={**os.environ, **environment, **dict(args.env)},
+                stdout=log, stderr=asyncio.subprocess.STDOUT
+            )
+        await asyncio.wait_for(api.polling.wait(), args.startup_timeout)
+
+        print(f"🚀 {args.users} foydalanuvchi, bir vaqtda {args.concurrency}")
+        driver = Driver(api, args.timeout, args.settle, args.think / 1000, args.words, args.seed)
+        started = time.perf_counter()
+        await driver.run(args.users, args.concurrency, args.ramp)
+        duration = time.perf_counter() - started
+    finally:
+        if process is not None and process.returncode is None:
+            process.send_signal(signal.SIGINT)
+            try:
+                await asyncio.wait_for(process.wait(), 15)
+            except asyncio.TimeoutError:
+                process.kill()
+        if log is not None:
+            log.close()
+            if args.bot_log:
+                shutil.copy(os.path.join(workdir, 'bot.log'), args.bot_log)
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+        await runner.cleanup()
+
+    all_latencies = [sample for samples in driver.latencies.values() for sample in samples]
+    updates = len(all_latencies) + sum(driver.errors.values())
+    return {
+        'params': {key: value for key, value in vars(args).items() if key not in ('output', 'bot_log', 'env')},
+        'duration_s': round(duration, 2),
+        'users_completed': driver.completed,
+        'updates': updates,
+        'throughput_updates_per_sec': round(updates / duration, 1) if duration else 0,
+        'error_rate': round(sum(driver.errors.values()) / updates, 4) if updates else 0,
+        'errors': driver.errors,
+        'latency': latency_summary(all_latencies),
+        'steps': {name: latency_summary(samples) for name, samples in sorted(driver.latencies.items())},
+        'translations': {'requests': api.translations, 'failures': api.translation_failures},
+        'api_calls': api.calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soxta Bot API bilan yuklama sinovi")
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--ramp', type=float, default=0, help="foydalanuvchilar shuncha soniyada qo'shiladi")
+    parser.add_argument('--words', type=int, default=3, help="har bir foydalanuvchi qo'shadigan so'zlar")
+    parser.add_argument('--think', type=float, default=0, help="qadamlar orasidagi o'rtacha pauza, ms")
+    parser.add_argument('--translate-latency', type=float, default=50, help="tarjima kechikishi, ms")
+    parser.add_argument('--translate-failure', type=float, default=0.0, help="tarjima xatolari ulushi (0-1)")
+    parser.add_argument('--timeout', type=float, default=30, help="bitta qadam uchun, soniya")
+    parser.add_argument('--settle', type=float, default=1.5, help="tugmasiz javobdan keyin kutish, soniya")
+    parser.add_argument('--telegram-limits', action='store_true', help="outbox cheklovlarini o'chirmaslik")
+    parser.add_argument('--env', nargs=2, action='append', default=[], metavar=('KEY', 'VALUE'),
+                        help="bot jarayoni uchun qo'shimcha muhit o'zgaruvchisi")
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--startup-timeout', type=float, default=60)
+    parser.add_argument('--no-spawn', action='store_true')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='loadtest_results.json')
+    parser.add_argument('--bot-log', help="bot jurnalini shu faylga nusxalash")
+    args = parser.parse_args()
+    if args.no_spawn and not args.port:
+        parser.error("--no-spawn uchun --port kerak")
+
+    results = asyncio.run(run_loadtest(args))
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    latency = results['latency']
+    print(f"⏱ {results['updates']} update, {results['duration_s']} s, "
+          f"{results['throughput_updates_per_sec']} update/s, xatolar {results['error_rate'] * 100:.2f}%")
+    if latency['count']:
+        print(f"   p50 {latency['p50_ms']} ms   p95 {latency['p95_ms']} ms   p99 {latency['p99_ms']} ms")
+    for name, summary in results['steps'].items():
+        if summary['count']:
+            print(f"   {name:<10} {summary['count']:>7}   p50 {summary['p50_ms']:>9} ms   p99 {summary['p99_ms']:>9} ms")
+    if results['errors']:
+        print(f"❌ Xatolar: {results['errors']}")
+    print(f"✅ Natijalar: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
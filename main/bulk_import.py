@@ -0,0 +1,105 @@
+import asyncio
+import csv
+import io
+import os
+import time
+from translation import translate_word
+from providers import TranslateLimitReached
+from word_index import normalize_word
+
+# Bir vaqtda nechta tarjima so'rovi yuborilishi mumkin
+BULK_TRANSLATE_CONCURRENCY = int(os.getenv("BULK_TRANSLATE_CONCURRENCY", "8"))
+# Bir martada qabul qilinadigan so'zlar soni va fayl hajmi chegarasi
+BULK_MAX_WORDS = int(os.getenv("BULK_MAX_WORDS", "2000"))
+BULK_MAX_FILE_SIZE = int(os.getenv("BULK_MAX_FILE_SIZE", str(1024 * 1024)))
+# Holat xabarini necha soniyada bir marta yangilash
+BULK_PROGRESS_INTERVAL = float(os.getenv("BULK_PROGRESS_INTERVAL", "1.5"))
+
+# CSV sarlavhasi sifatida qabul qilinadigan ustun nomlari
+HEADER_WORDS = {'word', 'english', 'so\'z', 'soz'}
+
+
+def decode_document(data):
+    """
+    Yuklangan fayl baytlarini matnga aylantirish
+    """
+    for encoding in ('utf-8-sig', 'cp1251', 'latin-1'):
+        try:
+            return bytes(data).decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return ""
+
+
+def parse_bulk_text(text):
+    """
+    Ro'yxat yoki CSV matnidan (so'z, tarjima, misol) yozuvlarini ajratish.
+    Har bir qator: "so'z" yoki "so'z, tarjima, misol (ixtiyoriy)"
+    """
+    entries = []
+    seen = set()
+
+    reader = csv.reader(io.StringIO(text))
+    for index, row in enumerate(reader):
+        parts = [part.strip() for part in row]
+        if not parts or not parts[0]:
+            continue
+
+        # Sarlavha qatorini o'tkazib yuborish (masalan, lugat.csv dagi english,uzbek)
+        if index == 0 and parts[0].lower() in HEADER_WORDS:
+            continue
+
+        word = parts[0]
+        key = normalize_word(word)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        translation = parts[1] if len(parts) > 1 else ""
+        example = ", ".join(p for p in parts[2:] if p) if len(parts) > 2 else ""
+        entries.append({'word': word, 'translation': translation, 'example': example})
+
+        if len(entries) >= BULK_MAX_WORDS:
+            break
+
+    return entries
+
+
+async def translate_missing(entries, progress=None, concurrency=BULK_TRANSLATE_CONCURRENCY, user_id=None):
+    """
+    Tarjimasi yo'q yozuvlarni cheklangan parallellik bilan tarjima qilish.
+    progress(tugagan, jami) - holatni ko'rsatish uchun (ixtiyoriy).
+    Qaytaradi: foydalanuvchi tarjima limiti tugagani uchun qoldirilgan yozuvlar
+    """
+    missing = [entry for entry in entries if not entry['translation']]
+    total = len(missing)
+    deferred = []
+    if not total:
+        return deferred
+
+    semaphore = asyncio.Semaphore(concurrency)
+    done = 0
+    last_report = time.monotonic()
+
+    async def worker(entry):
+        nonlocal done, last_report
+        async with semaphore:
+            try:
+                translation = await translate_word(entry['word'], user_id=user_id)
+            except TranslateLimitReached:
+                # Tarjima qilinmagan deb hisoblanmaydi - foydalanuvchiga alohida aytiladi
+                deferred.append(entry)
+                translation = None
+        entry['translation'] = translation or ""
+        done += 1
+
+        now = time.monotonic()
+        if progress is not None and done < total and now - last_report >= BULK_PROGRESS_INTERVAL:
+            last_report = now
+            try:
+                await progress(done, total)
+            except Exception as e:
+                print(f"Holat xabarini yangilashda xato: {e}")
+
+    await asyncio.gather(*(worker(entry) for entry in missing))
+    return deferred
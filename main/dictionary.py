@@ -0,0 +1,180 @@
+import argparse
+import csv
+import mmap
+import os
+import struct
+import sys
+from array import array
+from word_index import normalize_word
+
+# Kompilyatsiya qilingan lug'at fayli va uning manbalari
+DICTIONARY_FILE = os.getenv("DICTIONARY_FILE", "dictionary.bin")
+DICTIONARY_SOURCES = [path for path in os.getenv("DICTIONARY_SOURCES", "lugat.csv").split(os.pathsep) if path]
+
+# Fayl tuzilishi: sarlavha (belgi, versiya, soni), (soni + 1) ta uint32 siljish,
+# so'ng kalit bo'yicha saralangan "kalit\tTarjima" yozuvlari (UTF-8)
+MAGIC = b'LUGATDIC'
+VERSION = 1
+HEADER = struct.Struct('<8sII')
+ENTRY_RANGE = struct.Struct('<II')
+
+HEADER_WORDS = {'english', 'word', "so'z", 'soz'}
+
+
+def read_source(path):
+    """
+    CSV (english,uzbek) yoki TSV lug'at faylidan (so'z, tarjima) juftliklari
+    """
+    delimiter = '\t' if path.endswith(('.tsv', '.txt')) else ','
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for index, row in enumerate(csv.reader(f, delimiter=delimiter)):
+            if len(row) < 2:
+                continue
+            word, translation = row[0].strip(), row[1].strip()
+            if index == 0 and word.lower() in HEADER_WORDS:
+                continue
+            if word and translation:
+                yield word, translation
+
+
+def build_dictionary(sources, output=DICTIONARY_FILE, extra=None):
+    """
+    Manbalarni bitta saralangan faylga yig'ish. Bir so'z bir necha manbada
+    bo'lsa, birinchi manbadagi tarjima olinadi. Qaytaradi: yozuvlar soni
+    """
+    entries = {}
+    for path in sources:
+        for word, translation in read_source(path):
+            entries.setdefault(normalize_word(word).encode('utf-8'), translation)
+    for word, translation in (extra or {}).items():
+        entries.setdefault(normalize_word(word).encode('utf-8'), translation)
+
+    offsets = array('I', [0])
+    data = bytearray()
+    for key in sorted(entries):
+        data += key + b'\t' + entries[key].replace('\n', ' ').encode('utf-8')
+        offsets.append(len(data))
+    if len(data) >= 2 ** 32:
+        raise ValueError("Lug'at juda katta")
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+
+    temp_path = f"{output}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        f.write(offsets.tobytes())
+        f.write(data)
+    os.replace(temp_path, output)
+    return len(entries)
+
+
+class CompiledDictionary:
+    """
+    Xotiraga akslantirilgan (mmap) lug'at: ishga tushishda o'qilmaydi,
+    qidiruv ikkilik qidiruv bilan O(log n), sahifalar jarayonlar orasida umumiy
+    """
+
+    def __init__(self, path=DICTIONARY_FILE):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Noto'g'ri lug'at fayli: {path}")
+        self._data_start = HEADER.size + (self.count + 1) * 4
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, i):
+        start, end = ENTRY_RANGE.unpack_from(self._mmap, HEADER.size + i * 4)
+        return self._mmap[self._data_start + start:self._data_start + end]
+
+    def get(self, word):
+        key = normalize_word(word).encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self._entry(middle)
+            entry_key, _, translation = entry.partition(b'\t')
+            if entry_key == key:
+                return translation.decode('utf-8')
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+def extra_words():
+    """
+    Koddagi qo'shimcha lug'at (SIMPLE_DICT) va u yozilgan fayl. translation bu
+    modulni import qiladi - shuning uchun kerak bo'lganda yuklanadi
+    """
+    import translation
+    return translation.SIMPLE_DICT, translation.__file__
+
+
+def is_stale(output, sources):
+    """
+    Yig'ilgan fayl yo'q yoki manbalardan birortasi undan keyin o'zgargan
+    """
+    if not os.path.exists(output):
+        return True
+    built = os.path.getmtime(output)
+    return any(os.path.getmtime(path) > built for path in sources)
+
+
+_dictionary = None
+_dictionary_missing = False
+
+
+def get_dictionary():
+    """
+    Lug'at faylini birinchi murojaatda ochish. Fayl yo'q yoki manbalar (standart:
+    lugat.csv va SIMPLE_DICT) undan yangi bo'lsa, qayta yig'iladi; manba ham bo'lmasa None
+    """
+    global _dictionary, _dictionary_missing
+    if _dictionary is not None or _dictionary_missing:
+        return _dictionary
+    try:
+        sources = [path for path in DICTIONARY_SOURCES if os.path.exists(path)]
+        if not sources and not os.path.exists(DICTIONARY_FILE):
+            _dictionary_missing = True
+            return None
+        if sources:
+            extra, extra_path = extra_words()
+            if is_stale(DICTIONARY_FILE, sources + [extra_path]):
+                build_dictionary(sources, DICTIONARY_FILE, extra=extra)
+        _dictionary = CompiledDictionary(DICTIONARY_FILE)
+    except Exception as e:
+        print(f"Lug'at faylini ochishda xato: {e}")
+        _dictionary_missing = True
+    return _dictionary
+
+
+def lookup(word):
+    dictionary = get_dictionary()
+    return dictionary.get(word) if dictionary is not None else None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Oflayn lug'at faylini yig'ish")
+    parser.add_argument('command', choices=['build', 'lookup'])
+    parser.add_argument('args', nargs='*', help="build: manba fayllar (CSV/TSV), lookup: so'zlar")
+    parser.add_argument('-o', '--output', default=DICTIONARY_FILE)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        count = build_dictionary(args.args or DICTIONARY_SOURCES, args.output, extra=extra_words()[0])
+        print(f"✅ {args.output}: {count} ta so'z, {os.path.getsize(args.output)} bayt")
+    else:
+        dictionary = CompiledDictionary(args.output)
+        for word in args.args:
+            print(f"{word}: {dictionary.get(word)}")
+        dictionary.close()
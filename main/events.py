@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from locks import file_lock
+
+# Hodisalar jurnali sozlamalari
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", os.getenv("STORAGE_BACKEND", "file"))
+EVENTS_FILE = os.getenv("EVENTS_FILE", "events.log")
+EVENTS_SQLITE_FILE = os.getenv("EVENTS_SQLITE_FILE", os.getenv("SQLITE_FILE", "vocabulary.db"))
+# Bufer shu hajmga yetganda yoki shu vaqt o'tganda diskka yoziladi
+EVENTS_BATCH_SIZE = int(os.getenv("EVENTS_BATCH_SIZE", "200"))
+EVENTS_FLUSH_INTERVAL = float(os.getenv("EVENTS_FLUSH_INTERVAL", "5"))
+
+# Hodisa turlari
+ANSWER = 'answer'
+VIEW = 'view'
+ADD = 'add'
+DELETE = 'delete'
+
+
+class FileEventSink:
+    """
+    Hodisalarni JSON qatorlari sifatida faylga qo'shib yozish
+    """
+
+    def __init__(self, path=EVENTS_FILE):
+        self.path = path
+
+    def write(self, events):
+        # Bir nechta worker bitta faylga yozganda qatorlar aralashib ketmasligi uchun
+        with file_lock(self.path), open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in events))
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Yarim yozilgan oxirgi qator
+                    continue
+
+    def close(self):
+        pass
+
+
+class SQLiteEventSink:
+    """
+    Hodisalarni SQLite jadvaliga yozish
+    """
+
+    def __init__(self, path=EVENTS_SQLITE_FILE):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " ts REAL NOT NULL, type TEXT NOT NULL, user_id TEXT, data TEXT)"
+        )
+        self.db.commit()
+
+    def write(self, events):
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO events (ts, type, user_id, data) VALUES (?, ?, ?, ?)",
+                [
+                    (event['ts'], event['type'], event.get('user'),
+                     json.dumps({k: v for k, v in event.items() if k not in ('ts', 'type', 'user')},
+                                ensure_ascii=False))
+                    for event in events
+                ]
+            )
+
+    def read(self):
+        for ts, kind, user_id, data in self.db.execute(
+            "SELECT ts, type, user_id, data FROM events ORDER BY rowid"
+        ):
+            event = json.loads(data) if data else {}
+            event.update({'ts': ts, 'type': kind, 'user': user_id})
+            yield event
+
+    def close(self):
+        self.db.close()
+
+
+def create_event_sink(backend=EVENTS_BACKEND):
+    if backend == 'sqlite':
+        return SQLiteEventSink()
+    return FileEventSink()
+
+
+def new_counters():
+    return {'answers': 0, 'correct': 0, 'views': 0, 'added': 0, 'deleted': 0}
+
+
+def count_event(counters, event):
+    """
+    Bitta hodisani foydalanuvchi hisoblagichlariga qo'shish
+    """
+    kind = event['type']
+    if kind == ANSWER:
+        counters['answers'] += 1
+        if event.get('correct'):
+            counters['correct'] += 1
+    elif kind == VIEW:
+        counters['views'] += 1
+    elif kind == ADD:
+        counters['added'] += event.get('count', 1)
+    elif kind == DELETE:
+        counters['deleted'] += 1
+
+
+class EventLog:
+    """
+    Hodisalar oqimi: xotirada yig'iladi va paketlab (hajm yoki vaqt bo'yicha)
+    alohida oqimda diskka yoziladi - event loop to'xtab qolmaydi
+    """
+
+    def __init__(self, sink=None, batch_size=EVENTS_BATCH_SIZE, flush_interval=EVENTS_FLUSH_INTERVAL):
+        self.sink = sink if sink is not None else create_event_sink()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._task = None
+        self._flushing = None
+        self._lock = None
+        self.written = 0
+        self.dropped = 0
+
+    def record(self, kind, user_id=None, **fields):
+        """
+        Hodisani buferga qo'shish (start() dan keyin disk bilan ishlamaydi)
+        """
+        event = {'ts': round(time.time(), 3), 'type': kind}
+        if user_id is not None:
+            event['user'] = str(user_id)
+        event.update(fields)
+        self._buffer.append(event)
+
+        if len(self._buffer) >= self.batch_size:
+            if self._task is None:
+                # Fon vazifasi hali ishga tushmagan (yoki to'xtagan) - bufer cheksiz
+                # o'smasligi uchun paket shu yerda yoziladi
+                self._write_now()
+            elif self._flushing is None or self._flushing.done():
+                self._flushing = asyncio.ensure_future(self.flush())
+
+    def _write_now(self):
+        batch, self._buffer = self._buffer, []
+        try:
+            self.sink.write(batch)
+            self.written += len(batch)
+        except Exception as e:
+            print(f"Hodisalarni yozishda xato: {e}")
+            self._requeue(batch)
+
+    def _requeue(self, batch):
+        # Keyingi urinishda qayta yoziladi (cheksiz o'smasligi uchun chegara bilan)
+        if len(self._buffer) + len(batch) <= self.batch_size * 50:
+            self._buffer[:0] = batch
+        else:
+            self.dropped += len(batch)
+
+    async def flush(self):
+        """
+        Buferdagi hodisalarni alohida oqimda yozish
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            try:
+                await asyncio.to_thread(self.sink.write, batch)
+                self.written += len(batch)
+            except Exception as e:
+                print(f"Hodisalarni yozishda xato: {e}")
+                self._requeue(batch)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Fon vazifasini to'xtatish va qolgan hodisalarni yozish
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None:
+            await self._flushing
+        await self.flush()
+        self.sink.close()
+
+
+def summarize(sink):
+    """
+    Hodisalar jurnalidan foydalanuvchi hisoblagichlarini qayta hisoblash
+    """
+    counters = {}
+    for event in sink.read():
+        user_id = event.get('user')
+        if user_id is not None:
+            count_event(counters.setdefault(user_id, new_counters()), event)
+    return counters
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Hodisalar jurnali bo'yicha hisobot")
+    parser.add_argument('command', choices=['summary'])
+    parser.add_argument('--backend', default=EVENTS_BACKEND)
+    args = parser.parse_args()
+
+    sink = create_event_sink(args.backend)
+    for user_id, counters in sorted(summarize(sink).items()):
+        accuracy = counters['correct'] / counters['answers'] * 100 if counters['answers'] else 0
+        print(f"{user_id}: javoblar {counters['answers']} ({accuracy:.1f}% to'g'ri), "
+              f"ko'rilgan {counters['views']}, qo'shilgan {counters['added']}, o'chirilgan {counters['deleted']}")
+    sink.close()
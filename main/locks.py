@@ -0,0 +1,82 @@
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: jarayonlararo qulf yo'q (bitta jarayonda ishlatiladi)
+    fcntl = None
+
+_held = {}
+_held_lock = threading.Lock()
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """
+    Jarayonlararo fayl qulfi (flock). Qulf alohida "{path}.lock" faylida -
+    asosiy fayl atomik almashtirilganda ham qulf saqlanadi.
+    Bitta oqim ichida qayta kirish mumkin (ichki chaqiruvlar qulfni qayta olmaydi)
+    """
+    lock_path = f"{path}.lock"
+    key = (lock_path, threading.get_ident())
+    with _held_lock:
+        held = _held.get(key)
+        if held is not None:
+            held[1] += 1
+    if held is not None:
+        try:
+            yield
+        finally:
+            with _held_lock:
+                held[1] -= 1
+        return
+
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        with _held_lock:
+            _held[key] = [fd, 1]
+        try:
+            yield
+        finally:
+            with _held_lock:
+                del _held[key]
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+class KeyedLock:
+    """
+    Kalit bo'yicha asyncio qulfi: bir xil kalitli vazifalar navbat bilan (kelgan tartibida),
+    boshqa kalitlar parallel ishlaydi. Hech kim kutmayotgan qulf o'chiriladi
+    """
+
+    def __init__(self):
+        # kalit -> [qulf, uni ushlab turgan yoki kutayotganlar soni]
+        self._locks = {}
+
+    @asynccontextmanager
+    async def lock(self, key):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    def stats(self):
+        return {
+            'keys': len(self._locks),
+            'waiting': sum(count - 1 for _, count in self._locks.values()),
+        }
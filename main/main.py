@@ -1,346 +1,210 @@
-import pandas as pd
+import asyncio
+import importlib
+import math
 import random
 import os
-import json
-import requests
-import os
+import time
+import startup
+from itertools import islice
 from dotenv import load_dotenv
 from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, ContextTypes, filters
+# Sozlamalar modullar import qilinishidan oldin yuklanadi
 load_dotenv()
+from translation import translate_word, close_http_client
+from storage import create_storage
+from user_cache import UserVocabularyCache
+from sessions import SessionStore
+from bulk_import import parse_bulk_text, translate_missing, decode_document, BULK_MAX_FILE_SIZE
+from quiz import build_quiz
+from events import EventLog, ANSWER, VIEW, ADD, DELETE
+from workers import is_dispatcher, run_dispatcher
+from update_processor import UserUpdateProcessor
+from outbox import OutboxRateLimiter, send_in_background, PRIORITY_BACKGROUND
+from vocab import word_key
+import metrics
+from metrics import HANDLER_SECONDS, HANDLER_ERRORS, STORAGE_SECONDS
+from translation import translation_cache, provider_router
+from providers import TranslateLimitReached
+from scheduler import review, introduce, pick_learn_words, pick_test_words, QUALITY_WRONG, QUALITY_CORRECT
+from dictionary import get_dictionary
+startup.mark('imports')
 TOKEN= os.getenv("token")
-# CSV fayl nomi
-CSV_FILE = 'vocabulary.csv'
-USER_WORDS_FILE = 'user_vocabulary_{}.json'
+# Ishga tushirish rejimi: polling yoki webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+# Bot API manzili (yuklama sinovida mahalliy soxta server ko'rsatiladi)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org/bot")
 
-# Foydalanuvchi ma'lumotlarini saqlash
-user_data = {}
+# Ko'p jarayonli rejim: bu jarayon faqat update larni workerlarga taqsimlaydi.
+# Lug'at, sessiya va jurnal fayllarini faqat workerlar ochadi - shuning uchun quyidagi
+# storage, kesh va sessiyalar yaratilishidan oldin
+if __name__ == '__main__' and is_dispatcher():
+    run_dispatcher(TOKEN, TELEGRAM_API_URL, BOT_MODE)
+    raise SystemExit(0)
 
-# MyMemory Translate API funksiyasi
-def translate_word_my_memory(word, source_lang='en', target_lang='uz'):
-    """
-    MyMemory API orqali so'z tarjima qilish
-    """
-    try:
-        url = f"https://api.mymemory.translated.net/get"
-        params = {
-            'q': word,
-            'langpair': f'{source_lang}|{target_lang}'
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data['responseStatus'] == 200:
-                translation = data['responseData']['translatedText']
-                # Agar tarjima bir nechta bo'lsa, birinchisini olamiz
-                if ';' in translation:
-                    translation = translation.split(';')[0].strip()
-                if '(' in translation:
-                    translation = translation.split('(')[0].strip()
-                return translation
-        return None
-    except Exception as e:
-        print(f"Tarjima qilishda xato: {e}")
-        return None
+# Lug'at saqlash backendi (STORAGE_BACKEND=file yoki sqlite)
+storage = create_storage()
 
-# Google Translate API (alternativa)
-def translate_word_google(word, source_lang='en', target_lang='uz'):
-    """
-    Google Translate API (bepul va oson)
-    """
-    try:
-        url = "https://translate.googleapis.com/translate_a/single"
-        params = {
-            'client': 'gtx',
-            'sl': source_lang,
-            'tl': target_lang,
-            'dt': 't',
-            'q': word
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            # Google Translate javobi kompleks struktura
-            # Birinchi elementda tarjimalar listi bor
-            if data and len(data) > 0 and data[0]:
-                translations = data[0]
-                if translations and len(translations) > 0:
-                    translation = translations[0][0]
-                    return translation
-        return None
-    except Exception as e:
-        print(f"Google Translate xatosi: {e}")
-        return None
-
-# Tarjima funksiyasi (ikkala API dan foydalanadi)
-def translate_word(word, source_lang='en', target_lang='uz'):
-    """
-    So'zni tarjima qilish - birinchi Google Translate, keyin MyMemory
-    """
-    # Avval Google Translate dan urinib ko'ramiz
-    translation = translate_word_google(word, source_lang, target_lang)
-    
-    # Agar Google Translate ishlamasa, MyMemory dan foydalanamiz
-    if not translation or translation == word:
-        translation = translate_word_my_memory(word, source_lang, target_lang)
-    
-    # Agar ikkalasi ham ishlamasa, oddiy lug'atdan foydalanamiz
-    if not translation or translation == word:
-        translation = get_translation_from_dict(word)
-    
-    return translation
+# O'chirish menyusidagi bitta sahifadagi so'zlar soni
+DELETE_PAGE_SIZE = 15
 
-# Kichik lug'at (zaxira sifatida)
-def get_translation_from_dict(word):
-    """
-    Kichik lug'atdan tarjima qidirish
-    """
-    simple_dict = {
-        'apple': 'olma',
-        'book': 'kitob',
-        'cat': 'mushuk',
-        'dog': 'it',
-        'house': 'uy',
-        'car': 'mashina',
-        'water': 'suv',
-        'hello': 'salom',
-        'goodbye': 'xayr',
-        'thank you': 'rahmat',
-        'yes': 'ha',
-        'no': "yo'q",
-        'man': 'erkak',
-        'woman': 'ayol',
-        'child': 'bola',
-        'school': 'maktab',
-        'teacher': "o'qituvchi",
-        'student': "o'quvchi",
-        'friend': "do'st",
-        'family': 'oilа',
-        'work': 'ish',
-        'time': 'vaqt',
-        'computer': 'kompyuter',
-        'phone': 'telefon',
-        'money': 'pul',
-        'city': 'shahar',
-        'country': 'davlat',
-        'day': 'kun',
-        'night': 'tun',
-        'food': 'ovqat',
-        'air': 'havo',
-        'fire': 'olov',
-        'earth': 'yer',
-        'sun': 'quyosh',
-        'moon': 'oy',
-        'star': 'yulduz'
-    }
-    
-    word_lower = word.lower().strip()
-    return simple_dict.get(word_lower, None)
+# Foydalanuvchi sessiyalari (xotirada cheklangan, qayta ishga tushganda diskdan tiklanadi)
+user_data = SessionStore(storage)
 
-# Asosiy CSV faylni yuklash
+# Asosiy lug'atni yuklash
 def load_vocabulary():
-    if os.path.exists(CSV_FILE):
-        try:
-            df = pd.read_csv(CSV_FILE)
-            if df.empty:
-                return pd.DataFrame(columns=['word', 'translation', 'example', 'added_date'])
-            return df
-        except Exception as e:
-            print(f"CSV faylni o'qishda xato: {e}")
-            return pd.DataFrame(columns=['word', 'translation', 'example', 'added_date'])
-    else:
-        # Bo'sh dataframe yaratish
-        df = pd.DataFrame(columns=['word', 'translation', 'example', 'added_date'])
-        df.to_csv(CSV_FILE, index=False)
-        return df
+    return storage.load_catalog()
 
-# Foydalanuvchi lug'atini yuklash (JSON formatida)
+# Foydalanuvchi lug'atlari keshi (diskka yozish kechiktiriladi)
+user_cache = UserVocabularyCache(storage)
+
+# Javoblar, ko'rishlar, qo'shish va o'chirish hodisalari (paketlab yoziladi)
+event_log = EventLog()
+
+# Chiquvchi xabarlar navbati (Telegram cheklovlari)
+rate_limiter = OutboxRateLimiter()
+
+# Update lar parallel qayta ishlanadi, bitta foydalanuvchiniki - navbat bilan
+update_processor = UserUpdateProcessor()
+
+# Foydalanuvchi lug'atini yuklash (katalog + foydalanuvchi progressi)
 def load_user_vocabulary(user_id):
-    user_file = USER_WORDS_FILE.format(user_id)
-    
-    if os.path.exists(user_file):
-        try:
-            with open(user_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # JSON dan DataFrame ga o'tkazish
-            words = []
-            for word_data in data.get('words', []):
-                words.append({
-                    'word': word_data.get('word', ''),
-                    'translation': word_data.get('translation', ''),
-                    'example': word_data.get('example', ''),
-                    'learned': word_data.get('learned', False),
-                    'deleted': word_data.get('deleted', False),
-                    'seen_count': word_data.get('seen_count', 0),
-                    'correct_count': word_data.get('correct_count', 0),
-                    'last_seen': word_data.get('last_seen'),
-                    'added_date': word_data.get('added_date')
-                })
-            
-            return pd.DataFrame(words)
-        except Exception as e:
-            print(f"Foydalanuvchi faylini o'qishda xato: {e}")
-    
-    # Yangi foydalanuvchi uchun asosiy lug'atdan nusxa olish
-    main_df = load_vocabulary()
-    
-    if main_df.empty:
-        words = []
-    else:
-        # Asosiy lug'atdan so'zlarni olish
-        words = []
-        for _, row in main_df.iterrows():
-            words.append({
-                'word': row['word'],
-                'translation': row['translation'],
-                'example': row.get('example', ''),
-                'learned': False,
-                'deleted': False,
-                'seen_count': 0,
-                'correct_count': 0,
-                'last_seen': None,
-                'added_date': row.get('added_date', datetime.now().isoformat())
-            })
-    
-    # Yangi foydalanuvchi faylini yaratish
-    save_user_vocabulary(user_id, pd.DataFrame(words))
-    return pd.DataFrame(words)
-
-# Foydalanuvchi lug'atini saqlash (JSON formatida)
-def save_user_vocabulary(user_id, df):
-    user_file = USER_WORDS_FILE.format(user_id)
-    
-    try:
-        # DataFrame dan JSON ga o'tkazish
-        words = []
-        for _, row in df.iterrows():
-            words.append({
-                'word': str(row['word']),
-                'translation': str(row['translation']),
-                'example': str(row.get('example', '')),
-                'learned': bool(row.get('learned', False)),
-                'deleted': bool(row.get('deleted', False)),
-                'seen_count': int(row.get('seen_count', 0)),
-                'correct_count': int(row.get('correct_count', 0)),
-                'last_seen': row.get('last_seen'),
-                'added_date': row.get('added_date', datetime.now().isoformat())
-            })
-        
-        user_vocab = {
-            'user_id': user_id,
-            'updated_at': datetime.now().isoformat(),
-            'words': words
-        }
-        
-        with open(user_file, 'w', encoding='utf-8') as f:
-            json.dump(user_vocab, f, ensure_ascii=False, indent=2)
-            
-    except Exception as e:
-        print(f"Foydalanuvchi faylini saqlashda xato: {e}")
+    return user_cache.get(user_id)
+
+# Foydalanuvchi lug'atini saqlash
+def save_user_vocabulary(user_id, vocab):
+    user_cache.put(user_id, vocab)
 
 # Foydalanuvchi lug'atidan so'zni o'chirish
 def delete_user_word(user_id, word_to_delete):
     """
     Foydalanuvchi lug'atidan so'zni o'chirish (faqat o'chirilgan deb belgilash)
     """
-    user_df = load_user_vocabulary(user_id)
-    
-    word_lower = word_to_delete.lower()
+    vocab = load_user_vocabulary(user_id)
     
     # So'zni topish
-    mask = user_df['word'].str.lower() == word_lower
-    if mask.any():
-        user_df.loc[mask, 'deleted'] = True
-        save_user_vocabulary(user_id, user_df)
-        return True
+    i = vocab.find(word_to_delete)
+    if i is not None:
+        return delete_user_word_by_id(user_id, vocab.word_id(i)) is not None
     return False
 
+# So'zni ID bo'yicha o'chirish - o'chirilgan so'z (yoki None) qaytaradi
+def delete_user_word_by_id(user_id, word_id):
+    vocab = load_user_vocabulary(user_id)
+    i = vocab.index_of_id(word_id)
+    if i is None or not vocab.is_active(i):
+        return None
+    user_cache.update_word(user_id, word_id, {'deleted': True})
+    event_log.record(DELETE, user_id, word_id=word_id)
+    return vocab.word(i)
+
+# So'z takrorlanganini qayd qilish (takrorlash jadvalini yangilash)
+def record_review(user_id, word_id, quality):
+    vocab = load_user_vocabulary(user_id)
+    i = vocab.index_of_id(word_id)
+    if i is not None:
+        user_cache.update_word(user_id, word_id, review(vocab, i, quality))
+
+# So'z yodlash rejimida ko'rsatilganini qayd qilish (javob emas - faqat jadvalga qo'shiladi)
+def record_exposure(user_id, word_id):
+    vocab = load_user_vocabulary(user_id)
+    i = vocab.index_of_id(word_id)
+    if i is not None:
+        user_cache.update_word(user_id, word_id, introduce(vocab, i))
+
 # Asosiy lug'atdan so'z o'chirish
 def delete_word_from_vocabulary(word_to_delete):
     """
-    Asosiy CSV fayldan so'zni o'chirish
+    Asosiy lug'atdan so'zni o'chirish
     """
-    df = load_vocabulary()
-    
-    if df.empty:
+    if not len(load_vocabulary()):
         return False, "Lug'at bo'sh"
     
-    word_lower = word_to_delete.lower()
-    mask = df['word'].str.lower() == word_lower
-    
-    if mask.any():
-        # So'zni o'chirish
-        df = df[~mask]
-        df.to_csv(CSV_FILE, index=False)
+    if storage.delete_catalog_word(word_to_delete):
         return True, f"'{word_to_delete}' so'zi asosiy lug'atdan o'chirildi"
     else:
         return False, "So'z topilmadi"
 
+# Asosiy lug'atdagi so'zlar to'plami (kichik harflarda)
+def vocabulary_words():
+    return storage.catalog_word_keys()
+
+# Asosiy lug'atda so'z bor-yo'qligini tekshirish
+def word_exists_in_vocabulary(word):
+    return word_key(word) in vocabulary_words()
+
+# Xato yozilgan bo'lishi mumkin bo'lgan so'z uchun lug'atdagi o'xshash so'z
+def suggest_word(word):
+    if word_exists_in_vocabulary(word):
+        return None
+    return load_vocabulary().suggest(word)
+
 # So'z qo'shish (asosiy lug'atga)
-def add_word_to_vocabulary(word, translation="", example=""):
-    df = load_vocabulary()
-    
+async def add_word_to_vocabulary(word, translation="", example="", user_id=None):
     # So'z allaqachon mavjudligini tekshirish
-    if not df.empty and word.lower() in df['word'].str.lower().values:
+    if word_exists_in_vocabulary(word):
         return False, "Bu so'z allaqachon mavjud"
     
     # Agar tarjima berilmagan bo'lsa, avtomatik tarjima qilish
     if not translation:
-        translation = translate_word(word)
+        try:
+            translation = await translate_word(word, user_id=user_id)
+        except TranslateLimitReached:
+            return False, limit_message(user_id)
         if not translation:
             return False, "Tarjima topilmadi. Iltimos, tarjimasini ham kiriting."
     
-    # Masalan yaratish
-    if not example:
-        example = f"I use {word} every day." if word else ""
-    
-    new_word = pd.DataFrame({
-        'word': [word],
-        'translation': [translation],
-        'example': [example],
-        'added_date': [datetime.now().isoformat()]
-    })
-    
-    if df.empty:
-        df = new_word
-    else:
-        df = pd.concat([df, new_word], ignore_index=True)
-    
-    df.to_csv(CSV_FILE, index=False)
-    
-    # Barcha foydalanuvchilar fayllarini yangilash
-    for filename in os.listdir('.'):
-        if filename.startswith('user_vocabulary_') and filename.endswith('.json'):
-            try:
-                user_id = filename.replace('user_vocabulary_', '').replace('.json', '')
-                user_df = load_user_vocabulary(user_id)
-                
-                if word.lower() not in user_df['word'].str.lower().values:
-                    new_user_word = pd.DataFrame({
-                        'word': [word],
-                        'translation': [translation],
-                        'example': [example],
-                        'learned': [False],
-                        'deleted': [False],
-                        'seen_count': [0],
-                        'correct_count': [0],
-                        'last_seen': [None],
-                        'added_date': [datetime.now().isoformat()]
-                    })
-                    user_df = pd.concat([user_df, new_user_word], ignore_index=True)
-                    save_user_vocabulary(user_id, user_df)
-                    
-            except Exception as e:
-                print(f"Foydalanuvchi faylini yangilashda xato: {e}")
+    # Tarjima kutilayotganda boshqa foydalanuvchi shu so'zni qo'shgan bo'lishi mumkin
+    new_words, _ = add_words_to_vocabulary([{'word': word, 'translation': translation, 'example': example}], user_id)
+    if not new_words:
+        return False, "Bu so'z allaqachon mavjud"
     
     return True, "So'z muvaffaqiyatli qo'shildi"
 
+# Tarjima limiti tugagani haqida xabar (qancha kutish kerakligi bilan)
+def limit_message(user_id, count=1):
+    minutes = max(1, math.ceil(provider_router.user_wait(user_id, count) / 60))
+    return (f"Avtomatik tarjima limiti tugadi. {minutes} daqiqadan keyin qayta urinib ko'ring "
+            f"yoki tarjimasini o'zingiz kiriting")
+
+# Bir nechta so'zni bir martada qo'shish
+def add_words_to_vocabulary(entries, user_id=None):
+    """
+    So'zlarni asosiy lug'atga bitta yozuv bilan qo'shish. Foydalanuvchilar ma'lumotlari o'zgarmaydi -
+    ular katalogni o'z progressi bilan birlashtirib ko'radi.
+    (qo'shilgan so'zlar, allaqachon mavjud so'zlar) qaytaradi
+    """
+    existing = vocabulary_words()
+    added_date = datetime.now().isoformat()
+    
+    new_words = []
+    skipped = []
+    seen = set()
+    for entry in entries:
+        word = entry['word']
+        key = word_key(word)
+        if key in existing or key in seen:
+            skipped.append(word)
+            continue
+        seen.add(key)
+        
+        # Masalan yaratish
+        example = entry.get('example') or f"I use {word} every day."
+        new_words.append({
+            'word': word,
+            'translation': entry['translation'],
+            'example': example,
+            'added_date': added_date
+        })
+    
+    if new_words:
+        with STORAGE_SECONDS.time('add_catalog_words'):
+            storage.add_catalog_words(new_words)
+        event_log.record(ADD, user_id, count=len(new_words))
+    
+    return new_words, skipped
+
 # Avtomatik so'z qo'shish (foydalanuvchi faqat so'zni kiritadi)
 async def auto_add_word(word, user_id, context):
     """
@@ -352,15 +216,22 @@ async def auto_add_word(word, user_id, context):
     if not word:
         return False, "So'z kiritilmadi"
     
-    # Avtomatik tarjima qilish
-    translation = translate_word(word)
+    # Lug'atda bor so'z uchun tarjima so'rovini yubormaymiz
+    if word_exists_in_vocabulary(word):
+        return False, "Bu so'z allaqachon mavjud"
+    
+    # Avtomatik tarjima qilish (avval keshdan)
+    try:
+        translation = await translate_word(word, user_id=user_id)
+    except TranslateLimitReached:
+        return False, limit_message(user_id)
     
     if not translation:
         # Tarjima topilmasa, foydalanuvchidan so'rash
         return False, "tarjima_topilmadi"
     
     # CSV ga qo'shish
-    success, message = add_word_to_vocabulary(word, translation)
+    success, message = await add_word_to_vocabulary(word, translation, user_id=user_id)
     
     if success:
         return True, f"✅ '{word}' so'zi avtomatik qo'shildi!\nTarjima: {translation}"
@@ -380,7 +251,8 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         'current_word_index': 0,
         'correct_answers': 0,
         'awaiting_word': False,
-        'auto_add_mode': True  # Avtomatik qo'shish rejimi
+        'auto_add_mode': True,  # Avtomatik qo'shish rejimi
+        'bulk_mode': False
     }
     
     # Foydalanuvchi lug'at faylini yaratish (agar mavjud bo'lmasa)
@@ -392,6 +264,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         [InlineKeyboardButton("📝 Test topshirish", callback_data='test')],
         [InlineKeyboardButton("➕ So'z qo'shish", callback_data='add_word')],
         [InlineKeyboardButton("⚡ Avtomatik qo'shish", callback_data='auto_add')],
+        [InlineKeyboardButton("📥 Ko'p so'z qo'shish", callback_data='bulk_add')],
         [InlineKeyboardButton("🗑️ So'z o'chirish", callback_data='delete_word')],
         [InlineKeyboardButton("📊 Mening statistikam", callback_data='stats')]
     ]
@@ -416,6 +289,7 @@ async def enable_auto_add(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = query.from_user.id
     user_data[user_id]['auto_add_mode'] = True
     user_data[user_id]['awaiting_word'] = True
+    user_data[user_id]['bulk_mode'] = False
     
     text = "⚡ <b>Avtomatik qo'shish rejimi yoqildi!</b>\n\n"
     text += "Endi faqat inglizcha so'z yozing, men avtomatik tarjima qilib CSV faylga saqlayman.\n\n"
@@ -438,6 +312,7 @@ async def add_word_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = query.from_user.id
     user_data[user_id]['awaiting_word'] = True
     user_data[user_id]['auto_add_mode'] = False  # An'anaviy rejim
+    user_data[user_id]['bulk_mode'] = False
     
     text = "📝 <b>An'anaviy usulda so'z qo'shish</b>\n\n"
     text += "Quyidagi formatda yuboring:\n"
@@ -454,86 +329,275 @@ async def add_word_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='HTML')
 
-# Xabarlarni qayta ishlash
-async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+# Ko'p so'z qo'shish rejimi
+async def bulk_add_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    
+    user_id = query.from_user.id
+    user_data[user_id]['awaiting_word'] = True
+    user_data[user_id]['bulk_mode'] = True
+    
+    text = "📥 <b>Ko'p so'z qo'shish</b>\n\n"
+    text += "So'zlarni har birini yangi qatorda yuboring:\n"
+    text += "<code>apple\nbook\ncomputer</code>\n\n"
+    text += "Tarjimasi bilan ham yuborish mumkin:\n"
+    text += "<code>apple, olma\nbook, kitob, I read a book</code>\n\n"
+    text += "Yoki CSV/TXT fayl yuboring (masalan, <code>english,uzbek</code> ustunli fayl)."
+    
+    keyboard = [[InlineKeyboardButton("🏠 Bosh menyu", callback_data='menu')]]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='HTML')
+
+# Ro'yxat yoki fayldan so'zlarni qo'shish
+async def handle_bulk_import(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str, user_id: int):
+    entries = parse_bulk_text(text)
+    
+    if user_id in user_data:
+        user_data[user_id]['awaiting_word'] = False
+        user_data[user_id]['bulk_mode'] = False
+    
+    if not entries:
+        await update.effective_message.reply_text("❌ Ro'yxatda so'z topilmadi.")
+        return
+    
+    status = await update.effective_message.reply_text(
+        f"📥 {len(entries)} ta so'z qabul qilindi. Tarjima qilyapman..."
+    )
+    
+    # Lug'atda bor so'zlar uchun tarjima so'rovini yubormaymiz
+    known = vocabulary_words()
+    existing = [entry['word'] for entry in entries if word_key(entry['word']) in known]
+    entries = [entry for entry in entries if word_key(entry['word']) not in known]
+    
+    progress_task = None
+    
+    async def report_progress(done, total):
+        nonlocal progress_task
+        # Holat xabari fon ustuvorligida navbatga qo'yiladi - tarjima uni kutmaydi
+        if progress_task is None or progress_task.done():
+            progress_task = send_in_background(context.bot.edit_message_text(
+                f"🔍 Tarjima qilinmoqda: {done}/{total}",
+                chat_id=status.chat_id,
+                message_id=status.message_id,
+                rate_limit_args=PRIORITY_BACKGROUND
+            ))
+    
+    deferred = await translate_missing(entries, progress=report_progress, user_id=user_id)
+    
+    # Yakuniy natija eski holat xabari bilan almashib qolmasligi uchun
+    if progress_task is not None and not progress_task.done():
+        progress_task.cancel()
+    
+    translated = [entry for entry in entries if entry['translation']]
+    # Limit tufayli qoldirilganlar "tarjima topilmadi" qatoriga kirmaydi
+    deferred_words = [entry['word'] for entry in deferred]
+    pending = set(map(id, deferred))
+    failed = [entry['word'] for entry in entries if not entry['translation'] and id(entry) not in pending]
+    
+    # Hammasini bitta yozuv bilan saqlash
+    added, skipped = add_words_to_vocabulary(translated, user_id)
+    skipped = existing + skipped
+    
+    response = f"✅ Qo'shildi: {len(added)} ta so'z\n"
+    if skipped:
+        response += f"♻️ Allaqachon mavjud: {len(skipped)} ta\n"
+    if failed:
+        response += f"❌ Tarjima topilmadi: {len(failed)} ta\n"
+        response += ", ".join(failed[:20])
+        if len(failed) > 20:
+            response += ", ..."
+        response += "\n"
+    if deferred_words:
+        minutes = max(1, math.ceil(provider_router.user_wait(user_id, len(deferred_words)) / 60))
+        response += (f"⏳ Tarjima limiti tugadi, qo'shilmadi: {len(deferred_words)} ta. "
+                     f"Ro'yxatni {minutes} daqiqadan keyin qayta yuboring "
+                     f"(qo'shilganlari qayta tarjima qilinmaydi):\n")
+        response += ", ".join(deferred_words[:20])
+        if len(deferred_words) > 20:
+            response += ", ..."
+    
+    keyboard = [
+        [InlineKeyboardButton("📥 Yana so'z qo'shish", callback_data='bulk_add')],
+        [InlineKeyboardButton("🏠 Bosh menyu", callback_data='menu')]
+    ]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    await status.edit_text(response, reply_markup=reply_markup)
+
+# Yuborilgan CSV/TXT faylni qayta ishlash
+async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
+    document = update.effective_message.document
     
-    if user_id not in user_data:
-        user_data[user_id] = {
-            'learning_mode': False,
-            'test_mode': False,
-            'words_to_learn': [],
-            'test_words': [],
-            'current_word_index': 0,
-            'correct_answers': 0,
-            'awaiting_word': False,
-            'auto_add_mode': True  # Default - avtomatik rejim
-        }
-    
-    text = update.effective_message.text.strip()
-    
-    # Agar foydalanuvchi so'z qo'shish rejimida bo'lsa
-    if user_data[user_id].get('awaiting_word'):
-        # Avtomatik rejimda (faqat so'z)
-        if user_data[user_id].get('auto_add_mode', True):
-            # Faqat so'z kiritilgan (vergulsiz)
-            if ',' not in text:
-                word = text.strip()
-                if word:
-                    # So'zni avtomatik qo'shish
-                    await update.effective_message.reply_text(f"🔍 '{word}' so'zini tarjima qilyapman...")
-                    
-                    success, message = await auto_add_word(word, user_id, context)
-                    
-                    if success:
-                        user_data[user_id]['awaiting_word'] = False
-                        
-                        keyboard = [
-                            [InlineKeyboardButton("⚡ Yana so'z qo'shish", callback_data='auto_add')],
-                            [InlineKeyboardButton("🏠 Bosh menyu", callback_data='menu')]
-                        ]
-                        reply_markup = InlineKeyboardMarkup(keyboard)
-                        
-                        await update.effective_message.reply_text(message, reply_markup=reply_markup)
-                    elif message == "tarjima_topilmadi":
-                        # Tarjima topilmasa, foydalanuvchidan so'rash
-                        await update.effective_message.reply_text(
-                            f"❌ '{word}' so'zining tarjimasini topa olmadim.\n\n"
-                            f"Iltimos, tarjimasini ham kiriting:\n"
-                            f"<code>{word}, tarjima, misol (ixtiyoriy)</code>",
-                            parse_mode='HTML'
-                        )
-                        user_data[user_id]['auto_add_mode'] = False
+    if document.file_size and document.file_size > BULK_MAX_FILE_SIZE:
+        await update.effective_message.reply_text("❌ Fayl juda katta.")
+        return
+    
+    file = await context.bot.get_file(document.file_id)
+    data = await file.download_as_bytearray()
+    
+    await handle_bulk_import(update, context, decode_document(data), user_id)
+
+# Xabarlarni qayta ishlash
+async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    started = time.perf_counter()
+    # Metrikalar uchun yo'l: start, auto_add, suggestion, traditional, bulk yoki prompt
+    path = 'prompt'
+    try:
+        user_id = update.effective_user.id
+    
+        if user_id not in user_data:
+            user_data[user_id] = {
+                'learning_mode': False,
+                'test_mode': False,
+                'words_to_learn': [],
+                'test_words': [],
+                'current_word_index': 0,
+                'correct_answers': 0,
+                'awaiting_word': False,
+                'auto_add_mode': True,  # Default - avtomatik rejim
+                'bulk_mode': False
+            }
+    
+        text = update.effective_message.text.strip()
+    
+        # Agar foydalanuvchi so'z qo'shish rejimida bo'lsa
+        if user_data[user_id].get('awaiting_word'):
+            # Bir nechta qator - ko'p so'z qo'shish
+            if user_data[user_id].get('bulk_mode') or '\n' in text:
+                path = 'bulk'
+                await handle_bulk_import(update, context, text, user_id)
+        
+            # Avtomatik rejimda (faqat so'z)
+            elif user_data[user_id].get('auto_add_mode', True):
+                # Faqat so'z kiritilgan (vergulsiz)
+                if ',' not in text:
+                    word = text.strip()
+                    if word:
+                        # Lug'atdagi so'zga juda o'xshash bo'lsa - tarjima so'rovidan oldin so'raymiz
+                        suggestion = suggest_word(word)
+                        if suggestion:
+                            path = 'suggestion'
+                            await ask_suggestion(update, word, suggestion, user_id)
+                        else:
+                            path = 'auto_add'
+                            await process_auto_add(update, context, word, user_id)
                     else:
-                        await update.effective_message.reply_text(f"❌ {message}")
+                        await update.effective_message.reply_text("Iltimos, so'z kiriting.")
                 else:
-                    await update.effective_message.reply_text("Iltimos, so'z kiriting.")
+                    # Vergul bor - an'anaviy format
+                    path = 'traditional'
+                    await handle_traditional_format(update, context, text, user_id)
+        
             else:
-                # Vergul bor - an'anaviy format
+                # An'anaviy rejimda
+                path = 'traditional'
                 await handle_traditional_format(update, context, text, user_id)
-        
-        else:
-            # An'anaviy rejimda
-            await handle_traditional_format(update, context, text, user_id)
     
-    else:
-        # Agar foydalanuvchi oddiy xabar yuborsa
-        if text.lower() in ['/start', 'start', 'меню', 'menu']:
-            await start_command(update, context)
         else:
-            # Avtomatik rejimni taklif qilish
-            keyboard = [
-                [InlineKeyboardButton("⚡ Avtomatik qo'shish", callback_data='auto_add')],
-                [InlineKeyboardButton("📝 An'anaviy qo'shish", callback_data='add_word')],
-                [InlineKeyboardButton("🏠 Bosh menyu", callback_data='menu')]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            # Agar foydalanuvchi oddiy xabar yuborsa
+            if text.lower() in ['/start', 'start', 'меню', 'menu']:
+                path = 'start'
+                await start_command(update, context)
+            else:
+                # Avtomatik rejimni taklif qilish
+                keyboard = [
+                    [InlineKeyboardButton("⚡ Avtomatik qo'shish", callback_data='auto_add')],
+                    [InlineKeyboardButton("📝 An'anaviy qo'shish", callback_data='add_word')],
+                    [InlineKeyboardButton("🏠 Bosh menyu", callback_data='menu')]
+                ]
+                reply_markup = InlineKeyboardMarkup(keyboard)
             
-            await update.effective_message.reply_text(
-                f"'{text}' so'zini qo'shmoqchimisiz?\n"
-                "Quyidagi usullardan birini tanlang:",
-                reply_markup=reply_markup
-            )
+                await update.effective_message.reply_text(
+                    f"'{text}' so'zini qo'shmoqchimisiz?\n"
+                    "Quyidagi usullardan birini tanlang:",
+                    reply_markup=reply_markup
+                )
+    finally:
+        HANDLER_SECONDS.observe(time.perf_counter() - started, 'message', path)
+
+# So'zni avtomatik tarjima qilib qo'shish va natijani ko'rsatish
+async def process_auto_add(update: Update, context: ContextTypes.DEFAULT_TYPE, word: str, user_id: int):
+    # Lug'atda bor so'z uchun "tarjima qilyapman" xabari ham yuborilmaydi
+    if word_exists_in_vocabulary(word):
+        await update.effective_message.reply_text("❌ Bu so'z allaqachon mavjud")
+        return
+    
+    await update.effective_message.reply_text(f"🔍 '{word}' so'zini tarjima qilyapman...")
+    
+    success, message = await auto_add_word(word, user_id, context)
+    
+    if success:
+        user_data[user_id]['awaiting_word'] = False
+        
+        keyboard = [
+            [InlineKeyboardButton("⚡ Yana so'z qo'shish", callback_data='auto_add')],
+            [InlineKeyboardButton("🏠 Bosh menyu", callback_data='menu')]
+        ]
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        
+        await update.effective_message.reply_text(message, reply_markup=reply_markup)
+    elif message == "tarjima_topilmadi":
+        # Tarjima topilmasa, foydalanuvchidan so'rash
+        await update.effective_message.reply_text(
+            f"❌ '{word}' so'zining tarjimasini topa olmadim.\n\n"
+            f"Iltimos, tarjimasini ham kiriting:\n"
+            f"<code>{word}, tarjima, misol (ixtiyoriy)</code>",
+            parse_mode='HTML'
+        )
+        user_data[user_id]['auto_add_mode'] = False
+    else:
+        await update.effective_message.reply_text(f"❌ {message}")
+
+# "Siz ... demoqchimisiz?" taklifi
+async def ask_suggestion(update: Update, word: str, suggestion: str, user_id: int):
+    user_data[user_id]['pending_word'] = word
+    user_data[user_id]['pending_suggestion'] = suggestion
+    
+    keyboard = [
+        [InlineKeyboardButton(f"✅ Ha, '{suggestion}'", callback_data='suggest_accept')],
+        [InlineKeyboardButton(f"➕ Yo'q, '{word}' ni qo'shish", callback_data='suggest_reject')]
+    ]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    await update.effective_message.reply_text(
+        f"🤔 Siz '{suggestion}' demoqchimisiz?\n"
+        f"'{suggestion}' so'zi lug'atda allaqachon mavjud.",
+        reply_markup=reply_markup
+    )
+
+async def handle_suggestion(update: Update, context: ContextTypes.DEFAULT_TYPE, accepted: bool):
+    query = update.callback_query
+    await query.answer()
+    
+    user_id = query.from_user.id
+    
+    if user_id not in user_data or not user_data[user_id].get('pending_word'):
+        await query.edit_message_text("Xatolik! Iltimos, so'zni qaytadan yuboring.")
+        return
+    
+    word = user_data[user_id].pop('pending_word')
+    suggestion = user_data[user_id].pop('pending_suggestion', word)
+    
+    if accepted:
+        catalog = load_vocabulary()
+        row = catalog.find(suggestion)
+        translation = catalog.translations[row] if row is not None else ""
+        keyboard = [
+            [InlineKeyboardButton("⚡ Yana so'z qo'shish", callback_data='auto_add')],
+            [InlineKeyboardButton("🏠 Bosh menyu", callback_data='menu')]
+        ]
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        
+        await query.edit_message_text(
+            f"👍 '{suggestion}' so'zi lug'atda bor: {translation}",
+            reply_markup=reply_markup
+        )
+    else:
+        await query.edit_message_text(f"➕ '{word}' so'zini qo'shyapman...")
+        await process_auto_add(update, context, word, user_id)
 
 # An'anaviy formatni qayta ishlash
 async def handle_traditional_format(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str, user_id: int):
@@ -547,7 +611,7 @@ async def handle_traditional_format(update: Update, context: ContextTypes.DEFAUL
             example = parts[2] if len(parts) > 2 else ""
             
             # CSV ga qo'shish
-            success, message = add_word_to_vocabulary(word, translation, example)
+            success, message = await add_word_to_vocabulary(word, translation, example, user_id)
             
             user_data[user_id]['awaiting_word'] = False
             
@@ -585,6 +649,7 @@ async def handle_traditional_format(update: Update, context: ContextTypes.DEFAUL
 async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     data = query.data
+    started = time.perf_counter()
     
     try:
         if data == 'learn_10':
@@ -597,6 +662,8 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await add_word_command(update, context)
         elif data == 'auto_add':
             await enable_auto_add(update, context)
+        elif data == 'bulk_add':
+            await bulk_add_command(update, context)
         elif data == 'delete_word':
             await delete_word_menu(update, context)
         elif data == 'menu':
@@ -605,6 +672,12 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await show_stats(update, context)
         elif data == 'next_word':
             await handle_next_word(update, context)
+        elif data.startswith('next_'):
+            await handle_next_word(update, context, int(data[5:]))
+        elif data.startswith(('dp_', 'da_', 'dab_')) or data in ('dl', 'dj'):
+            await delete_word_menu(update, context, data)
+        elif data.startswith(('ds_', 'dc_')):
+            await delete_word_handler(update, context, word_id=int(data[3:]))
         elif data.startswith('delete_current_'):
             word = data.replace('delete_current_', '')
             await delete_word_handler(update, context, word)
@@ -613,16 +686,36 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await delete_word_handler(update, context, word)
         elif data.startswith('answer_'):
             await check_answer(update, context, data)
+        elif data in ('suggest_accept', 'suggest_reject'):
+            await handle_suggestion(update, context, data == 'suggest_accept')
         else:
             await query.edit_message_text("Noma'lum buyruq. Iltimos, /start buyrug'ini yuboring.")
     except Exception as e:
         print(f"Xatolik: {e}")
+        HANDLER_ERRORS.inc('button', callback_branch(data))
         await query.edit_message_text(
             f"Xatolik yuz berdi: {str(e)}\n\n"
             "Iltimos, /start buyrug'ini qayta yuboring."
         )
+    finally:
+        HANDLER_SECONDS.observe(time.perf_counter() - started, 'button', callback_branch(data))
+
+# Metrikalar uchun tugma turi (so'z yoki ID label ga tushmasligi uchun faqat ma'lum nomlar)
+CALLBACK_BRANCHES = {
+    'learn_10', 'learn_20', 'test', 'add_word', 'auto_add', 'bulk_add', 'delete_word', 'menu',
+    'stats', 'next_word', 'dl', 'dj', 'suggest_accept', 'suggest_reject'
+}
+CALLBACK_PREFIXES = ('dp_', 'dab_', 'da_', 'ds_', 'dc_', 'delete_current_', 'delete_select_', 'answer_', 'next_')
+
+def callback_branch(data):
+    if data in CALLBACK_BRANCHES:
+        return data
+    for prefix in CALLBACK_PREFIXES:
+        if data.startswith(prefix):
+            return prefix.rstrip('_')
+    return 'unknown'
 
-async def handle_next_word(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def handle_next_word(update: Update, context: ContextTypes.DEFAULT_TYPE, index=None):
     query = update.callback_query
     user_id = query.from_user.id
     
@@ -630,7 +723,20 @@ async def handle_next_word(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text("Xatolik! Iltimos, /start buyrug'ini qayta yuboring.")
         return
     
-    user_data[user_id]['current_word_index'] += 1
+    # Tugma ikki marta bosilgan bo'lsa (eski so'z tugmasi) - e'tiborsiz qoldiramiz
+    user_info = user_data[user_id]
+    if index is not None and (not user_info.get('learning_mode') or index != user_info['current_word_index']):
+        await query.answer()
+        return
+    
+    # Ko'rsatilgan so'z takrorlash jadvaliga qo'shiladi (baho faqat test javoblaridan)
+    words = user_info.get('words_to_learn', [])
+    if user_info['current_word_index'] < len(words):
+        word_id = words[user_info['current_word_index']]['id']
+        record_exposure(user_id, word_id)
+        event_log.record(VIEW, user_id, word_id=word_id)
+    
+    user_info['current_word_index'] += 1
     await show_next_word(update, context)
 
 # So'z yodlashni boshlash
@@ -645,30 +751,22 @@ async def start_learning(update: Update, context: ContextTypes.DEFAULT_TYPE, cou
         return
     
     # Foydalanuvchi lug'atini yuklash
-    user_df = load_user_vocabulary(user_id)
+    vocab = load_user_vocabulary(user_id)
     
-    if user_df.empty:
+    if not len(vocab):
         await query.edit_message_text("Sizda hali so'zlar mavjud emas. Avval so'z qo'shing.")
         return
     
-    # O'chirilmagan so'zlarni hisoblash
-    if 'deleted' in user_df.columns:
-        available_words = user_df[~user_df['deleted']]
-    else:
-        available_words = user_df
-    
-    if len(available_words) < count:
+    # O'chirilmagan so'zlar soni
+    if vocab.active_count < count:
         await query.edit_message_text(
-            f"Kechirasiz, sizda faqat {len(available_words)} ta so'z mavjud. "
+            f"Kechirasiz, sizda faqat {vocab.active_count} ta so'z mavjud. "
             f"Iltimos, avval yangi so'zlar qo'shing."
         )
         return
     
-    # Tasodifiy so'zlarni tanlash
-    if len(available_words) <= count:
-        words_to_learn = available_words.to_dict('records')
-    else:
-        words_to_learn = available_words.sample(n=count).to_dict('records')
+    # Takrorlash muddati kelgan va yangi so'zlarni tanlash
+    words_to_learn = [vocab.record(i) for i in pick_learn_words(vocab, count)]
     
     user_data[user_id]['learning_mode'] = True
     user_data[user_id]['test_mode'] = False
@@ -700,8 +798,8 @@ async def show_next_word(update: Update, context: ContextTypes.DEFAULT_TYPE):
             text += f"<b>Misol:</b> {word['example']}\n"
         
         keyboard = [
-            [InlineKeyboardButton("✅ Tushundim (Keyingisi)", callback_data='next_word')],
-            [InlineKeyboardButton("🗑️ Bu so'zni o'chirish", callback_data=f"delete_current_{word['word']}")]
+            [InlineKeyboardButton("✅ Tushundim (Keyingisi)", callback_data=f"next_{current_index}")],
+            [InlineKeyboardButton("🗑️ Bu so'zni o'chirish", callback_data=f"dc_{word['id']}")]
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
@@ -720,50 +818,153 @@ async def show_next_word(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text(text, reply_markup=reply_markup)
 
 # So'zni o'chirish menyusi
-async def delete_word_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def delete_word_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, view: str = None):
     query = update.callback_query
     await query.answer()
     
     user_id = query.from_user.id
-    user_df = load_user_vocabulary(user_id)
+    vocab = load_user_vocabulary(user_id)
     
-    if user_df.empty:
+    if not len(vocab):
         await query.edit_message_text("Sizda hali so'zlar mavjud emas.")
         return
     
-    # Faqat o'chirilmagan so'zlarni ko'rsatish
-    if 'deleted' in user_df.columns:
-        available_words = user_df[~user_df['deleted']].head(15)
-    else:
-        available_words = user_df.head(15)
-    
-    if available_words.empty:
+    if not vocab.active_count:
         await query.edit_message_text("Sizda o'chirish uchun so'zlar mavjud emas.")
         return
     
-    text = "🗑️ O'chirmoqchi bo'lgan so'zingizni tanlang:\n\n"
-    
-    keyboard = []
-    
-    for _, row in available_words.iterrows():
-        keyboard.append([InlineKeyboardButton(
-            f"{row['word']} - {row['translation']}",
-            callback_data=f"delete_select_{row['word']}"
-        )])
+    # Oxirgi ochilgan sahifaga qaytish (so'z o'chirilgandan keyin)
+    if view is None:
+        view = user_data[user_id].get('delete_view', 'dp_0') if user_id in user_data else 'dp_0'
+    if user_id in user_data:
+        user_data[user_id]['delete_view'] = view
+    
+    if view == 'dl':
+        text, keyboard = letter_picker(vocab)
+    elif view == 'dj':
+        text, keyboard = page_picker(vocab)
+    elif view.startswith('da'):
+        text, keyboard = alphabetical_page(vocab, view)
+    else:
+        text, keyboard = delete_page(vocab, int(view[3:] or 0))
     
     keyboard.append([InlineKeyboardButton("🏠 Bosh menyu", callback_data='menu')])
     reply_markup = InlineKeyboardMarkup(keyboard)
     
     await query.edit_message_text(text, reply_markup=reply_markup)
 
-async def delete_word_handler(update: Update, context: ContextTypes.DEFAULT_TYPE, word_to_delete):
+# O'chirish ro'yxatidagi so'z tugmasi (so'z ID orqali - callback_data 64 baytdan oshmaydi)
+def delete_button(vocab, i):
+    label = f"{vocab.word(i)} - {vocab.translation(i)}"
+    if len(label) > 60:
+        label = label[:57] + "..."
+    return [InlineKeyboardButton(label, callback_data=f"ds_{vocab.word_id(i)}")]
+
+# Oddiy tartibdagi sahifa: boshlanish nuqtasi Fenwick daraxti orqali - O(sahifa + log n)
+def delete_page(vocab, page):
+    pages = (vocab.active_count + DELETE_PAGE_SIZE - 1) // DELETE_PAGE_SIZE
+    page = max(0, min(page, pages - 1))
+    start = vocab.nth_active(page * DELETE_PAGE_SIZE)
+    items = list(islice(vocab.iter_active(start), DELETE_PAGE_SIZE))
+    
+    text = (f"🗑️ O'chirmoqchi bo'lgan so'zingizni tanlang:\n"
+            f"📚 {vocab.active_count} ta so'z, {page + 1}/{pages}-sahifa")
+    
+    keyboard = [delete_button(vocab, i) for i in items]
+    
+    navigation = []
+    if page > 0:
+        navigation.append(InlineKeyboardButton("⏮", callback_data='dp_0'))
+        navigation.append(InlineKeyboardButton("◀️", callback_data=f"dp_{page - 1}"))
+    navigation.append(InlineKeyboardButton(f"{page + 1}/{pages}", callback_data='dj'))
+    if page < pages - 1:
+        navigation.append(InlineKeyboardButton("▶️", callback_data=f"dp_{page + 1}"))
+        navigation.append(InlineKeyboardButton("⏭", callback_data=f"dp_{pages - 1}"))
+    keyboard.append(navigation)
+    keyboard.append([InlineKeyboardButton("🔤 Harf bo'yicha", callback_data='dl')])
+    return text, keyboard
+
+# Alifbo tartibidagi sahifa: da_{o'rin} - oldinga, dab_{o'rin} - o'rindan oldingi sahifa
+def alphabetical_page(vocab, view):
+    keys, order = vocab.sorted_order()
+    backward = view.startswith('dab_')
+    position = max(0, min(int(view.split('_')[1]), len(order)))
+    
+    def active(i):
+        return i < len(vocab) and vocab.is_active(i)
+    
+    items = []
+    if backward:
+        # Orqaga: o'rindan oldingi sahifa
+        last = position
+        while position > 0 and len(items) < DELETE_PAGE_SIZE:
+            position -= 1
+            if active(order[position]):
+                items.append(order[position])
+        items.reverse()
+    if not items:
+        # Oldinga (orqada so'z qolmagan bo'lsa - ro'yxat boshidan)
+        position = 0 if backward else position
+        last = position
+        while last < len(order) and len(items) < DELETE_PAGE_SIZE:
+            if active(order[last]):
+                items.append(order[last])
+            last += 1
+    
+    if not items:
+        return "🔤 Bu harf bilan boshlanadigan so'zlar yo'q.", [
+            [InlineKeyboardButton("🔤 Boshqa harf", callback_data='dl')]
+        ]
+    
+    text = (f"🗑️ O'chirmoqchi bo'lgan so'zingizni tanlang (alifbo tartibida):\n"
+            f"🔤 {keys[position][:1].upper()} - {keys[last - 1][:1].upper()}")
+    
+    keyboard = [delete_button(vocab, i) for i in items]
+    
+    navigation = []
+    if position > 0:
+        navigation.append(InlineKeyboardButton("◀️", callback_data=f"dab_{position}"))
+    navigation.append(InlineKeyboardButton("🔤", callback_data='dl'))
+    if last < len(order):
+        navigation.append(InlineKeyboardButton("▶️", callback_data=f"da_{last}"))
+    keyboard.append(navigation)
+    keyboard.append([InlineKeyboardButton("📄 Oddiy tartib", callback_data='dp_0')])
+    return text, keyboard
+
+# Harf tanlash: har bir harf alifbo tartibidagi o'ringa olib boradi (ikkilik qidiruv)
+def letter_picker(vocab):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    buttons = [
+        InlineKeyboardButton(letter.upper(), callback_data=f"da_{vocab.sorted_position(letter)}")
+        for letter in letters
+    ]
+    keyboard = [buttons[n:n + 7] for n in range(0, len(buttons), 7)]
+    keyboard.append([InlineKeyboardButton("📄 Oddiy tartib", callback_data='dp_0')])
+    return "🔤 Qaysi harfdan boshlanadigan so'zlarni ko'rsatay?", keyboard
+
+# Sahifaga o'tish: ro'yxat bo'ylab teng oraliqdagi sahifalar
+def page_picker(vocab):
+    pages = (vocab.active_count + DELETE_PAGE_SIZE - 1) // DELETE_PAGE_SIZE
+    targets = sorted({round(step * (pages - 1) / 9) for step in range(10)}) if pages > 1 else [0]
+    buttons = [InlineKeyboardButton(str(page + 1), callback_data=f"dp_{page}") for page in targets]
+    keyboard = [buttons[n:n + 5] for n in range(0, len(buttons), 5)]
+    return f"📄 Qaysi sahifaga o'tay? (jami {pages} ta)", keyboard
+
+async def delete_word_handler(update: Update, context: ContextTypes.DEFAULT_TYPE, word_to_delete=None, word_id=None):
     query = update.callback_query
     await query.answer()
     
     user_id = query.from_user.id
     
-    if delete_user_word(user_id, word_to_delete):
-        text = f"✅ '{word_to_delete}' so'zi sizning lug'atingizdan o'chirildi!"
+    if word_id is not None:
+        deleted_word = delete_user_word_by_id(user_id, word_id)
+    elif delete_user_word(user_id, word_to_delete):
+        deleted_word = word_to_delete
+    else:
+        deleted_word = None
+    
+    if deleted_word is not None:
+        text = f"✅ '{deleted_word}' so'zi sizning lug'atingizdan o'chirildi!"
         
         keyboard = [
             [InlineKeyboardButton("🗑️ Yana so'z o'chirish", callback_data='delete_word')],
@@ -773,34 +974,24 @@ async def delete_word_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         await query.edit_message_text(text, reply_markup=reply_markup)
     else:
-        await query.edit_message_text(f"❌ '{word_to_delete}' so'zi topilmadi.")
+        await query.edit_message_text(f"❌ So'z topilmadi.")
 
 async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
     
     user_id = query.from_user.id
-    user_df = load_user_vocabulary(user_id)
+    vocab = load_user_vocabulary(user_id)
     
-    if user_df.empty:
+    if not len(vocab):
         await query.edit_message_text("📊 Sizda hali so'zlar mavjud emas.")
         return
     
-    total_words = len(user_df)
-    
-    # 'learned' columni mavjudligini tekshirish
-    if 'learned' in user_df.columns:
-        learned_words = len(user_df[user_df['learned'] == True])
-    else:
-        learned_words = 0
-    
-    # 'deleted' columni mavjudligini tekshirish
-    if 'deleted' in user_df.columns:
-        deleted_words = len(user_df[user_df['deleted'] == True])
-        active_words = len(user_df[~user_df['deleted']])
-    else:
-        deleted_words = 0
-        active_words = total_words
+    # Hisoblagichlar so'z qo'shilganda, o'chirilganda va o'rganilganda yangilanadi - O(1)
+    total_words = len(vocab)
+    learned_words = vocab.learned_count
+    deleted_words = vocab.deleted_count
+    active_words = vocab.active_count
     
     text = f"📊 Shaxsiy statistika:\n\n"
     text += f"📚 Jami so'zlar: {total_words} ta\n"
@@ -809,25 +1000,11 @@ async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     text += f"📝 Faol so'zlar: {active_words} ta\n"
     
     # Oxirgi 5 ta qo'shilgan so'zlar
-    if 'added_date' in user_df.columns:
-        # O'chirilmagan so'zlarni olish
-        if 'deleted' in user_df.columns:
-            recent_df = user_df[~user_df['deleted']]
-        else:
-            recent_df = user_df
-            
-        if not recent_df.empty:
-            try:
-                # To'g'ri sort qilish
-                recent_df = recent_df.sort_values('added_date', ascending=False)
-                recent_words = recent_df.head(5)
-                
-                if len(recent_words) > 0:
-                    text += f"\n🆕 Oxirgi qo'shilgan so'zlar:\n"
-                    for _, row in recent_words.iterrows():
-                        text += f"• {row['word']} - {row['translation']}\n"
-            except Exception as e:
-                print(f"Statistika sort qilishda xato: {e}")
+    recent_words = vocab.recent_words(5)
+    if recent_words:
+        text += f"\n🆕 Oxirgi qo'shilgan so'zlar:\n"
+        for i in recent_words:
+            text += f"• {vocab.word(i)} - {vocab.translation(i)}\n"
     
     keyboard = [[InlineKeyboardButton("🏠 Bosh menyu", callback_data='menu')]]
     reply_markup = InlineKeyboardMarkup(keyboard)
@@ -845,25 +1022,21 @@ async def start_test(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text("Xatolik! Iltimos, /start buyrug'ini qayta yuboring.")
         return
     
-    user_df = load_user_vocabulary(user_id)
+    vocab = load_user_vocabulary(user_id)
     
-    if len(user_df) < 4:
+    if len(vocab) < 4:
         await query.edit_message_text("Test uchun kamida 4 ta so'z kerak.")
         return
     
-    # O'chirilmagan so'zlarni olish
-    if 'deleted' in user_df.columns:
-        available_words = user_df[~user_df['deleted']]
-    else:
-        available_words = user_df
-    
-    if len(available_words) < 4:
+    if vocab.active_count < 4:
         await query.edit_message_text("Test uchun kamida 4 ta faol so'z kerak.")
         return
     
-    test_words = available_words.sample(n=min(10, len(available_words))).to_dict('records')
+    # Butun test bir martada tayyorlanadi (savollar va variantlar)
+    test_words = build_quiz(vocab, pick_test_words(vocab, 10))
     
     user_data[user_id]['test_mode'] = True
+    user_data[user_id]['learning_mode'] = False
     user_data[user_id]['test_words'] = test_words
     user_data[user_id]['current_word_index'] = 0
     user_data[user_id]['correct_answers'] = 0
@@ -871,7 +1044,7 @@ async def start_test(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Birinchi test savolini ko'rsatish
     await show_next_test_question(update, context)
 
-async def show_next_test_question(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def show_next_test_question(update: Update, context: ContextTypes.DEFAULT_TYPE, verdict: str = ""):
     query = update.callback_query
     user_id = query.from_user.id
     
@@ -886,42 +1059,18 @@ async def show_next_test_question(update: Update, context: ContextTypes.DEFAULT_
     if current_index < len(test_words):
         current_word = test_words[current_index]
         
-        # 4 ta variant yaratish
-        options = [current_word['translation']]
-        
-        # Qolgan 3 ta noto'g'ri variant
-        user_df = load_user_vocabulary(user_id)
-        
-        # O'chirilmagan so'zlarni olish
-        if 'deleted' in user_df.columns:
-            other_words_df = user_df[~user_df['deleted']]
-        else:
-            other_words_df = user_df
-        
-        # Joriy so'zdan boshqa so'zlarni olish
-        other_words = other_words_df[other_words_df['word'] != current_word['word']]
-        
-        if len(other_words) >= 3:
-            wrong_options = other_words.sample(n=3)['translation'].tolist()
-        else:
-            # Agar yetarli so'z bo'lmasa, dummy variantlar
-            wrong_options = ["Noto'g'ri 1", "Noto'g'ri 2", "Noto'g'ri 3"]
-        
-        options.extend(wrong_options)
-        random.shuffle(options)
-        
-        # Tugmalar
+        # Variantlar test boshida tayyorlangan - bu yerda faqat ko'rsatamiz
         keyboard = []
-        for i, option in enumerate(options):
-            is_correct = 1 if option == current_word['translation'] else 0
+        for i, option in enumerate(current_word['options']):
             keyboard.append([InlineKeyboardButton(
                 option, 
-                callback_data=f"answer_{i}_{is_correct}"
+                callback_data=f"answer_{current_index}_{i}"
             )])
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        text = f"❓ Test {current_index + 1}/{len(test_words)}:\n\n"
+        text = f"{verdict}\n\n" if verdict else ""
+        text += f"❓ Test {current_index + 1}/{len(test_words)}:\n\n"
         text += f"<b>'{current_word['word']}'</b> so'zining tarjimasi?\n"
         
         await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='HTML')
@@ -930,7 +1079,8 @@ async def show_next_test_question(update: Update, context: ContextTypes.DEFAULT_
         correct = user_data[user_id]['correct_answers']
         total = len(test_words)
         
-        text = f"📊 Test yakunlandi!\n"
+        text = f"{verdict}\n\n" if verdict else ""
+        text += f"📊 Test yakunlandi!\n"
         text += f"✅ To'g'ri javoblar: {correct}/{total}\n"
         text += f"📈 Natija: {correct/total*100:.1f}%\n"
         
@@ -953,13 +1103,24 @@ async def check_answer(update: Update, context: ContextTypes.DEFAULT_TYPE, data:
         await query.edit_message_text("Xatolik! Iltimos, /start buyrug'ini qayta yuboring.")
         return
     
+    user_info = user_data[user_id]
     try:
-        _, _, is_correct = data.split('_')
-        is_correct = bool(int(is_correct))
+        _, question_index, option_index = data.split('_')
+        question_index = int(question_index)
+        option_index = int(option_index)
     except:
         await query.edit_message_text("Xatolik yuz berdi.")
         return
     
+    # Eski savol tugmasi bosilgan bo'lsa - e'tiborsiz qoldiramiz
+    if not user_info.get('test_mode') or question_index != user_info['current_word_index']:
+        return
+    
+    question = user_info['test_words'][question_index]
+    is_correct = option_index == question['answer']
+    record_review(user_id, question['id'], QUALITY_CORRECT if is_correct else QUALITY_WRONG)
+    event_log.record(ANSWER, user_id, word_id=question['id'], option=option_index, correct=is_correct)
+    
     if is_correct:
         user_data[user_id]['correct_answers'] += 1
         message = "✅ To'g'ri!"
@@ -968,8 +1129,85 @@ async def check_answer(update: Update, context: ContextTypes.DEFAULT_TYPE, data:
     
     user_data[user_id]['current_word_index'] += 1
     
-    await query.edit_message_text(message)
-    await show_next_test_question(update, context)
+    # Natija keyingi savol bilan bitta tahrirda ko'rsatiladi
+    await show_next_test_question(update, context, verdict=message)
+
+# Bot ishga tushganda fon vazifalarini boshlash
+async def on_startup(application):
+    user_cache.start()
+    user_data.start()
+    event_log.start()
+    register_metrics()
+    startup.mark('ready')
+
+# Fon vazifasi: metrikalar serveri va qizdirish (to'xtashda bekor qilinadi)
+background_task = None
+
+class BotApplication(Application):
+    """
+    PTB da start() dan keyingi hook yo'q: metrikalar serveri va qizdirish
+    update lar qabul qilina boshlagandan keyin ishga tushiriladi
+    """
+
+    async def start(self):
+        await super().start()
+        start_background()
+
+def start_background():
+    global background_task
+    startup.mark('running')
+    background_task = asyncio.create_task(run_background())
+
+async def run_background():
+    await metrics.start_server()
+    if startup.WARMUP:
+        await startup.warm_up(warm_up_steps())
+
+async def stop_background():
+    global background_task
+    if background_task is not None:
+        background_task.cancel()
+        try:
+            await background_task
+        except asyncio.CancelledError:
+            pass
+        background_task = None
+
+# Birinchi so'rovlarda kerak bo'ladigan ma'lumotlar: katalog va uning indekslari,
+# tarjimalar keshi, oflayn lug'at va test uchun numpy
+def warm_up_steps():
+    return [
+        ('catalog', lambda: load_vocabulary().warm_up()),
+        ('translation_cache', translation_cache.preload),
+        ('dictionary', get_dictionary),
+        ('numpy', lambda: asyncio.to_thread(importlib.import_module, 'numpy')),
+    ]
+
+# Sessiyalar, keshlar va navbat holati metrikalar sahifasida
+def register_metrics():
+    metrics.register_collector('lugat_sessions', user_data.stats, "Faol sessiyalar")
+    metrics.register_collector('lugat_user_cache', user_cache_stats, "Foydalanuvchi lug'atlari keshi")
+    metrics.register_collector('lugat_translation_cache', translation_cache.stats, "Tarjimalar keshi")
+    metrics.register_collector('lugat_outbox', rate_limiter.stats, "Chiquvchi xabarlar navbati")
+    metrics.register_collector('lugat_provider', provider_router.stats, "Tarjima provayderlari holati")
+    metrics.register_collector('lugat_updates', update_processor.stats, "Parallel update lar va foydalanuvchi navbatlari")
+    metrics.register_collector('lugat_startup', startup.stats, "Ishga tushish bosqichlari (jarayon boshidan, ms)")
+
+def user_cache_stats():
+    stats = user_cache.stats()
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+# Bot to'xtaganda resurslarni yopish
+async def on_shutdown(application):
+    await stop_background()
+    await metrics.stop_server()
+    await close_http_client()
+    await user_cache.stop()
+    await user_data.stop()
+    await event_log.stop()
+    storage.close()
 
 # Asosiy funksiya
 def main():
@@ -977,12 +1215,26 @@ def main():
  
     
     # Application yaratish
-    application = Application.builder().token(TOKEN).build()
+    application = (
+        Application.builder()
+        .application_class(BotApplication)
+        .token(TOKEN)
+        .base_url(TELEGRAM_API_URL)
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+        .rate_limiter(rate_limiter)
+        .concurrent_updates(update_processor)
+        .build()
+    )
     
     # Handlers
     application.add_handler(CommandHandler("start", start_command))
     application.add_handler(CallbackQueryHandler(button_handler))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    application.add_handler(MessageHandler(
+        filters.Document.FileExtension("csv") | filters.Document.FileExtension("txt"),
+        handle_document
+    ))
     
     # Botni ishga tushurish
     print("=" * 50)
@@ -990,7 +1242,11 @@ def main():
     print("📝 Endi faqat inglizcha so'z yozing (masalan: apple)")
     print("🤖 Bot avtomatik tarjima qilib CSV ga saqlaydi")
     print("=" * 50)
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if BOT_MODE == 'webhook':
+        from webhook import run_webhook
+        run_webhook(application)
+    else:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,204 @@
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Metrikalar serveri (Prometheus matn formati). METRICS_PORT=0 - o'chirilgan
+METRICS_LISTEN = os.getenv("METRICS_LISTEN", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+
+# Kechikish oraliqlari (soniya): 1 ms dan 10 s gacha
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_metrics = []
+_collectors = []
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """
+    Faqat o'suvchi hisoblagich (label qiymatlari bo'yicha)
+    """
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        _metrics.append(self)
+
+    def inc(self, *label_values, amount=1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'label_values', 'started')
+
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+        return False
+
+
+class Histogram:
+    """
+    Kechikish gistogrammasi: har bir kuzatuv - bitta bisect va ikkita qo'shish
+    """
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+        _metrics.append(self)
+
+    def observe(self, value, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            # [oraliqlar bo'yicha sonlar (+Inf bilan), yig'indi]
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def time(self, *label_values):
+        return _Timer(self, label_values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                labels = _format_labels(self.labels, label_values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def register_collector(prefix, collect, documentation=''):
+    """
+    Har so'rovda chaqiriladigan funksiya: {nom: son} lug'ati gauge sifatida chiqariladi
+    (masalan, sessions.stats, outbox.stats)
+    """
+    _collectors.append((prefix, collect, documentation))
+
+
+def render():
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for prefix, collect, documentation in _collectors:
+        try:
+            values = collect()
+        except Exception as e:
+            print(f"Metrikani yig'ishda xato ({prefix}): {e}")
+            continue
+        for key, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{prefix}_{key}"
+            if documentation:
+                lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+# Bot metrikalari
+HANDLER_SECONDS = Histogram(
+    'lugat_handler_seconds', "Update ni qayta ishlash vaqti", ('handler', 'branch'))
+HANDLER_ERRORS = Counter(
+    'lugat_handler_errors_total', "Handlerlardagi xatolar", ('handler', 'branch'))
+TRANSLATION_SECONDS = Histogram(
+    'lugat_translation_seconds', "Tarjima provayderi javob vaqti", ('provider', 'outcome'))
+TRANSLATION_SOURCE = Counter(
+    'lugat_translation_lookups_total', "Tarjima qayerdan olindi", ('source',))
+STORAGE_SECONDS = Histogram(
+    'lugat_storage_seconds', "Lug'atni yuklash/saqlash vaqti", ('operation',))
+
+
+def timed_provider(provider):
+    """
+    Tarjima provayderi funksiyasi uchun: vaqt va natija (ok, fail, cancelled)
+    """
+    def decorator(function):
+        @wraps(function)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = 'fail'
+            try:
+                result = await function(*args, **kwargs)
+                if result:
+                    outcome = 'ok'
+                return result
+            except asyncio.CancelledError:
+                # Hedged rejimda kechikkan provayder bekor qilinadi
+                outcome = 'cancelled'
+                raise
+            finally:
+                TRANSLATION_SECONDS.observe(time.perf_counter() - started, provider, outcome)
+        return wrapper
+    return decorator
+
+
+async def handle_metrics(request):
+    from aiohttp import web
+    return web.Response(text=render(), content_type='text/plain', charset='utf-8',
+                        headers={'X-Content-Type-Options': 'nosniff'})
+
+
+_runner = None
+
+
+async def start_server(listen=METRICS_LISTEN, port=METRICS_PORT, path=METRICS_PATH):
+    """
+    Metrikalar uchun alohida kichik HTTP server (faqat mahalliy manzilda)
+    """
+    global _runner
+    if not port or _runner is not None:
+        return
+    # aiohttp faqat server kerak bo'lganda yuklanadi
+    from aiohttp import web
+    app = web.Application()
+    app.router.add_get(path, handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, listen, port).start()
+    except OSError as e:
+        print(f"Metrikalar serverini ishga tushirishda xato: {e}")
+        await runner.cleanup()
+        return
+    _runner = runner
+    print(f"📈 Metrikalar: http://{listen}:{port}{path}")
+
+
+async def stop_server():
+    global _runner
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
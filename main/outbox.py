@@ -0,0 +1,214 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from datetime import timedelta
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+# Telegram cheklovlari: umumiy ~30 xabar/s, bitta chatga ~1 xabar/s, guruhga 20 xabar/daqiqa
+OUTBOX_GLOBAL_RATE = float(os.getenv("OUTBOX_GLOBAL_RATE", "28"))
+OUTBOX_GLOBAL_BURST = float(os.getenv("OUTBOX_GLOBAL_BURST", "30"))
+OUTBOX_CHAT_RATE = float(os.getenv("OUTBOX_CHAT_RATE", "1"))
+OUTBOX_CHAT_BURST = float(os.getenv("OUTBOX_CHAT_BURST", "3"))
+OUTBOX_GROUP_RATE = float(os.getenv("OUTBOX_GROUP_RATE", str(20 / 60)))
+# 429 (RetryAfter) dan keyin necha marta qayta urinish
+OUTBOX_MAX_RETRIES = int(os.getenv("OUTBOX_MAX_RETRIES", "3"))
+
+# Ustuvorlik: kichik son - oldinroq yuboriladi
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# Cheklov qo'llaniladigan (xabar yuboradigan) metodlar
+LIMITED_PREFIXES = ('send', 'edit', 'copy', 'forward', 'delete')
+
+
+class TokenBucket:
+    """
+    Token chelagi: tokenlar rate tezlikda to'ladi, capacity gacha yig'iladi
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self):
+        """
+        Keyingi token uchun kutish vaqti (token olinmaydi)
+        """
+        now = time.monotonic()
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def reserve(self):
+        """
+        Tokenni oldindan band qilish: navbatdagilar uchun kutish vaqti qaytariladi
+        (bir chatga yuborilgan xabarlar tartibi saqlanadi)
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, seconds):
+        # RetryAfter - bu vaqt davomida tokenlar berilmaydi
+        self.tokens = min(self.tokens, 1) - seconds * self.rate
+        self.updated = time.monotonic()
+
+    def idle(self, now):
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+def retry_seconds(error):
+    retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class OutboxRateLimiter(BaseRateLimiter):
+    """
+    Chiquvchi so'rovlar navbati: umumiy va har bir chat uchun token chelaklari,
+    ustuvorlik (interaktiv javoblar fon xabarlaridan oldin) va RetryAfter ga rioya.
+    rate_limit_args - ustuvorlik (PRIORITY_INTERACTIVE yoki PRIORITY_BACKGROUND)
+    """
+
+    def __init__(self, global_rate=OUTBOX_GLOBAL_RATE, global_burst=OUTBOX_GLOBAL_BURST,
+                 chat_rate=OUTBOX_CHAT_RATE, chat_burst=OUTBOX_CHAT_BURST, group_rate=OUTBOX_GROUP_RATE,
+                 max_retries=OUTBOX_MAX_RETRIES):
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self._chats = {}
+        self._waiters = []
+        self._counter = itertools.count()
+        self._dispatcher = None
+        # Ko'rsatkichlar
+        self.sent = 0
+        self.retries = 0
+        self.throttled = 0
+        self.chat_waiting = 0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Eski (to'lib qolgan) chelaklarni tozalash - lug'at cheksiz o'smasligi uchun
+            if len(self._chats) > 10000:
+                now = time.monotonic()
+                for key in [key for key, value in self._chats.items() if value.idle(now)]:
+                    del self._chats[key]
+            is_group = (isinstance(chat_id, int) and chat_id < 0) or str(chat_id).startswith('@')
+            rate = self.group_rate if is_group else self.chat_rate
+            bucket = self._chats[chat_id] = TokenBucket(rate, 1 if is_group else self.chat_burst)
+        return bucket
+
+    async def _acquire_global(self, priority):
+        # Navbat bo'sh va token bor - kutmasdan yuboramiz
+        if not self._waiters and self.global_bucket.delay() == 0:
+            self.global_bucket.take()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self):
+        # Tokenlarni ustuvorlik tartibida navbatdagilarga tarqatish
+        while self._waiters:
+            delay = self.global_bucket.delay()
+            if delay > 0:
+                self.throttled += 1
+                await asyncio.sleep(delay)
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.global_bucket.take()
+            future.set_result(None)
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        priority = rate_limit_args if rate_limit_args is not None else PRIORITY_INTERACTIVE
+        limited = endpoint.startswith(LIMITED_PREFIXES)
+        chat_id = data.get('chat_id')
+
+        for attempt in range(self.max_retries + 1):
+            if limited:
+                if chat_id is not None:
+                    delay = self._chat_bucket(chat_id).reserve()
+                    if delay > 0:
+                        self.chat_waiting += 1
+                        try:
+                            await asyncio.sleep(delay)
+                        finally:
+                            self.chat_waiting -= 1
+                await self._acquire_global(priority)
+
+            try:
+                result = await callback(*args, **kwargs)
+                self.sent += 1
+                return result
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                seconds = retry_seconds(e)
+                print(f"⏳ Telegram cheklovi: {seconds} soniya kutilmoqda ({endpoint})")
+                # Butun navbat to'xtatiladi, chat uchun ham
+                self.global_bucket.pause(seconds)
+                if chat_id is not None:
+                    self._chat_bucket(chat_id).pause(seconds)
+                if not limited:
+                    await asyncio.sleep(seconds)
+
+    def stats(self):
+        return {
+            'queue_depth': len(self._waiters),
+            'chat_waiting': self.chat_waiting,
+            'chats': len(self._chats),
+            'sent': self.sent,
+            'retries': self.retries,
+            'throttled': self.throttled,
+        }
+
+
+_background_tasks = set()
+
+
+def send_in_background(coroutine):
+    """
+    Natijasi kutilmaydigan xabarni navbatga qo'yish (masalan, holat xabarini yangilash)
+    """
+    async def run():
+        try:
+            await coroutine
+        except Exception as e:
+            print(f"Fon xabarini yuborishda xato: {e}")
+
+    task = asyncio.ensure_future(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
@@ -0,0 +1,239 @@
+import asyncio
+import os
+import time
+from outbox import TokenBucket
+
+# Circuit breaker: ketma-ket shuncha xatodan keyin provayder vaqtincha o'chiriladi
+PROVIDER_FAILURE_THRESHOLD = int(os.getenv("PROVIDER_FAILURE_THRESHOLD", "5"))
+# O'chirilgan provayder shuncha soniyadan keyin bitta sinov so'rovi bilan tekshiriladi;
+# sinov ham xato bo'lsa vaqt ikki barobar oshadi (PROVIDER_MAX_OPEN_SECONDS gacha)
+PROVIDER_OPEN_SECONDS = float(os.getenv("PROVIDER_OPEN_SECONDS", "30"))
+PROVIDER_MAX_OPEN_SECONDS = float(os.getenv("PROVIDER_MAX_OPEN_SECONDS", "600"))
+# Kechikish va xatolar ulushi uchun eksponensial o'rtacha koeffitsienti
+PROVIDER_EWMA_ALPHA = float(os.getenv("PROVIDER_EWMA_ALPHA", "0.2"))
+# Hali o'lchanmagan provayderning taxminiy kechikishi (soniya)
+PROVIDER_PRIOR_LATENCY = float(os.getenv("PROVIDER_PRIOR_LATENCY", "0.5"))
+# Shundan ko'p xato qiladigan yoki sekin provayder navbat oxiriga suriladi
+PROVIDER_DEGRADED_ERROR_RATE = float(os.getenv("PROVIDER_DEGRADED_ERROR_RATE", "0.3"))
+PROVIDER_DEGRADED_LATENCY = float(os.getenv("PROVIDER_DEGRADED_LATENCY", "2"))
+# Ishlatilmay turgan provayderning xatolar ulushi shu vaqtda yarmiga kamayadi (qayta sinash uchun)
+PROVIDER_ERROR_HALF_LIFE = float(os.getenv("PROVIDER_ERROR_HALF_LIFE", "60"))
+
+# Provayderlar byudjeti: Google - soniyasiga, MyMemory - kunlik kvota
+GOOGLE_RATE = float(os.getenv("GOOGLE_RATE", "5"))
+GOOGLE_BURST = float(os.getenv("GOOGLE_BURST", "20"))
+MYMEMORY_DAILY_QUOTA = float(os.getenv("MYMEMORY_DAILY_QUOTA", "1000"))
+# Bitta foydalanuvchi uchun tarmoq tarjimalari: daqiqasiga va zaxira
+USER_TRANSLATE_PER_MINUTE = float(os.getenv("USER_TRANSLATE_PER_MINUTE", "60"))
+USER_TRANSLATE_BURST = float(os.getenv("USER_TRANSLATE_BURST", "200"))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class ProviderError(Exception):
+    """
+    Provayder ishlamadi (tarmoq xatosi, 5xx, kvota tugagan) - circuit breaker uchun xato
+    """
+
+
+class TranslateLimitReached(Exception):
+    """
+    Foydalanuvchining tarmoq tarjimalari byudjeti tugadi - retry_after soniyadan keyin yana mumkin
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(f"Tarjima limiti tugadi ({retry_after:.0f} s)")
+        self.retry_after = retry_after
+
+
+class ProviderHealth:
+    """
+    Bitta provayder holati: o'rtacha kechikish, xatolar ulushi, circuit breaker va byudjet
+    """
+
+    __slots__ = ('name', 'budget', 'latency', 'error_rate', 'failures', 'state', 'updated',
+                 'opened_at', 'open_seconds', 'probing', 'calls', 'errors', 'rejected')
+
+    def __init__(self, name, budget):
+        self.name = name
+        self.budget = budget
+        self.latency = PROVIDER_PRIOR_LATENCY
+        self.error_rate = 0.0
+        self.updated = time.monotonic()
+        self.failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.open_seconds = PROVIDER_OPEN_SECONDS
+        self.probing = False
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+
+    def available(self, now):
+        if self.state == OPEN:
+            if now - self.opened_at < self.open_seconds:
+                return False
+            # Sinov vaqti keldi - bitta so'rov o'tkaziladi
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and self.probing:
+            return False
+        if self.budget.delay() > 0:
+            self.rejected += 1
+            return False
+        return True
+
+    def current_error_rate(self, now):
+        return self.error_rate * 0.5 ** ((now - self.updated) / PROVIDER_ERROR_HALF_LIFE)
+
+    def degraded(self, now):
+        return (self.current_error_rate(now) > PROVIDER_DEGRADED_ERROR_RATE
+                or self.latency > PROVIDER_DEGRADED_LATENCY)
+
+    def begin(self):
+        self.budget.take()
+        self.calls += 1
+        if self.state == HALF_OPEN:
+            self.probing = True
+
+    def _observe(self, seconds, failed):
+        alpha = PROVIDER_EWMA_ALPHA
+        now = time.monotonic()
+        self.latency += alpha * (seconds - self.latency)
+        self.error_rate = self.current_error_rate(now)
+        self.error_rate += alpha * ((1.0 if failed else 0.0) - self.error_rate)
+        self.updated = now
+
+    def success(self, seconds):
+        self._observe(seconds, False)
+        self.failures = 0
+        if self.state != CLOSED:
+            print(f"✅ Tarjima provayderi qayta ishlayapti: {self.name}")
+        self.state = CLOSED
+        self.open_seconds = PROVIDER_OPEN_SECONDS
+        self.probing = False
+
+    def failure(self, seconds):
+        self._observe(seconds, True)
+        self.errors += 1
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.open_seconds = min(self.open_seconds * 2, PROVIDER_MAX_OPEN_SECONDS)
+            self._open()
+        elif self.state == CLOSED and self.failures >= PROVIDER_FAILURE_THRESHOLD:
+            self._open()
+
+    def cancelled(self):
+        # Hedged rejimda bekor qilingan so'rov natija hisoblanmaydi
+        self.probing = False
+        if self.state == HALF_OPEN:
+            self.state = OPEN
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probing = False
+        print(f"⚠️ Tarjima provayderi {self.open_seconds:.0f} soniyaga o'chirildi: {self.name}")
+
+
+class ProviderRouter:
+    """
+    Tarjima provayderlarini holatiga qarab tartiblash: odatda berilgan tartibda,
+    sekin yoki ko'p xato qilayotgani oxirga suriladi; ishlamayotgan yoki byudjeti
+    tugagan provayderga so'rov yuborilmaydi (kutish vaqti yo'q)
+    """
+
+    def __init__(self, providers, user_rate=USER_TRANSLATE_PER_MINUTE / 60, user_burst=USER_TRANSLATE_BURST):
+        # providers: [(nom, funksiya, byudjet)] - standart tartibda
+        self.providers = {name: function for name, function, _ in providers}
+        self.health = {name: ProviderHealth(name, budget) for name, _, budget in providers}
+        self.order = [name for name, _, _ in providers]
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self._users = {}
+        self.user_rejected = 0
+
+    def user_allowed(self, user_id):
+        """
+        Foydalanuvchi byudjetidan bitta tarmoq tarjimasini olish
+        """
+        if user_id is None:
+            return True
+        bucket = self._users.get(user_id)
+        if bucket is None:
+            # To'lib qolgan chelaklarni tozalash - lug'at cheksiz o'smasligi uchun
+            if len(self._users) > 10000:
+                now = time.monotonic()
+                for key in [key for key, value in self._users.items() if value.idle(now)]:
+                    del self._users[key]
+            bucket = self._users[user_id] = TokenBucket(self.user_rate, self.user_burst)
+        if bucket.delay() > 0:
+            self.user_rejected += 1
+            return False
+        bucket.take()
+        return True
+
+    def user_wait(self, user_id, count=1):
+        """
+        Foydalanuvchi byudjetida count ta tarjima to'planguncha kutish vaqti (soniya)
+        """
+        bucket = self._users.get(user_id)
+        if bucket is None:
+            return 0.0
+        return bucket.delay() + max(0, min(count, self.user_burst) - 1) / self.user_rate
+
+    def plan(self):
+        """
+        Hozir so'rov yuborish mumkin bo'lgan provayderlar, sog'lomlari birinchi
+        """
+        now = time.monotonic()
+        available = [name for name in self.order if self.health[name].available(now)]
+        # sorted barqaror - bir xil holatdagilar berilgan tartibda qoladi
+        return sorted(available, key=lambda name: self.health[name].degraded(now))
+
+    async def call(self, name, *args):
+        """
+        Provayderni chaqirish va natijani qayd qilish.
+        Qaytaradi: (tarjima, javob_berdi) - xato bo'lsa (None, False)
+        """
+        health = self.health[name]
+        health.begin()
+        started = time.perf_counter()
+        try:
+            result = await self.providers[name](*args)
+        except asyncio.CancelledError:
+            health.cancelled()
+            raise
+        except Exception as e:
+            # Kutilmagan xato ham provayder xatosi - circuit breaker uni hisobga oladi
+            if not isinstance(e, ProviderError):
+                print(f"Tarjima provayderi xatosi ({name}): {e!r}")
+            health.failure(time.perf_counter() - started)
+            return None, False
+        finally:
+            # Sinov so'rovi qanday tugamasin, keyingisiga yo'l ochiladi
+            health.probing = False
+        health.success(time.perf_counter() - started)
+        return result, True
+
+    def stats(self):
+        stats = {'user_rejected': self.user_rejected, 'users': len(self._users)}
+        states = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+        for name, health in self.health.items():
+            stats[f"{name}_state"] = states[health.state]
+            stats[f"{name}_latency_ms"] = round(health.latency * 1000, 1)
+            stats[f"{name}_error_rate"] = round(health.current_error_rate(time.monotonic()), 3)
+            stats[f"{name}_calls"] = health.calls
+            stats[f"{name}_errors"] = health.errors
+            stats[f"{name}_budget_rejected"] = health.rejected
+        return stats
+
+
+def google_budget():
+    return TokenBucket(GOOGLE_RATE, GOOGLE_BURST)
+
+
+def mymemory_budget():
+    # Kunlik kvota kun davomida bir tekis to'ladi
+    return TokenBucket(MYMEMORY_DAILY_QUOTA / 86400, MYMEMORY_DAILY_QUOTA)
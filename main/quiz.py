@@ -0,0 +1,100 @@
+import os
+
+# Har bir savoldagi variantlar soni
+QUIZ_OPTIONS = 4
+# Noto'g'ri variantlarni o'xshash so'zlardan tanlash (1 - yoqilgan)
+QUIZ_SIMILAR_DISTRACTORS = os.getenv("QUIZ_SIMILAR_DISTRACTORS", "1") == "1"
+# Variantlar qidiriladigan so'zlar soni (katta lug'atda tasodifiy qism olinadi)
+QUIZ_CANDIDATE_POOL = int(os.getenv("QUIZ_CANDIDATE_POOL", "256"))
+
+# Yetarli so'z bo'lmaganda ishlatiladigan variantlar
+DUMMY_OPTIONS = ["Noto'g'ri 1", "Noto'g'ri 2", "Noto'g'ri 3"]
+
+
+def _word_features(words):
+    """
+    So'zlar uchun arzon o'xshashlik belgilari: uzunlik, birinchi 2 harf kodi
+    va harf juftliklari (bigram) 64 bitli niqobi
+    """
+    import numpy as np
+    lengths = np.fromiter((len(w) for w in words), dtype=np.int32, count=len(words))
+    prefixes = np.fromiter((hash(w[:2]) & 0x7FFFFFFF for w in words), dtype=np.int64, count=len(words))
+    masks = np.zeros(len(words), dtype=np.uint64)
+    for n, w in enumerate(words):
+        mask = 0
+        for a, b in zip(w, w[1:]):
+            mask |= 1 << ((ord(a) * 31 + ord(b)) & 63)
+        masks[n] = mask
+    return lengths, prefixes, masks
+
+
+def _similarity(question_words, candidate_words):
+    """
+    Savollar x nomzodlar o'xshashlik matritsasi (bitta vektorli hisob)
+    """
+    import numpy as np
+    q_len, q_prefix, q_mask = _word_features(question_words)
+    c_len, c_prefix, c_mask = _word_features(candidate_words)
+
+    shared_bigrams = np.bitwise_count(q_mask[:, None] & c_mask[None, :]).astype(np.float32)
+    same_prefix = (q_prefix[:, None] == c_prefix[None, :]).astype(np.float32)
+    length_gap = np.abs(q_len[:, None] - c_len[None, :]).astype(np.float32)
+    return 2.0 * shared_bigrams + 3.0 * same_prefix - 0.5 * length_gap
+
+
+def build_quiz(vocab, question_indices, similar=QUIZ_SIMILAR_DISTRACTORS, rng=None):
+    """
+    Butun testni oldindan tayyorlash: har bir savol uchun aralashtirilgan variantlar
+    va to'g'ri javob raqami. Keyingi javoblar faqat xotiradagi holat bilan ishlaydi
+    """
+    # numpy faqat test tuzishda kerak - bot ishga tushishini sekinlashtirmaydi
+    import numpy as np
+    rng = rng if rng is not None else np.random.default_rng()
+    if not question_indices:
+        return []
+
+    # Faol so'zlar (katta lug'atda tasodifiy qismi) - variantlar shu yerdan olinadi
+    active = np.flatnonzero(np.frombuffer(vocab.deleted, dtype=np.uint8) == 0)
+    if len(active) > QUIZ_CANDIDATE_POOL:
+        active = rng.choice(active, size=QUIZ_CANDIDATE_POOL, replace=False)
+
+    question_words = [vocab.word(i).lower() for i in question_indices]
+    candidate_words = [vocab.word(i).lower() for i in active]
+    candidate_translations = [vocab.translation(i) for i in active]
+
+    # O'xshashlik (yoqilgan bo'lsa) + tasodifiy shovqin - har safar bir xil variantlar chiqmasligi uchun
+    noise = rng.random((len(question_indices), len(active)), dtype=np.float32)
+    if similar and len(active):
+        scores = _similarity(question_words, candidate_words) + 2.0 * noise
+    else:
+        scores = noise
+    order = np.argsort(-scores, axis=1)
+
+    quiz = []
+    for q, i in enumerate(question_indices):
+        translation = vocab.translation(i)
+        options = [translation]
+        used = {translation}
+        for c in order[q]:
+            if len(options) == QUIZ_OPTIONS:
+                break
+            option = candidate_translations[c]
+            if active[c] == i or question_words[q] == candidate_words[c] or option in used:
+                continue
+            used.add(option)
+            options.append(option)
+
+        if len(options) < QUIZ_OPTIONS:
+            # Agar yetarli so'z bo'lmasa, dummy variantlar
+            options = [translation] + DUMMY_OPTIONS
+
+        permutation = rng.permutation(len(options))
+        quiz.append({
+            'id': vocab.word_id(i),
+            'word': vocab.word(i),
+            'translation': translation,
+            'options': [options[p] for p in permutation],
+            'answer': int(np.flatnonzero(permutation == 0)[0])
+        })
+
+    return quiz
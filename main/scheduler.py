@@ -0,0 +1,96 @@
+import os
+import time
+from datetime import datetime
+
+# SM-2 sozlamalari
+SRS_DEFAULT_EASE = 2.5
+SRS_MIN_EASE = 1.3
+# Xato javobdan keyin so'z qancha vaqtdan so'ng qayta so'raladi (soniya)
+SRS_RELEARN_DELAY = float(os.getenv("SRS_RELEARN_DELAY", "600"))
+# Yangi so'z birinchi marta ko'rsatilgandan keyin qancha vaqtda testga chiqadi (soniya)
+SRS_FIRST_DELAY = float(os.getenv("SRS_FIRST_DELAY", "600"))
+# Interval shu kundan oshsa so'z "o'rganilgan" hisoblanadi
+SRS_LEARNED_INTERVAL = float(os.getenv("SRS_LEARNED_INTERVAL", "21"))
+
+DAY = 24 * 60 * 60
+
+# Javob sifati (SM-2 shkalasi 0-5)
+QUALITY_WRONG = 1
+QUALITY_CORRECT = 4
+
+
+def review(vocab, i, quality, now=None):
+    """
+    So'z takrorlangandan keyingi yangi progress (SM-2).
+    Faqat o'zgargan maydonlarni qaytaradi - ular storage ga yoziladi
+    """
+    now = time.time() if now is None else now
+    ease = vocab.ease[i] or SRS_DEFAULT_EASE
+    interval = vocab.interval[i]
+
+    if quality < 3:
+        # Xato - so'z qaytadan o'rganiladi
+        interval = 0.0
+        ease = max(SRS_MIN_EASE, ease - 0.2)
+        due = now + SRS_RELEARN_DELAY
+    else:
+        if interval < 1:
+            interval = 1.0
+        elif interval < 6:
+            interval = 6.0
+        else:
+            interval = interval * ease
+        ease = max(SRS_MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        due = now + interval * DAY
+
+    changes = {
+        'seen_count': vocab.seen_count[i] + 1,
+        'last_seen': datetime.fromtimestamp(now).isoformat(),
+        'ease': round(ease, 3),
+        'interval': round(interval, 3),
+        'due': due,
+        'learned': interval >= SRS_LEARNED_INTERVAL
+    }
+    if quality >= QUALITY_CORRECT:
+        changes['correct_count'] = vocab.correct_count[i] + 1
+    return changes
+
+
+def introduce(vocab, i, now=None):
+    """
+    So'z yodlash rejimida ko'rsatildi: bu javob emas, shuning uchun ease va interval
+    o'zgarmaydi. Hali jadvalda bo'lmagan so'z tez orada testga chiqadigan qilib qo'yiladi
+    """
+    now = time.time() if now is None else now
+    changes = {
+        'seen_count': vocab.seen_count[i] + 1,
+        'last_seen': datetime.fromtimestamp(now).isoformat()
+    }
+    if not vocab.due[i]:
+        changes['due'] = now + SRS_FIRST_DELAY
+    return changes
+
+
+def pick_learn_words(vocab, k, now=None):
+    """
+    Yodlash uchun so'zlar: avval muddati o'tganlar, keyin yangi so'zlar,
+    yetmasa - muddati eng yaqinlari
+    """
+    now = time.time() if now is None else now
+    chosen = vocab.most_due(k, until=now)
+    chosen += vocab.sample_new(k - len(chosen), exclude=chosen)
+    if len(chosen) < k:
+        chosen += [i for i in vocab.most_due(k) if i not in chosen][:k - len(chosen)]
+    return chosen
+
+
+def pick_test_words(vocab, k):
+    """
+    Test uchun so'zlar: avval ko'rilgan so'zlar muddati bo'yicha,
+    yetmasa - tasodifiy faol so'zlar
+    """
+    chosen = vocab.most_due(k)
+    if len(chosen) < k:
+        taken = set(chosen)
+        chosen += [i for i in vocab.sample_active(k) if i not in taken][:k - len(chosen)]
+    return chosen
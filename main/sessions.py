@@ -0,0 +1,235 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+# Sessiya keshi sozlamalari
+SESSION_MAX_USERS = int(os.getenv("SESSION_MAX_USERS", "10000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(32 * 1024 * 1024)))
+# Shuncha vaqt ishlatilmagan sessiya xotiradan chiqariladi (diskda qoladi)
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "900"))
+# Diskdagi sessiya shundan eski bo'lsa tiklanmaydi (yangi sessiya boshlanadi)
+SESSION_MAX_AGE = float(os.getenv("SESSION_MAX_AGE", str(7 * 24 * 60 * 60)))
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "10"))
+
+
+class _SessionData(dict):
+    """
+    Sessiya lug'ati: har qanday o'zgarish sessiyani saqlanadigan deb belgilaydi.
+    Ichki ro'yxatlar (words_to_learn, test_words) joyida emas, butunlay almashtiriladi
+    """
+
+    __slots__ = ('session',)
+
+    def __init__(self, session, data):
+        super().__init__(data)
+        self.session = session
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.session.dirty = True
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.session.dirty = True
+
+    def pop(self, key, *default):
+        if key in self:
+            self.session.dirty = True
+        return super().pop(key, *default)
+
+    def popitem(self):
+        self.session.dirty = True
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.session.dirty = True
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.session.dirty = True
+
+    def clear(self):
+        super().clear()
+        self.session.dirty = True
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+
+class _Session:
+    __slots__ = ('data', 'dirty', 'last_access', 'size')
+
+    def __init__(self, data):
+        self.data = _SessionData(self, data)
+        self.dirty = False
+        self.last_access = time.monotonic()
+        self.size = _estimate_size(data)
+
+
+def _estimate_size(data):
+    # So'zlar ro'yxatlari sessiya hajmining asosiy qismi
+    words = len(data.get('words_to_learn', ())) + len(data.get('test_words', ()))
+    return 600 + 250 * words
+
+
+class SessionStore:
+    """
+    Foydalanuvchi sessiyalari: xotirada cheklangan LRU, diskda doimiy nusxa.
+    Dict kabi ishlatiladi (user_id in store, store[user_id]); kerak bo'lganda
+    sessiya diskdan tiklanadi, o'zgarishlar esa vaqti-vaqti bilan yoziladi
+    """
+
+    def __init__(self, storage, max_users=SESSION_MAX_USERS, max_bytes=SESSION_MAX_BYTES,
+                 idle_ttl=SESSION_IDLE_TTL, max_age=SESSION_MAX_AGE, flush_interval=SESSION_FLUSH_INTERVAL):
+        self.storage = storage
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self._sessions = OrderedDict()
+        self._bytes = 0
+        self._task = None
+        self.restored = 0
+
+    def _load(self, user_id):
+        session = self._sessions.get(user_id)
+        if session is not None:
+            self._sessions.move_to_end(user_id)
+            return session
+
+        # Xotirada yo'q - diskdan tiklash
+        try:
+            stored = self.storage.load_session(user_id)
+        except Exception as e:
+            print(f"Sessiyani yuklashda xato: {e}")
+            stored = None
+        if stored is None:
+            return None
+        data, saved_at = stored
+        if time.time() - saved_at > self.max_age:
+            return None
+
+        self.restored += 1
+        return self._insert(user_id, data)
+
+    def _insert(self, user_id, data):
+        session = _Session(data)
+        old = self._sessions.pop(user_id, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._sessions[user_id] = session
+        self._bytes += session.size
+        self._evict_over_budget(keep=user_id)
+        return session
+
+    def __contains__(self, user_id):
+        return self._load(user_id) is not None
+
+    def __getitem__(self, user_id):
+        session = self._load(user_id)
+        if session is None:
+            raise KeyError(user_id)
+        # Faqat o'qilgan sessiya diskka qayta yozilmaydi - dirty o'zgarishda belgilanadi
+        session.last_access = time.monotonic()
+        self._resize(session)
+        return session.data
+
+    def _resize(self, session):
+        self._bytes -= session.size
+        session.size = _estimate_size(session.data)
+        self._bytes += session.size
+
+    def __setitem__(self, user_id, data):
+        session = self._insert(user_id, data)
+        session.dirty = True
+
+    def get(self, user_id, default=None):
+        return self[user_id] if user_id in self else default
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _write_back(self, sessions):
+        dirty = {user_id: session for user_id, session in sessions if session.dirty}
+        if not dirty:
+            return
+        try:
+            self.storage.save_sessions({user_id: session.data for user_id, session in dirty.items()})
+            for session in dirty.values():
+                session.dirty = False
+        except Exception as e:
+            print(f"Sessiyalarni saqlashda xato: {e}")
+
+    def _evict(self, user_ids):
+        sessions = [(user_id, self._sessions.pop(user_id)) for user_id in user_ids]
+        self._write_back(sessions)
+        for _, session in sessions:
+            self._bytes -= session.size
+
+    def _evict_over_budget(self, keep=None):
+        over = []
+        count = len(self._sessions)
+        size = self._bytes
+        for user_id, session in self._sessions.items():
+            if count <= self.max_users and size <= self.max_bytes:
+                break
+            if user_id == keep:
+                continue
+            over.append(user_id)
+            count -= 1
+            size -= session.size
+        if over:
+            self._evict(over)
+
+    def evict_idle(self):
+        """
+        Uzoq vaqt ishlatilmagan sessiyalarni xotiradan chiqarish (avval saqlanadi)
+        """
+        deadline = time.monotonic() - self.idle_ttl
+        idle = [user_id for user_id, session in self._sessions.items() if session.last_access < deadline]
+        if idle:
+            self._evict(idle)
+
+    def flush(self):
+        """
+        O'zgargan sessiyalarni bitta amal bilan diskka yozish
+        """
+        # O'qilgandan keyin o'zgargan sessiyalar hajmi yangilanadi
+        for session in self._sessions.values():
+            if session.dirty:
+                self._resize(session)
+        self._write_back(list(self._sessions.items()))
+        self._evict_over_budget()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+            self.evict_idle()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.flush()
+
+    def stats(self):
+        return {
+            'sessions': len(self._sessions),
+            'bytes': self._bytes,
+            'dirty': sum(1 for session in self._sessions.values() if session.dirty),
+            'restored': self.restored,
+        }
@@ -0,0 +1,136 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Ishga tushgandan keyin hot ma'lumotlarni fonda oldindan yuklash (1 - yoqilgan)
+WARMUP = os.getenv("WARMUP", "1") == "1"
+
+
+def _process_age():
+    # Interpretator ishga tushganidan beri o'tgan vaqt (Linux; boshqa tizimlarda 0)
+    try:
+        with open('/proc/self/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK'))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+# Jarayon boshlangan vaqt (perf_counter shkalasida)
+STARTED = time.perf_counter() - _process_age()
+
+_marks = {}
+
+
+def mark(name):
+    """
+    Ishga tushish bosqichini qayd qilish (jarayon boshidan, ms)
+    """
+    if name not in _marks:
+        _marks[name] = (time.perf_counter() - STARTED) * 1000
+
+
+def first_update():
+    """
+    Birinchi update qayta ishlanganda chaqiriladi - ishga tushish hisoboti chiqariladi
+    """
+    if 'first_update' in _marks:
+        return
+    mark('first_update')
+    print("⏱ Ishga tushish (ms): " + ", ".join(f"{name} {value:.0f}" for name, value in _marks.items()))
+
+
+def stats():
+    return {f"{name}_ms": round(value, 1) for name, value in _marks.items()}
+
+
+async def warm_up(steps):
+    """
+    Hot ma'lumotlarni birma-bir yuklash: steps - [(nom, funksiya)], funksiya oddiy
+    yoki async bo'lishi mumkin. Bitta qadamdagi xato qolganlarini to'xtatmaydi
+    """
+    timings = []
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            result = step()
+            if hasattr(result, '__await__'):
+                await result
+        except Exception as e:
+            print(f"Qizdirishda xato ({name}): {e}")
+            continue
+        timings.append(f"{name} {(time.perf_counter() - started) * 1000:.0f}")
+    mark('warm_up')
+    print("🔥 Qizdirish (ms): " + ", ".join(timings))
+
+
+def parse_importtime(output):
+    """
+    -X importtime chiqishini o'qish: [(chuqurlik, modul, o'z vaqti, jami vaqt)] (mikrosoniya)
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # Chuqurlik: nomdan oldingi bo'sh joylar (har daraja - 2 ta)
+        rows.append(((len(name) - len(name.lstrip()) - 1) // 2, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_report(module='main', top=15):
+    """
+    Modulni alohida jarayonda -X importtime bilan yuklab, vaqtni paketlar va
+    modulning bevosita importlari bo'yicha chiqarish
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [directory, os.getenv('PYTHONPATH')])))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            env=environment, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        return None
+    rows = parse_importtime(result.stderr)
+
+    packages = {}
+    for _, name, self_us, _ in rows:
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+    # Bola modullar otasidan oldin chiqadi: modulning bevosita importlari - uning
+    # qatoridan oldingi, oldingi 0-darajali qatorgacha bo'lgan 1-darajali qatorlar
+    total = 0
+    direct = []
+    for depth, name, _, cumulative in rows:
+        if depth == 0:
+            if name == module:
+                total = cumulative
+                break
+            direct = []
+        elif depth == 1:
+            direct.append((name, cumulative))
+
+    print(f"{module}: {total / 1000:.1f} ms")
+    print("\nPaketlar (o'z vaqti):")
+    for name, value in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:<28} {value / 1000:8.1f} ms")
+    print(f"\n{module} importlari (jami vaqt):")
+    for name, value in sorted(direct, key=lambda item: -item[1])[:top]:
+        print(f"  {name:<28} {value / 1000:8.1f} ms")
+    return {'total_ms': total / 1000, 'packages': packages, 'direct': dict(direct)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ishga tushish vaqti: importlar hisoboti")
+    parser.add_argument('--module', default='main')
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+    if import_report(args.module, args.top) is None:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
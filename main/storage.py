@@ -0,0 +1,830 @@
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from vocab import Catalog, UserVocabulary, PROGRESS_DEFAULTS, word_key
+from locks import file_lock
+
+# Takrorlash jadvali maydonlari (haqiqiy sonlar)
+SCHEDULE_FIELDS = ('ease', 'interval', 'due')
+
+# Saqlash sozlamalari
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "file")
+CSV_FILE = os.getenv("VOCABULARY_CSV", "vocabulary.csv")
+USER_WORDS_FILE = 'user_vocabulary_{}.json'
+SQLITE_FILE = os.getenv("SQLITE_FILE", "vocabulary.db")
+# Foydalanuvchi o'zgarishlari jurnali (FileStorage uchun)
+# (ko'p jarayonli rejimda har bir worker o'z jurnaliga yozadi)
+JOURNAL_FILE = os.getenv("JOURNAL_FILE", "user_vocabulary.journal")
+SESSION_DIR = os.getenv("SESSION_DIR", "sessions")
+JOURNAL_FSYNC_INTERVAL = float(os.getenv("JOURNAL_FSYNC_INTERVAL", "1.0"))
+JOURNAL_FSYNC_BATCH = int(os.getenv("JOURNAL_FSYNC_BATCH", "64"))
+JOURNAL_COMPACT_BYTES = int(os.getenv("JOURNAL_COMPACT_BYTES", str(4 * 1024 * 1024)))
+
+# Asosiy lug'at (katalog) ustunlari
+VOCAB_COLUMNS = ['id', 'word', 'translation', 'example', 'added_date']
+
+
+def apply_progress_change(overlay, word_id, changes):
+    """
+    Bitta so'z o'zgarishini foydalanuvchi progressiga qo'llash
+    """
+    if word_id < 0:
+        for word_data in overlay.setdefault('words', []):
+            if word_data.get('id') == word_id:
+                word_data.update(changes)
+    else:
+        progress = overlay.setdefault('progress', {})
+        progress.setdefault(str(word_id), {}).update(changes)
+
+
+def sql_value(field, value):
+    """
+    Progress maydonini SQLite ustuni turiga aylantirish
+    """
+    if field == 'last_seen':
+        return value
+    if field in SCHEDULE_FIELDS:
+        return float(value or 0)
+    return int(value)
+
+
+def write_file_atomic(path, data):
+    """
+    Faylni vaqtinchalik faylga yozib, keyin atomik almashtirish
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def progress_changes(row):
+    """
+    Yozuvdagi progress maydonlaridan faqat standartdan farq qiladiganlarini olish
+    """
+    changes = {}
+    for field, default in PROGRESS_DEFAULTS.items():
+        value = row.get(field, default)
+        if field in ('learned', 'deleted'):
+            value = bool(value)
+        elif field in ('seen_count', 'correct_count'):
+            value = int(value)
+        elif field in SCHEDULE_FIELDS:
+            value = float(value or 0)
+        elif not isinstance(value, str):
+            value = None
+        if value != default:
+            changes[field] = value
+    return changes
+
+
+class Storage:
+    """
+    Lug'at saqlash interfeysi. Handlerlar faqat shu metodlardan foydalanadi
+    """
+
+    # --- Katalog (asosiy lug'at) ---
+
+    def load_catalog(self):
+        raise NotImplementedError
+
+    def add_catalog_words(self, new_words):
+        """
+        Yangi so'zlarga ID berib saqlash
+        """
+        raise NotImplementedError
+
+    def delete_catalog_word(self, word):
+        raise NotImplementedError
+
+    def catalog_word_keys(self):
+        return self.load_catalog().keys()
+
+    # --- Foydalanuvchi progressi ---
+
+    def load_user_overlay(self, user_id):
+        """
+        {'progress': {id: o'zgarishlar}, 'words': [shaxsiy so'zlar]} yoki None
+        """
+        raise NotImplementedError
+
+    def save_user_overlay(self, user_id, overlay):
+        raise NotImplementedError
+
+    def find_user_word_id(self, user_id, word):
+        raise NotImplementedError
+
+    def update_user_progress(self, user_id, word_id, changes):
+        """
+        Bitta so'z progressini yangilash (masalan, deleted=True)
+        """
+        raise NotImplementedError
+
+    def list_users(self):
+        raise NotImplementedError
+
+    # --- Sessiyalar (yodlash/test holati) ---
+
+    def load_session(self, user_id):
+        """
+        (sessiya, saqlangan vaqt) yoki None
+        """
+        raise NotImplementedError
+
+    def save_sessions(self, sessions):
+        """
+        {user_id: sessiya} - bir nechta sessiyani bitta amal bilan saqlash
+        """
+        raise NotImplementedError
+
+    def compact(self, force=False):
+        """
+        Vaqti-vaqti bilan chaqiriladigan xizmat amallari (masalan, jurnalni siqish)
+        """
+        pass
+
+    def close(self):
+        pass
+
+    # --- Umumiy amallar ---
+
+    def load_user_vocabulary(self, user_id):
+        """
+        Katalog va foydalanuvchi progressini birlashtirilgan ko'rinishi
+        """
+        overlay = self.load_user_overlay(user_id)
+
+        if overlay is None:
+            # Yangi foydalanuvchi - katalogdan nusxa olinmaydi, faqat bo'sh progress
+            overlay = {'progress': {}, 'words': []}
+            self.save_user_overlay(user_id, overlay)
+
+        return self.build_user_view(overlay)
+
+    def build_user_view(self, overlay, catalog=None):
+        """
+        Progressni katalog bilan birlashtirish (diskka murojaat qilmasdan)
+        """
+        if catalog is None:
+            catalog = self.load_catalog()
+        return UserVocabulary.from_overlay(catalog, overlay)
+
+    def save_user_vocabulary(self, user_id, vocab):
+        """
+        Foydalanuvchi ko'rinishini saqlash (faqat standartdan farqlar yoziladi)
+        """
+        self.save_user_overlay(user_id, vocab.to_overlay())
+
+    def delete_user_word(self, user_id, word_to_delete):
+        """
+        Foydalanuvchi lug'atidan so'zni o'chirish (faqat o'chirilgan deb belgilash)
+        """
+        word_id = self.find_user_word_id(user_id, word_to_delete)
+        if word_id is None:
+            return False
+        self.update_user_progress(user_id, word_id, {'deleted': True})
+        return True
+
+
+class FileStorage(Storage):
+    """
+    Hozirgi format: vocabulary.csv va user_vocabulary_{id}.json fayllari
+    """
+
+    def __init__(self, csv_file=CSV_FILE, user_file=USER_WORDS_FILE, directory='.',
+                 journal_file=JOURNAL_FILE):
+        self.csv_file = os.path.join(directory, csv_file)
+        self.user_file = os.path.join(directory, user_file)
+        self.journal_file = os.path.join(directory, journal_file)
+        self.directory = directory
+        # Katalogni har safar qayta o'qimaslik uchun (fayl o'zgarmaguncha)
+        self._catalog_key = None
+        self._catalog = None
+        # Jurnal: hali snapshotga qo'shilmagan o'zgarishlar (foydalanuvchi bo'yicha)
+        self._pending = {}
+        self._seq = 0
+        self._journal = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer = None
+        self._torn_tail = False
+        self._replay_journal()
+
+    def load_catalog(self):
+        if os.path.exists(self.csv_file):
+            try:
+                stat = os.stat(self.csv_file)
+                cache_key = (stat.st_mtime_ns, stat.st_size)
+                if self._catalog_key == cache_key:
+                    return self._catalog
+
+                # Boshqa jarayon yozayotgan bo'lsa, yarim qatorni o'qimaslik uchun kutamiz
+                with file_lock(self.csv_file, shared=True):
+                    stat = os.stat(self.csv_file)
+                    cache_key = (stat.st_mtime_ns, stat.st_size)
+                    with open(self.csv_file, 'r', encoding='utf-8', newline='') as f:
+                        rows = list(csv.DictReader(f))
+
+                catalog = Catalog()
+                legacy = bool(rows) and 'id' not in rows[0]
+                for number, row in enumerate(rows, start=1):
+                    # Eski formatdagi faylga barqaror ID larni berish (bir martalik)
+                    word_id = number if legacy else int(row['id'])
+                    catalog.append(word_id, row.get('word', ''), row.get('translation', ''),
+                                   row.get('example', ''), row.get('added_date') or None)
+
+                if legacy:
+                    self._write_catalog(catalog)
+                    stat = os.stat(self.csv_file)
+                    cache_key = (stat.st_mtime_ns, stat.st_size)
+
+                self._catalog_key = cache_key
+                self._catalog = catalog
+                return catalog
+            except Exception as e:
+                print(f"CSV faylni o'qishda xato: {e}")
+                return Catalog()
+        else:
+            # Bo'sh katalog yaratish
+            catalog = Catalog()
+            self._write_catalog(catalog)
+            return catalog
+
+    def _write_catalog(self, catalog):
+        # Atomik almashtirish - boshqa jarayonlar yarim yozilgan faylni ko'rmaydi
+        output = io.StringIO(newline='')
+        writer = csv.writer(output)
+        writer.writerow(VOCAB_COLUMNS)
+        for record in catalog.records():
+            writer.writerow([record[column] for column in VOCAB_COLUMNS])
+        with file_lock(self.csv_file):
+            write_file_atomic(self.csv_file, output.getvalue())
+
+    def _catalog_word_id(self, key):
+        catalog = self.load_catalog()
+        row = catalog.find(key)
+        return catalog.ids[row] if row is not None else None
+
+    def add_catalog_words(self, new_words):
+        # Bir nechta jarayon yozsa ham ID lar takrorlanmasligi uchun: qulf ostida
+        # katalogni (o'zgargan bo'lsa) qayta o'qib, keyin qo'shamiz
+        with file_lock(self.csv_file):
+            return self._append_catalog_words(new_words)
+
+    def _append_catalog_words(self, new_words):
+        catalog = self.load_catalog()
+
+        # Yangi so'zlarga barqaror ID berish va faylga qo'shib yozish (qayta yozmasdan)
+        next_id = catalog.next_id()
+        for offset, new_word in enumerate(new_words):
+            new_word['id'] = next_id + offset
+
+        write_header = not os.path.exists(self.csv_file) or os.path.getsize(self.csv_file) == 0
+        with open(self.csv_file, 'a', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(VOCAB_COLUMNS)
+            for new_word in new_words:
+                writer.writerow([new_word.get(column) or '' for column in VOCAB_COLUMNS])
+
+        # Xotiradagi katalogni ham yangilaymiz - qayta o'qish shart emas
+        for new_word in new_words:
+            catalog.append(new_word['id'], new_word['word'], new_word['translation'],
+                           new_word.get('example', ''), new_word.get('added_date'))
+        if self._catalog is catalog:
+            stat = os.stat(self.csv_file)
+            self._catalog_key = (stat.st_mtime_ns, stat.st_size)
+        return new_words
+
+    def delete_catalog_word(self, word):
+        with file_lock(self.csv_file):
+            return self._delete_catalog_word(word)
+
+    def _delete_catalog_word(self, word):
+        catalog = self.load_catalog()
+        row = catalog.find(word)
+        if row is None:
+            return False
+
+        # O'chirilgan so'zsiz yangi katalog (foydalanuvchi ko'rinishlari qayta quriladi)
+        remaining = Catalog()
+        for record in catalog.records():
+            if word_key(record['word']) != word_key(word):
+                remaining.append(record['id'], record['word'], record['translation'],
+                                 record['example'], record['added_date'])
+        self._write_catalog(remaining)
+        return True
+
+    def _user_path(self, user_id):
+        return self.user_file.format(user_id)
+
+    # --- Jurnal ---
+
+    def _replay_journal(self):
+        # Oldingi ishga tushirishdan qolgan yozuvlarni o'qish
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                self._torn_tail = not line.endswith("\n")
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Yozish paytida uzilgan oxirgi qator
+                    continue
+                self._pending.setdefault(record['user'], []).append(record)
+                self._seq = max(self._seq, record['seq'])
+
+    def _next_seq(self):
+        self._seq = max(self._seq + 1, time.time_ns())
+        return self._seq
+
+    def _append_journal(self, record):
+        if self._journal is None:
+            self._journal = open(self.journal_file, 'a', encoding='utf-8')
+            if self._torn_tail:
+                # Uzilgan oxirgi qatorni keyingi yozuvdan ajratish
+                self._journal.write("\n")
+                self._torn_tail = False
+        self._journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # OS ga darhol beriladi (kill -9 dan himoya), fsync esa guruhlab bajariladi
+        self._journal.flush()
+        self._unsynced += 1
+        if (self._unsynced >= JOURNAL_FSYNC_BATCH
+                or time.monotonic() - self._last_sync >= JOURNAL_FSYNC_INTERVAL):
+            self.sync_journal()
+        elif self._sync_timer is None:
+            # Keyingi yozuv kelmasa ham eng eski yozuv JOURNAL_FSYNC_INTERVAL dan
+            # ko'p kutmasin (event loop bo'lmasa compact/close da yoziladi)
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._sync_timer = loop.call_later(JOURNAL_FSYNC_INTERVAL, self._sync_due)
+
+    def _sync_due(self):
+        self._sync_timer = None
+        try:
+            self.sync_journal()
+        except OSError as e:
+            print(f"Jurnalni diskka yozishda xato: {e}")
+
+    def sync_journal(self):
+        if self._sync_timer is not None:
+            self._sync_timer.cancel()
+            self._sync_timer = None
+        if self._journal is not None and self._unsynced:
+            os.fsync(self._journal.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self, force=False):
+        """
+        Jurnaldagi o'zgarishlarni foydalanuvchi snapshotlariga qo'shib, jurnalni tozalash
+        """
+        self.sync_journal()
+        if not self._pending:
+            return
+        if not force and os.path.getsize(self.journal_file) < JOURNAL_COMPACT_BYTES:
+            return
+
+        for user_id in list(self._pending):
+            overlay = self.load_user_overlay(user_id)
+            if overlay is not None:
+                self.save_user_overlay(user_id, overlay)
+
+        # Barcha o'zgarishlar snapshotlarda - jurnalni bo'shatamiz
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        write_file_atomic(self.journal_file, "")
+        self._pending = {}
+
+    # --- Foydalanuvchi fayllari ---
+
+    def _read_snapshot(self, user_id):
+        user_file = self._user_path(user_id)
+
+        if not os.path.exists(user_file):
+            return None
+
+        try:
+            with open(user_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            # Buzilgan faylni ustidan yozmaymiz - keyinroq tiklash uchun saqlab qo'yamiz
+            print(f"Foydalanuvchi faylini o'qishda xato: {e}")
+            os.replace(user_file, f"{user_file}.corrupt-{int(time.time())}")
+            return None
+
+    def load_user_overlay(self, user_id):
+        data = self._read_snapshot(user_id)
+        pending = self._pending.get(str(user_id), [])
+
+        if data is None:
+            if not pending:
+                return None
+            data = {'version': 2, 'progress': {}, 'words': []}
+
+        legacy = data.get('version') != 2
+        if legacy:
+            data = self._convert_legacy(data)
+
+        # Snapshotdan keyingi jurnal yozuvlarini qo'llash
+        journal_seq = data.get('journal_seq', 0)
+        for record in pending:
+            if record['seq'] > journal_seq:
+                apply_progress_change(data, record['id'], record['changes'])
+
+        if legacy:
+            self.save_user_overlay(user_id, data)
+        return data
+
+    def _convert_legacy(self, data):
+        # Eski format: butun lug'at nusxasi - faqat farqlarni ajratib olamiz
+
+        progress = {}
+        words = []
+        for word_data in data.get('words', []):
+            word = str(word_data.get('word', ''))
+            word_id = self._catalog_word_id(word)
+            changes = progress_changes(word_data)
+            if word_id is not None:
+                if changes:
+                    progress[str(word_id)] = changes
+            else:
+                personal = {
+                    'id': -(len(words) + 1),
+                    'word': word,
+                    'translation': word_data.get('translation', ''),
+                    'example': word_data.get('example', ''),
+                    'added_date': word_data.get('added_date')
+                }
+                personal.update(changes)
+                words.append(personal)
+
+        return {'progress': progress, 'words': words}
+
+    def save_user_overlay(self, user_id, overlay):
+        # Snapshot jurnalning shu nuqtasigacha bo'lgan barcha o'zgarishlarni o'z ichiga oladi
+        user_vocab = {
+            'user_id': user_id,
+            'version': 2,
+            'updated_at': datetime.now().isoformat(),
+            'journal_seq': self._seq,
+            'progress': overlay.get('progress', {}),
+            'words': overlay.get('words', [])
+        }
+
+        try:
+            write_file_atomic(self._user_path(user_id),
+                              json.dumps(user_vocab, ensure_ascii=False, indent=2))
+            self._pending.pop(str(user_id), None)
+        except Exception as e:
+            print(f"Foydalanuvchi faylini saqlashda xato: {e}")
+
+    def find_user_word_id(self, user_id, word):
+        key = word_key(word)
+        overlay = self.load_user_overlay(user_id) or {}
+        for word_data in overlay.get('words', []):
+            if word_key(word_data.get('word', '')) == key:
+                return int(word_data['id'])
+
+        return self._catalog_word_id(key)
+
+    def update_user_progress(self, user_id, word_id, changes):
+        # Butun faylni qayta yozish o'rniga jurnalga kichik yozuv qo'shiladi
+        record = {'seq': self._next_seq(), 'user': str(user_id), 'id': int(word_id), 'changes': changes}
+        self._append_journal(record)
+        self._pending.setdefault(str(user_id), []).append(record)
+
+    def list_users(self):
+        prefix, suffix = os.path.basename(self.user_file).split('{}')
+        users = set(self._pending)
+        for filename in os.listdir(self.directory):
+            if filename.startswith(prefix) and filename.endswith(suffix):
+                users.add(filename[len(prefix):len(filename) - len(suffix)])
+        return list(users)
+
+    def _session_path(self, user_id):
+        return os.path.join(self.directory, SESSION_DIR, f"session_{user_id}.json")
+
+    def load_session(self, user_id):
+        path = self._session_path(user_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f), os.path.getmtime(path)
+        except Exception as e:
+            print(f"Sessiyani o'qishda xato: {e}")
+            return None
+
+    def save_sessions(self, sessions):
+        os.makedirs(os.path.join(self.directory, SESSION_DIR), exist_ok=True)
+        for user_id, session in sessions.items():
+            write_file_atomic(self._session_path(user_id), json.dumps(session, ensure_ascii=False))
+
+    def close(self):
+        self.compact(force=True)
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+class SQLiteStorage(Storage):
+    """
+    SQLite (WAL rejimi) - bitta so'zni qidirish va yangilash bitta so'rov bilan
+    """
+
+    def __init__(self, path=SQLITE_FILE):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self._create_schema()
+        self._catalog = None
+        self._catalog_version = None
+
+    def _create_schema(self):
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS catalog (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                word TEXT NOT NULL,
+                word_key TEXT NOT NULL,
+                translation TEXT,
+                example TEXT,
+                added_date TEXT
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS catalog_word_key ON catalog (word_key);
+
+            CREATE TABLE IF NOT EXISTS users (
+                user_id TEXT PRIMARY KEY,
+                updated_at TEXT
+            );
+
+            CREATE TABLE IF NOT EXISTS user_words (
+                user_id TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                word TEXT NOT NULL,
+                word_key TEXT NOT NULL,
+                translation TEXT,
+                example TEXT,
+                added_date TEXT,
+                PRIMARY KEY (user_id, id)
+            );
+            CREATE INDEX IF NOT EXISTS user_words_key ON user_words (user_id, word_key);
+
+            CREATE TABLE IF NOT EXISTS progress (
+                user_id TEXT NOT NULL,
+                word_id INTEGER NOT NULL,
+                learned INTEGER NOT NULL DEFAULT 0,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                seen_count INTEGER NOT NULL DEFAULT 0,
+                correct_count INTEGER NOT NULL DEFAULT 0,
+                last_seen TEXT,
+                ease REAL NOT NULL DEFAULT 0,
+                interval REAL NOT NULL DEFAULT 0,
+                due REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, word_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS sessions (
+                user_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            """
+        )
+        # Eski bazalarga takrorlash jadvali ustunlarini qo'shish
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(progress)")}
+        for field in SCHEDULE_FIELDS:
+            if field not in columns:
+                self.db.execute(f"ALTER TABLE progress ADD COLUMN {field} REAL NOT NULL DEFAULT 0")
+        self.db.commit()
+
+        # 1-versiya: so'z kalitlari normalizatsiya qilinadi (apostrof va bo'shliq variantlari)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] < 1:
+            self._rebuild_word_keys()
+            self.db.execute("PRAGMA user_version = 1")
+
+    def _rebuild_word_keys(self):
+        with self.db:
+            for table in ('catalog', 'user_words'):
+                for rowid, word in self.db.execute(f"SELECT rowid, word FROM {table}").fetchall():
+                    try:
+                        self.db.execute(f"UPDATE {table} SET word_key = ? WHERE rowid = ?", (word_key(word), rowid))
+                    except sqlite3.IntegrityError:
+                        # Normalizatsiyadan keyin takrorlangan so'z - eski kalit qoladi
+                        pass
+
+    def _data_version(self):
+        return self.db.execute("PRAGMA data_version").fetchone()[0]
+
+    def load_catalog(self):
+        # Boshqa jarayon yozmagan bo'lsa, keshdagi katalogni qaytaramiz
+        version = self._data_version()
+        if self._catalog is not None and self._catalog_version == version:
+            return self._catalog
+
+        rows = self.db.execute(
+            "SELECT id, word, translation, example, added_date FROM catalog ORDER BY id"
+        ).fetchall()
+        catalog = Catalog()
+        for row in rows:
+            catalog.append(*row)
+        self._catalog = catalog
+        self._catalog_version = version
+        return self._catalog
+
+    def add_catalog_words(self, new_words):
+        with self.db:
+            for new_word in new_words:
+                if new_word.get('id') is not None:
+                    # Migratsiya - mavjud ID saqlanadi
+                    self.db.execute(
+                        "INSERT INTO catalog (id, word, word_key, translation, example, added_date)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (int(new_word['id']), new_word['word'], word_key(new_word['word']),
+                         new_word['translation'], new_word.get('example'), new_word.get('added_date'))
+                    )
+                else:
+                    cursor = self.db.execute(
+                        "INSERT INTO catalog (word, word_key, translation, example, added_date)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        (new_word['word'], word_key(new_word['word']), new_word['translation'],
+                         new_word.get('example'), new_word.get('added_date'))
+                    )
+                    new_word['id'] = cursor.lastrowid
+        # Keshdagi katalogga qo'shamiz - foydalanuvchi ko'rinishlari shunchaki uzaytiriladi
+        if self._catalog is not None:
+            for new_word in new_words:
+                self._catalog.append(new_word['id'], new_word['word'], new_word['translation'],
+                                     new_word.get('example'), new_word.get('added_date'))
+        return new_words
+
+    def delete_catalog_word(self, word):
+        with self.db:
+            cursor = self.db.execute("DELETE FROM catalog WHERE word_key = ?", (word_key(word),))
+        self._catalog = None
+        return cursor.rowcount > 0
+
+    def load_user_overlay(self, user_id):
+        user_id = str(user_id)
+        if self.db.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,)).fetchone() is None:
+            return None
+
+        progress = {}
+        for row in self.db.execute(
+            "SELECT word_id, learned, deleted, seen_count, correct_count, last_seen, ease, interval, due"
+            " FROM progress WHERE user_id = ?", (user_id,)
+        ):
+            progress[str(row[0])] = progress_changes({
+                'learned': row[1], 'deleted': row[2], 'seen_count': row[3],
+                'correct_count': row[4], 'last_seen': row[5],
+                'ease': row[6], 'interval': row[7], 'due': row[8]
+            })
+
+        words = []
+        for row in self.db.execute(
+            "SELECT id, word, translation, example, added_date FROM user_words"
+            " WHERE user_id = ? ORDER BY id DESC", (user_id,)
+        ):
+            words.append({'id': row[0], 'word': row[1], 'translation': row[2],
+                          'example': row[3], 'added_date': row[4]})
+
+        return {'progress': progress, 'words': words}
+
+    def save_user_overlay(self, user_id, overlay):
+        user_id = str(user_id)
+        progress = dict(overlay.get('progress', {}))
+
+        with self.db:
+            self.db.execute(
+                "INSERT INTO users (user_id, updated_at) VALUES (?, ?)"
+                " ON CONFLICT (user_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (user_id, datetime.now().isoformat())
+            )
+            self.db.execute("DELETE FROM user_words WHERE user_id = ?", (user_id,))
+            self.db.execute("DELETE FROM progress WHERE user_id = ?", (user_id,))
+
+            for word_data in overlay.get('words', []):
+                self.db.execute(
+                    "INSERT INTO user_words (user_id, id, word, word_key, translation, example, added_date)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (user_id, int(word_data['id']), word_data['word'], word_key(word_data['word']),
+                     word_data.get('translation'), word_data.get('example'), word_data.get('added_date'))
+                )
+                changes = progress_changes(word_data)
+                if changes:
+                    progress[str(word_data['id'])] = changes
+
+            for word_id, changes in progress.items():
+                values = dict(PROGRESS_DEFAULTS)
+                values.update(changes)
+                self.db.execute(
+                    f"INSERT INTO progress (user_id, word_id, {', '.join(PROGRESS_DEFAULTS)})"
+                    f" VALUES (?, ?, {', '.join('?' for _ in PROGRESS_DEFAULTS)})",
+                    (user_id, int(word_id), *(sql_value(field, values[field]) for field in PROGRESS_DEFAULTS))
+                )
+
+    def find_user_word_id(self, user_id, word):
+        key = word_key(word)
+        row = self.db.execute(
+            "SELECT id FROM user_words WHERE user_id = ? AND word_key = ?", (str(user_id), key)
+        ).fetchone()
+        if row is None:
+            row = self.db.execute("SELECT id FROM catalog WHERE word_key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def update_user_progress(self, user_id, word_id, changes):
+        columns = [field for field in changes if field in PROGRESS_DEFAULTS]
+        if not columns:
+            return
+        values = [sql_value(field, changes[field]) for field in columns]
+        assignments = ", ".join(f"{field} = excluded.{field}" for field in columns)
+
+        with self.db:
+            self.db.execute(
+                "INSERT INTO users (user_id, updated_at) VALUES (?, ?)"
+                " ON CONFLICT (user_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (str(user_id), datetime.now().isoformat())
+            )
+            self.db.execute(
+                f"INSERT INTO progress (user_id, word_id, {', '.join(columns)})"
+                f" VALUES (?, ?, {', '.join('?' for _ in columns)})"
+                f" ON CONFLICT (user_id, word_id) DO UPDATE SET {assignments}",
+                (str(user_id), int(word_id), *values)
+            )
+
+    def list_users(self):
+        return [row[0] for row in self.db.execute("SELECT user_id FROM users")]
+
+    def load_session(self, user_id):
+        row = self.db.execute(
+            "SELECT data, updated_at FROM sessions WHERE user_id = ?", (str(user_id),)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def save_sessions(self, sessions):
+        now = time.time()
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO sessions (user_id, data, updated_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                [(str(user_id), json.dumps(session, ensure_ascii=False), now)
+                 for user_id, session in sessions.items()]
+            )
+
+    def close(self):
+        self.db.close()
+
+
+def create_storage(backend=STORAGE_BACKEND):
+    """
+    Sozlamaga ko'ra saqlash backendini yaratish
+    """
+    if backend == 'sqlite':
+        return SQLiteStorage()
+    return FileStorage()
+
+
+def migrate_files_to_sqlite(source, target):
+    """
+    CSV/JSON fayllaridan SQLite ga bir martalik ko'chirish
+    """
+    catalog = source.load_catalog()
+    existing = target.catalog_word_keys()
+    words = [record for record in catalog.records() if word_key(record['word']) not in existing]
+    target.add_catalog_words(words)
+
+    users = source.list_users()
+    for user_id in users:
+        overlay = source.load_user_overlay(user_id)
+        if overlay is not None:
+            target.save_user_overlay(user_id, overlay)
+
+    return len(words), len(users)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Lug'at fayllarini SQLite ga ko'chirish")
+    parser.add_argument('command', choices=['migrate'])
+    parser.add_argument('--db', default=SQLITE_FILE)
+    parser.add_argument('--dir', default='.')
+    args = parser.parse_args()
+
+    words_count, users_count = migrate_files_to_sqlite(FileStorage(directory=args.dir), SQLiteStorage(args.db))
+    print(f"✅ {words_count} ta so'z va {users_count} ta foydalanuvchi ko'chirildi")
@@ -0,0 +1,297 @@
+import asyncio
+import os
+import httpx
+from dictionary import lookup as lookup_dictionary
+from translation_cache import TranslationCache
+from metrics import timed_provider, TRANSLATION_SOURCE
+from providers import ProviderRouter, ProviderError, TranslateLimitReached, google_budget, mymemory_budget
+
+# Tarjima provayderlari manzillari
+GOOGLE_URL = os.getenv("GOOGLE_URL", "https://translate.googleapis.com/translate_a/single")
+MYMEMORY_URL = os.getenv("MYMEMORY_URL", "https://api.mymemory.translated.net/get")
+
+# Har bir provayder uchun alohida timeout (soniya)
+GOOGLE_TIMEOUT = float(os.getenv("GOOGLE_TIMEOUT", "5"))
+MYMEMORY_TIMEOUT = float(os.getenv("MYMEMORY_TIMEOUT", "8"))
+
+# Hedged rejim: Google shu vaqt ichida javob bermasa, MyMemory ham ishga tushiriladi
+TRANSLATE_HEDGED = os.getenv("TRANSLATE_HEDGED", "1") == "1"
+TRANSLATE_HEDGE_DELAY = float(os.getenv("TRANSLATE_HEDGE_DELAY", "0.8"))
+
+# Umumiy ulanishlar havzasi (keep-alive)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+
+_http_client = None
+
+# Tarjimalar keshi (xotira + disk)
+translation_cache = TranslationCache()
+
+
+def get_http_client():
+    """
+    Barcha tarjima so'rovlari uchun umumiy AsyncClient
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=60,
+            ),
+            timeout=httpx.Timeout(10.0),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """
+    Ulanishlar havzasini yopish (bot to'xtaganda)
+    """
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+    translation_cache.close()
+
+
+# MyMemory Translate API funksiyasi
+@timed_provider('mymemory')
+async def translate_word_my_memory(word, source_lang='en', target_lang='uz'):
+    """
+    MyMemory API orqali so'z tarjima qilish.
+    Tarmoq xatosi, 5xx yoki kvota tugashi - ProviderError
+    """
+    try:
+        params = {
+            'q': word,
+            'langpair': f'{source_lang}|{target_lang}'
+        }
+
+        response = await get_http_client().get(MYMEMORY_URL, params=params, timeout=MYMEMORY_TIMEOUT)
+    except Exception as e:
+        print(f"Tarjima qilishda xato: {e}")
+        raise ProviderError(str(e)) from e
+
+    if response.status_code != 200:
+        raise ProviderError(f"MyMemory HTTP {response.status_code}")
+    try:
+        data = response.json()
+        status = int(data['responseStatus'])
+        translation = data['responseData']['translatedText'] or ''
+    except Exception as e:
+        print(f"Tarjima qilishda xato: {e}")
+        raise ProviderError(str(e)) from e
+
+    # Kunlik kvota tugaganda MyMemory ogohlantirishni tarjima o'rnida qaytaradi
+    if status == 429 or status >= 500 or translation.startswith('MYMEMORY WARNING'):
+        raise ProviderError(f"MyMemory {status}: {translation[:80]}")
+    if status != 200:
+        return None
+
+    # Agar tarjima bir nechta bo'lsa, birinchisini olamiz
+    if ';' in translation:
+        translation = translation.split(';')[0].strip()
+    if '(' in translation:
+        translation = translation.split('(')[0].strip()
+    return translation
+
+
+# Google Translate API (alternativa)
+@timed_provider('google')
+async def translate_word_google(word, source_lang='en', target_lang='uz'):
+    """
+    Google Translate API (bepul va oson).
+    Tarmoq xatosi yoki HTTP xato - ProviderError
+    """
+    try:
+        params = {
+            'client': 'gtx',
+            'sl': source_lang,
+            'tl': target_lang,
+            'dt': 't',
+            'q': word
+        }
+
+        response = await get_http_client().get(GOOGLE_URL, params=params, timeout=GOOGLE_TIMEOUT)
+    except Exception as e:
+        print(f"Google Translate xatosi: {e}")
+        raise ProviderError(str(e)) from e
+
+    if response.status_code != 200:
+        raise ProviderError(f"Google HTTP {response.status_code}")
+    try:
+        data = response.json()
+        # Google Translate javobi kompleks struktura
+        # Birinchi elementda tarjimalar listi bor
+        if not data or not data[0]:
+            return None
+        translation = data[0][0][0]
+    except (ValueError, LookupError, TypeError) as e:
+        # Kutilmagan javob (masalan, {"error": ...}) - provayder xatosi
+        print(f"Google Translate xatosi: {e}")
+        raise ProviderError(f"Google javobi noto'g'ri: {e}") from e
+    if not isinstance(translation, str):
+        raise ProviderError("Google javobi noto'g'ri")
+    return translation
+
+
+# Provayderlar (standart tartibda). Funksiyalar har chaqiruvda moduldan olinadi
+provider_router = ProviderRouter([
+    ('google', lambda *args: translate_word_google(*args), google_budget()),
+    ('mymemory', lambda *args: translate_word_my_memory(*args), mymemory_budget()),
+])
+
+
+def _is_good(translation, word):
+    return bool(translation) and translation != word
+
+
+async def _translate_hedged(word, source_lang, target_lang, names):
+    """
+    Eng sog'lom provayderni boshlash, kechiksa keyingisini ham boshlash va birinchi
+    yaxshi javobni olish. Qaytaradi: (tarjima, biror provayder javob berdimi)
+    """
+    names = list(names)
+    pending = set()
+    answered = False
+
+    def start_next():
+        name = names.pop(0)
+        pending.add(asyncio.create_task(provider_router.call(name, word, source_lang, target_lang)))
+
+    try:
+        start_next()
+        done, pending = await asyncio.wait(pending, timeout=TRANSLATE_HEDGE_DELAY)
+
+        while True:
+            for task in done:
+                translation, ok = task.result()
+                answered = answered or ok
+                if _is_good(translation, word):
+                    return translation, True
+
+            # Provayder xato qaytardi yoki kechikdi - keyingisini ishga tushiramiz
+            if names:
+                start_next()
+
+            if not pending:
+                return None, answered
+
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _translate_sequential(word, source_lang, target_lang, names):
+    answered = False
+    for name in names:
+        translation, ok = await provider_router.call(name, word, source_lang, target_lang)
+        answered = answered or ok
+        if _is_good(translation, word):
+            return translation, True
+    return None, answered
+
+
+# Tarjima funksiyasi (ikkala API dan foydalanadi)
+async def translate_word(word, source_lang='en', target_lang='uz', user_id=None):
+    """
+    So'zni tarjima qilish - avval oflayn lug'atdan, keyin keshdan, keyin ishlayotgan
+    provayderlardan (holatiga qarab tartiblangan). user_id - foydalanuvchi byudjeti uchun.
+    Byudjet tugagan va so'z kichik lug'atda ham bo'lmasa - TranslateLimitReached
+    """
+    # Oflayn lug'at (dictionary.bin) - faqat en -> uz
+    if (source_lang, target_lang) == ('en', 'uz'):
+        translation = lookup_dictionary(word)
+        if translation:
+            TRANSLATION_SOURCE.inc('dictionary')
+            return translation
+
+    found, translation = translation_cache.get(word, source_lang, target_lang)
+    if found:
+        TRANSLATION_SOURCE.inc('cache')
+        return translation
+
+    # Byudjet tugagan - tarmoqqa chiqmaymiz; "tarjima yo'q" deb ham javob bermaymiz
+    if not provider_router.user_allowed(user_id):
+        translation = get_translation_from_dict(word)
+        TRANSLATION_SOURCE.inc('simple_dict' if translation else 'limited')
+        if translation:
+            return translation
+        raise TranslateLimitReached(provider_router.user_wait(user_id))
+
+    # Barcha provayderlar o'chirilgan
+    names = provider_router.plan()
+    if not names:
+        translation = get_translation_from_dict(word)
+        TRANSLATION_SOURCE.inc('simple_dict' if translation else 'unavailable')
+        return translation
+
+    if TRANSLATE_HEDGED:
+        translation, answered = await _translate_hedged(word, source_lang, target_lang, names)
+    else:
+        translation, answered = await _translate_sequential(word, source_lang, target_lang, names)
+
+    # Agar provayderlar ishlamasa, oddiy lug'atdan foydalanamiz
+    if _is_good(translation, word):
+        TRANSLATION_SOURCE.inc('network')
+    else:
+        translation = get_translation_from_dict(word)
+        TRANSLATION_SOURCE.inc('simple_dict' if translation else 'none')
+
+    # "Tarjima yo'q" faqat provayder haqiqatan javob bergan bo'lsa keshlanadi
+    if _is_good(translation, word) or answered:
+        translation_cache.set(word, translation if _is_good(translation, word) else None,
+                              source_lang, target_lang)
+    return translation
+
+
+# Kichik lug'at (zaxira sifatida)
+SIMPLE_DICT = {
+    'apple': 'olma',
+    'book': 'kitob',
+    'cat': 'mushuk',
+    'dog': 'it',
+    'house': 'uy',
+    'car': 'mashina',
+    'water': 'suv',
+    'hello': 'salom',
+    'goodbye': 'xayr',
+    'thank you': 'rahmat',
+    'yes': 'ha',
+    'no': "yo'q",
+    'man': 'erkak',
+    'woman': 'ayol',
+    'child': 'bola',
+    'school': 'maktab',
+    'teacher': "o'qituvchi",
+    'student': "o'quvchi",
+    'friend': "do'st",
+    'family': 'oilа',
+    'work': 'ish',
+    'time': 'vaqt',
+    'computer': 'kompyuter',
+    'phone': 'telefon',
+    'money': 'pul',
+    'city': 'shahar',
+    'country': 'davlat',
+    'day': 'kun',
+    'night': 'tun',
+    'food': 'ovqat',
+    'air': 'havo',
+    'fire': 'olov',
+    'earth': 'yer',
+    'sun': 'quyosh',
+    'moon': 'oy',
+    'star': 'yulduz'
+}
+
+
+def get_translation_from_dict(word):
+    """
+    Kichik lug'atdan tarjima qidirish
+    """
+    word_lower = word.lower().strip()
+    return SIMPLE_DICT.get(word_lower, None)
@@ -0,0 +1,180 @@
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from word_index import normalize_word
+
+# Kesh sozlamalari
+TRANSLATION_CACHE_FILE = os.getenv("TRANSLATION_CACHE_FILE", "translation_cache.db")
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "10000"))
+# Topilgan tarjima 30 kun, topilmagan tarjima 1 soat saqlanadi
+TRANSLATION_CACHE_TTL = float(os.getenv("TRANSLATION_CACHE_TTL", str(30 * 24 * 3600)))
+TRANSLATION_NEGATIVE_TTL = float(os.getenv("TRANSLATION_NEGATIVE_TTL", "3600"))
+# Muddati o'tgan yozuvlar diskdan ochilishda va har shuncha yozuvdan keyin o'chiriladi
+TRANSLATION_CACHE_PURGE_EVERY = int(os.getenv("TRANSLATION_CACHE_PURGE_EVERY", "1000"))
+
+
+class TranslationCache:
+    """
+    Ikki bosqichli tarjima keshi: xotiradagi LRU va diskdagi SQLite
+    """
+
+    def __init__(self, path=TRANSLATION_CACHE_FILE, max_size=TRANSLATION_CACHE_SIZE,
+                 ttl=TRANSLATION_CACHE_TTL, negative_ttl=TRANSLATION_NEGATIVE_TTL,
+                 purge_every=TRANSLATION_CACHE_PURGE_EVERY):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.purge_every = purge_every
+        self._memory = OrderedDict()
+        self._db = None
+        self._writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+
+    def _connect(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " word TEXT NOT NULL,"
+                " source_lang TEXT NOT NULL,"
+                " target_lang TEXT NOT NULL,"
+                " translation TEXT,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (word, source_lang, target_lang))"
+            )
+            self.purge_expired()
+        return self._db
+
+    def _remember(self, key, translation, expires_at):
+        self._memory[key] = (translation, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def get(self, word, source_lang='en', target_lang='uz'):
+        """
+        (topildi, tarjima) qaytaradi. Salbiy natija uchun tarjima None bo'ladi
+        """
+        key = (normalize_word(word), source_lang, target_lang)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[1] > now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                if entry[0] is None:
+                    self.negative_hits += 1
+                return True, entry[0]
+            del self._memory[key]
+
+        try:
+            row = self._connect().execute(
+                "SELECT translation, expires_at FROM translations"
+                " WHERE word = ? AND source_lang = ? AND target_lang = ?",
+                key
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Tarjima keshini o'qishda xato: {e}")
+            row = None
+
+        if row is not None and row[1] > now:
+            self._remember(key, row[0], row[1])
+            self.disk_hits += 1
+            if row[0] is None:
+                self.negative_hits += 1
+            return True, row[0]
+
+        self.misses += 1
+        return False, None
+
+    def set(self, word, translation, source_lang='en', target_lang='uz'):
+        """
+        Tarjimani keshga yozish (translation=None - topilmadi)
+        """
+        key = (normalize_word(word), source_lang, target_lang)
+        ttl = self.ttl if translation else self.negative_ttl
+        expires_at = time.time() + ttl
+        self._remember(key, translation or None, expires_at)
+
+        try:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO translations"
+                " (word, source_lang, target_lang, translation, expires_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (*key, translation or None, expires_at)
+            )
+            db.commit()
+        except sqlite3.Error as e:
+            print(f"Tarjima keshiga yozishda xato: {e}")
+            return
+
+        # Disk keshi cheksiz o'smasligi uchun
+        self._writes += 1
+        if self.purge_every and self._writes % self.purge_every == 0:
+            self.purge_expired()
+
+    def preload(self, limit=None):
+        """
+        Diskdagi eng yangi yozuvlarni xotiraga oldindan yuklash (ishga tushgandan keyin
+        fonda). Xotirada allaqachon bor kalitlar o'zgartirilmaydi. Yuklanganlar sonini qaytaradi
+        """
+        limit = self.max_size if limit is None else min(limit, self.max_size)
+        try:
+            rows = self._connect().execute(
+                "SELECT word, source_lang, target_lang, translation, expires_at FROM translations"
+                " WHERE expires_at > ? ORDER BY expires_at DESC LIMIT ?",
+                (time.time(), limit)
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Tarjima keshini yuklashda xato: {e}")
+            return 0
+
+        loaded = 0
+        # Oldindan yuklanganlar LRU navbatining boshiga (ishlatilganlardan oldin chiqariladi),
+        # ular orasida eng yangisi oxirida
+        for word, source_lang, target_lang, translation, expires_at in rows:
+            key = (word, source_lang, target_lang)
+            if key not in self._memory and len(self._memory) < self.max_size:
+                self._memory[key] = (translation, expires_at)
+                self._memory.move_to_end(key, last=False)
+                loaded += 1
+        return loaded
+
+    def purge_expired(self):
+        """
+        Muddati o'tgan yozuvlarni diskdan o'chirish. O'chirilganlar sonini qaytaradi
+        """
+        try:
+            db = self._connect()
+            deleted = db.execute("DELETE FROM translations WHERE expires_at <= ?", (time.time(),)).rowcount
+            db.commit()
+            return deleted
+        except sqlite3.Error as e:
+            print(f"Tarjima keshini tozalashda xato: {e}")
+            return 0
+
+    def stats(self):
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+            'memory_size': len(self._memory),
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
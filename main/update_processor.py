@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sys
+import startup
+from telegram.ext import BaseUpdateProcessor
+from locks import KeyedLock
+
+# Bir vaqtda qayta ishlanadigan update lar soni (turli foydalanuvchilar uchun).
+# 1 - eski tartib: update lar birma-bir
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "64"))
+
+
+def update_key(update):
+    """
+    Update qaysi foydalanuvchiga tegishli (bo'lmasa chat, bo'lmasa None)
+    """
+    user = getattr(update, 'effective_user', None)
+    if user is not None:
+        return user.id
+    chat = getattr(update, 'effective_chat', None)
+    if chat is not None:
+        return chat.id
+    return None
+
+
+class UserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Turli foydalanuvchilarning update lari parallel, bitta foydalanuvchiniki esa
+    kelgan tartibida birma-bir qayta ishlanadi (sessiya va lug'atni o'qish-yozish
+    aralashib ketmaydi, tez ikki marta bosilgan tugma savolni o'tkazib yubormaydi).
+    Avval foydalanuvchi navbati, keyin umumiy limit - o'z navbatini kutayotgan
+    update boshqa foydalanuvchilar uchun joy egallamaydi
+    """
+
+    def __init__(self, max_concurrent_updates=CONCURRENT_UPDATES):
+        # PTB semafori amalda cheklanmaydi (process_update final): limit do_process_update
+        # ichida, foydalanuvchi qulfidan keyin olinadi. 1 - update lar birma-bir (PTB o'zi)
+        super().__init__(sys.maxsize if max_concurrent_updates > 1 else 1)
+        self.users = KeyedLock()
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        self.running = 0
+
+    async def do_process_update(self, update, coroutine):
+        key = update_key(update)
+        try:
+            if key is None:
+                await self._run(coroutine)
+            else:
+                async with self.users.lock(key):
+                    await self._run(coroutine)
+        finally:
+            startup.first_update()
+
+    async def _run(self, coroutine):
+        async with self._slots:
+            self.running += 1
+            try:
+                await coroutine
+            finally:
+                self.running -= 1
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def stats(self):
+        stats = self.users.stats()
+        stats['running'] = self.running
+        return stats
@@ -0,0 +1,192 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from metrics import STORAGE_SECONDS
+
+# Kesh sozlamalari
+USER_CACHE_MAX_BYTES = int(os.getenv("USER_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+USER_CACHE_IDLE_TTL = float(os.getenv("USER_CACHE_IDLE_TTL", "1800"))
+USER_CACHE_FLUSH_INTERVAL = float(os.getenv("USER_CACHE_FLUSH_INTERVAL", "30"))
+
+
+class _Entry:
+    __slots__ = ('vocab', 'dirty', 'last_access', 'size')
+
+    def __init__(self, vocab):
+        self.vocab = vocab
+        self.dirty = False
+        self.last_access = time.monotonic()
+        self.size = vocab.nbytes()
+
+
+class UserVocabularyCache:
+    """
+    Foydalanuvchi lug'atlari keshi: o'zgarishlar vaqti-vaqti bilan yoki
+    keshdan chiqarilganda diskka yoziladi (write-back)
+    """
+
+    def __init__(self, storage, max_bytes=USER_CACHE_MAX_BYTES, idle_ttl=USER_CACHE_IDLE_TTL,
+                 flush_interval=USER_CACHE_FLUSH_INTERVAL):
+        self.storage = storage
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.flush_interval = flush_interval
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._task = None
+        self.hits = 0
+        self.misses = 0
+        self.stats_drift = 0
+
+    def get(self, user_id):
+        """
+        Foydalanuvchi lug'atini keshdan olish (kerak bo'lsa diskdan yuklash)
+        """
+        key = str(user_id)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            with STORAGE_SECONDS.time('load_user_vocabulary'):
+                entry = _Entry(self.storage.load_user_vocabulary(user_id))
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._evict_over_budget(keep=key)
+        else:
+            self.hits += 1
+            self._refresh_catalog(entry)
+
+        entry.last_access = time.monotonic()
+        self._entries.move_to_end(key)
+        return entry.vocab
+
+    def put(self, user_id, vocab):
+        """
+        O'zgargan lug'atni keshga yozish (diskka keyinroq yoziladi)
+        """
+        key = str(user_id)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            entry = _Entry(vocab)
+            self._entries[key] = entry
+        else:
+            self._bytes -= entry.size
+            entry.vocab = vocab
+            entry.size = vocab.nbytes()
+
+        self._bytes += entry.size
+        entry.dirty = True
+        entry.last_access = time.monotonic()
+        self._entries.move_to_end(key)
+        self._evict_over_budget(keep=key)
+
+    def update_word(self, user_id, word_id, changes):
+        """
+        Bitta so'z progressini yangilash: keshdagi ko'rinish darhol o'zgaradi,
+        saqlash esa backendning bitta yozuvli amali orqali
+        """
+        entry = self._entries.get(str(user_id))
+        if entry is not None:
+            i = entry.vocab.index_of_id(word_id)
+            if i is not None:
+                entry.vocab.update(i, changes)
+        with STORAGE_SECONDS.time('update_user_progress'):
+            self.storage.update_user_progress(user_id, word_id, changes)
+
+    def invalidate(self, user_id):
+        """
+        Foydalanuvchini keshdan chiqarish (o'zgarishlar avval saqlanadi)
+        """
+        entry = self._entries.pop(str(user_id), None)
+        if entry is not None:
+            self._write_back(str(user_id), entry)
+            self._bytes -= entry.size
+
+    def _refresh_catalog(self, entry):
+        # Katalogga so'z qo'shilgan bo'lsa massivlar uzaytiriladi, almashtirilgan bo'lsa
+        # ko'rinish xotiradagi progress bilan qayta quriladi
+        catalog = self.storage.load_catalog()
+        self._bytes -= entry.size
+        if not entry.vocab.sync_catalog(catalog):
+            entry.vocab = self.storage.build_user_view(entry.vocab.to_overlay(), catalog)
+        entry.size = entry.vocab.nbytes()
+        self._bytes += entry.size
+
+    def _write_back(self, key, entry):
+        if not entry.dirty:
+            return
+        try:
+            with STORAGE_SECONDS.time('save_user_vocabulary'):
+                self.storage.save_user_vocabulary(key, entry.vocab)
+            entry.dirty = False
+        except Exception as e:
+            print(f"Foydalanuvchi lug'atini saqlashda xato: {e}")
+
+    def _evict(self, key):
+        entry = self._entries.pop(key)
+        self._verify_stats(key, entry)
+        self._write_back(key, entry)
+        self._bytes -= entry.size
+
+    def _verify_stats(self, key, entry):
+        # Keshdan chiqishda statistika hisoblagichlari noldan tekshiriladi (drift bo'lmasligi kerak)
+        drift = entry.vocab.verify_stats()
+        if drift:
+            self.stats_drift += 1
+            print(f"Statistika hisoblagichlari mos emas ({key}): {', '.join(drift)}")
+
+    def _evict_over_budget(self, keep=None):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                self._entries.move_to_end(key)
+                key = next(iter(self._entries))
+            self._evict(key)
+
+    def evict_idle(self):
+        """
+        Uzoq vaqt ishlatilmagan foydalanuvchilarni keshdan chiqarish
+        """
+        deadline = time.monotonic() - self.idle_ttl
+        for key in [key for key, entry in self._entries.items() if entry.last_access < deadline]:
+            self._evict(key)
+
+    def flush(self):
+        """
+        Barcha o'zgargan lug'atlarni diskka yozish
+        """
+        for key, entry in list(self._entries.items()):
+            self._write_back(key, entry)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+            self.evict_idle()
+            self.storage.compact()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.flush()
+
+    def stats(self):
+        return {
+            'users': len(self._entries),
+            'bytes': self._bytes,
+            'dirty': sum(1 for entry in self._entries.values() if entry.dirty),
+            'hits': self.hits,
+            'misses': self.misses,
+            'stats_drift': self.stats_drift,
+        }
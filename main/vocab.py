@@ -0,0 +1,560 @@
+import bisect
+import heapq
+import random
+from array import array
+from collections import deque
+from itertools import islice
+from word_index import FuzzyIndex, normalize_word
+
+# Foydalanuvchi progressi maydonlari va standart qiymatlari
+PROGRESS_DEFAULTS = {
+    'learned': False,
+    'deleted': False,
+    'seen_count': 0,
+    'correct_count': 0,
+    'last_seen': None,
+    # Takrorlash jadvali (0 - hali rejalashtirilmagan / standart)
+    'ease': 0.0,
+    'interval': 0.0,
+    'due': 0.0
+}
+
+# Katalogda oxirgi qo'shilgan nechta so'z alohida saqlanadi (statistika sahifasi uchun)
+RECENT_WORDS = 32
+
+
+def word_key(word):
+    """
+    Qidiruv uchun so'z kaliti (apostrof va bo'shliq variantlari birlashtiriladi)
+    """
+    return normalize_word(word)
+
+
+class Catalog:
+    """
+    Asosiy lug'at: parallel ro'yxatlar va so'z -> qator indeksi.
+    Barcha foydalanuvchilar uchun bitta nusxa
+    """
+
+    __slots__ = ('ids', 'words', 'translations', 'examples', 'added_dates', '_by_key', '_by_id', '_max_id',
+                 '_fuzzy', '_sorted', 'recent')
+
+    def __init__(self):
+        self.ids = []
+        self.words = []
+        self.translations = []
+        self.examples = []
+        self.added_dates = []
+        self._by_key = {}
+        self._by_id = {}
+        self._max_id = 0
+        # Xato yozilgan so'zlar indeksi va alifbo tartibi - birinchi kerak bo'lganda quriladi
+        self._fuzzy = None
+        self._sorted = None
+        # Oxirgi qo'shilgan qatorlar halqasi (qo'shilish tartibida)
+        self.recent = deque(maxlen=RECENT_WORDS)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, word_id, word, translation, example='', added_date=None):
+        row = len(self.ids)
+        self.ids.append(int(word_id))
+        self.words.append(word)
+        self.translations.append(translation)
+        self.examples.append(example or '')
+        self.added_dates.append(added_date)
+        key = word_key(word)
+        if key not in self._by_key:
+            self._by_key[key] = row
+            if self._fuzzy is not None:
+                self._fuzzy.add(key)
+        self._by_id[int(word_id)] = row
+        self._max_id = max(self._max_id, int(word_id))
+        self.recent.append(row)
+        return row
+
+    def find(self, word):
+        """
+        So'z bo'yicha qator raqami (yoki None) - O(1)
+        """
+        return self._by_key.get(word_key(word))
+
+    def suggest(self, word):
+        """
+        Lug'atdagi eng o'xshash so'z ("Siz ... demoqchimisiz?") yoki None
+        """
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyIndex(self._by_key)
+        key = self._fuzzy.suggest(word)
+        return self.words[self._by_key[key]] if key is not None else None
+
+    def warm_up(self):
+        """
+        Xato yozilgan so'zlar indeksi va alifbo tartibini oldindan qurish
+        (birinchi foydalanuvchi kutib qolmasligi uchun)
+        """
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyIndex(self._by_key)
+        self.sorted_rows()
+
+    def sorted_rows(self):
+        """
+        (kalitlar, qatorlar) alifbo tartibida - barcha foydalanuvchilar uchun bitta nusxa
+        """
+        if self._sorted is None or self._sorted[0] != len(self.ids):
+            pairs = sorted((word_key(word), row) for row, word in enumerate(self.words))
+            self._sorted = (len(self.ids), [key for key, _ in pairs], [row for _, row in pairs])
+        return self._sorted[1], self._sorted[2]
+
+    def row_of(self, word_id):
+        return self._by_id.get(word_id)
+
+    def keys(self):
+        return self._by_key.keys()
+
+    def next_id(self):
+        return self._max_id + 1
+
+    def record(self, row):
+        return {
+            'id': self.ids[row],
+            'word': self.words[row],
+            'translation': self.translations[row],
+            'example': self.examples[row],
+            'added_date': self.added_dates[row]
+        }
+
+    def records(self):
+        return (self.record(row) for row in range(len(self.ids)))
+
+
+class UserVocabulary:
+    """
+    Foydalanuvchi lug'ati: umumiy katalogga havola va progress uchun ixcham massivlar.
+    Indekslar: avval shaxsiy so'zlar, keyin katalog qatorlari
+    (katalog o'sganda massivlar shunchaki uzaytiriladi)
+    """
+
+    __slots__ = ('catalog', 'n_catalog', 'personal', '_personal_keys', 'learned', 'deleted',
+                 'seen_count', 'correct_count', 'last_seen', 'ease', 'interval', 'due',
+                 'active_count', 'learned_count', '_due_heap', '_active_tree', '_sorted')
+
+    def __init__(self, catalog, personal=()):
+        self.catalog = catalog
+        self.n_catalog = len(catalog)
+        self.personal = [
+            {'id': int(p['id']), 'word': p['word'], 'translation': p.get('translation', ''),
+             'example': p.get('example') or '', 'added_date': p.get('added_date')}
+            for p in personal
+        ]
+        self._personal_keys = {}
+        for i, p in enumerate(self.personal):
+            self._personal_keys.setdefault(word_key(p['word']), i)
+
+        size = len(self.personal) + self.n_catalog
+        self.learned = bytearray(size)
+        self.deleted = bytearray(size)
+        self.seen_count = array('I', bytes(4 * size))
+        self.correct_count = array('I', bytes(4 * size))
+        # last_seen kamdan-kam to'ldiriladi - faqat mavjud qiymatlar saqlanadi
+        self.last_seen = {}
+        self.ease = array('f', bytes(4 * size))
+        self.interval = array('f', bytes(4 * size))
+        self.due = array('d', bytes(8 * size))
+        self.active_count = size
+        self.learned_count = 0
+        # Takrorlash navbati (due, indeks) - birinchi kerak bo'lganda quriladi
+        self._due_heap = None
+        # Sahifalash uchun indekslar (Fenwick daraxti va alifbo tartibi) - kerak bo'lganda quriladi
+        self._active_tree = None
+        self._sorted = None
+
+    @classmethod
+    def from_overlay(cls, catalog, overlay):
+        """
+        Katalog va foydalanuvchi progressidan ko'rinish yaratish
+        """
+        progress = overlay.get('progress', {})
+        vocab = cls(catalog, overlay.get('words', []))
+
+        for i, p in enumerate(overlay.get('words', [])):
+            vocab.update(i, {field: p[field] for field in PROGRESS_DEFAULTS if field in p})
+        for word_id, changes in progress.items():
+            i = vocab.index_of_id(int(word_id))
+            if i is not None:
+                vocab.update(i, changes)
+        return vocab
+
+    def to_overlay(self):
+        """
+        Faqat standartdan farq qiladigan progressni ajratib olish
+        """
+        progress = {}
+        words = []
+        for i in range(len(self)):
+            changes = self.changes(i)
+            if i < len(self.personal):
+                personal = dict(self.personal[i])
+                personal.update(changes)
+                words.append(personal)
+            elif changes:
+                progress[str(self.word_id(i))] = changes
+        return {'progress': progress, 'words': words}
+
+    def __len__(self):
+        return len(self.personal) + self.n_catalog
+
+    # --- Maydonlarga kirish ---
+
+    def _source(self, i):
+        offset = len(self.personal)
+        if i < offset:
+            return self.personal[i], None
+        return None, i - offset
+
+    def word_id(self, i):
+        personal, row = self._source(i)
+        return personal['id'] if personal is not None else self.catalog.ids[row]
+
+    def word(self, i):
+        personal, row = self._source(i)
+        return personal['word'] if personal is not None else self.catalog.words[row]
+
+    def translation(self, i):
+        personal, row = self._source(i)
+        return personal['translation'] if personal is not None else self.catalog.translations[row]
+
+    def example(self, i):
+        personal, row = self._source(i)
+        return personal['example'] if personal is not None else self.catalog.examples[row]
+
+    def added_date(self, i):
+        personal, row = self._source(i)
+        return personal['added_date'] if personal is not None else self.catalog.added_dates[row]
+
+    def is_active(self, i):
+        return not self.deleted[i]
+
+    def changes(self, i):
+        changes = {}
+        if self.learned[i]:
+            changes['learned'] = True
+        if self.deleted[i]:
+            changes['deleted'] = True
+        if self.seen_count[i]:
+            changes['seen_count'] = self.seen_count[i]
+        if self.correct_count[i]:
+            changes['correct_count'] = self.correct_count[i]
+        if i in self.last_seen:
+            changes['last_seen'] = self.last_seen[i]
+        if self.ease[i]:
+            changes['ease'] = round(self.ease[i], 3)
+        if self.interval[i]:
+            changes['interval'] = round(self.interval[i], 3)
+        if self.due[i]:
+            changes['due'] = self.due[i]
+        return changes
+
+    def record(self, i):
+        """
+        So'zning barcha maydonlari (sessiyada saqlash uchun oddiy dict)
+        """
+        record = {
+            'id': self.word_id(i),
+            'word': self.word(i),
+            'translation': self.translation(i),
+            'example': self.example(i),
+            'added_date': self.added_date(i)
+        }
+        record.update(PROGRESS_DEFAULTS)
+        record.update(self.changes(i))
+        return record
+
+    # --- Qidiruv ---
+
+    def find(self, word):
+        """
+        So'z bo'yicha indeks (yoki None) - O(1)
+        """
+        key = word_key(word)
+        i = self._personal_keys.get(key)
+        if i is not None:
+            return i
+        row = self.catalog.find(key)
+        if row is not None and row < self.n_catalog:
+            return len(self.personal) + row
+        return None
+
+    def index_of_id(self, word_id):
+        if word_id < 0:
+            for i, p in enumerate(self.personal):
+                if p['id'] == word_id:
+                    return i
+            return None
+        row = self.catalog.row_of(word_id)
+        if row is not None and row < self.n_catalog:
+            return len(self.personal) + row
+        return None
+
+    # --- O'zgartirish ---
+
+    def update(self, i, changes):
+        for field, value in changes.items():
+            if field == 'deleted':
+                value = 1 if value else 0
+                if value != self.deleted[i]:
+                    self.active_count += -1 if value else 1
+                    if self._active_tree is not None:
+                        self._tree_add(i, -1 if value else 1)
+                self.deleted[i] = value
+            elif field == 'learned':
+                value = 1 if value else 0
+                self.learned_count += value - self.learned[i]
+                self.learned[i] = value
+            elif field == 'seen_count':
+                self.seen_count[i] = int(value)
+            elif field == 'correct_count':
+                self.correct_count[i] = int(value)
+            elif field == 'last_seen':
+                if value:
+                    self.last_seen[i] = value
+                else:
+                    self.last_seen.pop(i, None)
+            elif field == 'ease':
+                self.ease[i] = float(value or 0)
+            elif field == 'interval':
+                self.interval[i] = float(value or 0)
+            elif field == 'due':
+                self.due[i] = float(value or 0)
+                if self._due_heap is not None and self.due[i]:
+                    # Eski yozuv navbatda qoladi va olishda tashlab yuboriladi
+                    heapq.heappush(self._due_heap, (self.due[i], i))
+
+    def sync_catalog(self, catalog):
+        """
+        Katalogga yangi so'zlar qo'shilgan bo'lsa massivlarni uzaytirish.
+        Katalog almashtirilgan bo'lsa (masalan, so'z o'chirilgan) False qaytaradi
+        """
+        if catalog is not self.catalog:
+            return False
+        added = len(catalog) - self.n_catalog
+        if added > 0:
+            self.learned.extend(bytes(added))
+            self.deleted.extend(bytes(added))
+            self.seen_count.extend(array('I', bytes(4 * added)))
+            self.correct_count.extend(array('I', bytes(4 * added)))
+            self.ease.extend(array('f', bytes(4 * added)))
+            self.interval.extend(array('f', bytes(4 * added)))
+            self.due.extend(array('d', bytes(8 * added)))
+            self.n_catalog = len(catalog)
+            self.active_count += added
+            self._active_tree = None
+        return True
+
+    # --- Statistika ---
+
+    @property
+    def deleted_count(self):
+        return len(self) - self.active_count
+
+    def recent_words(self, k=5):
+        """
+        Oxirgi qo'shilgan k ta faol so'z indeksi (eng yangisi birinchi). Katalogning
+        oxirgi qo'shilganlar halqasidan olinadi - butun lug'at ko'rib chiqilmaydi
+        """
+        offset = len(self.personal)
+        rows = [offset + row for row in reversed(self.catalog.recent)
+                if row < self.n_catalog and not self.deleted[offset + row]]
+        if len(rows) < k and self.n_catalog > len(self.catalog.recent):
+            # Halqadagi so'zlarning ko'pi o'chirilgan - lug'at oxiridan qidiramiz
+            rows = [i for i in islice(self.iter_active_backward(len(self)), k + offset) if i >= offset]
+        candidates = rows[:k]
+        candidates.extend(i for i in range(offset) if not self.deleted[i])
+        return heapq.nlargest(k, candidates, key=lambda i: self.added_date(i) or '')
+
+    def verify_stats(self):
+        """
+        Foydalanuvchi hisoblagichlarini noldan qayta hisoblab solishtirish. Farq topilsa
+        tuzatiladi; farqlar ro'yxati qaytariladi (bo'sh - hammasi to'g'ri). Umumiy katalog
+        (recent halqasi) boshqa foydalanuvchilarniki ham - bu yerda o'zgartirilmaydi
+        """
+        drift = []
+        learned = self.learned.count(1)
+        if learned != self.learned_count:
+            drift.append(f"learned {self.learned_count} != {learned}")
+            self.learned_count = learned
+        active = self.deleted.count(0)
+        if active != self.active_count:
+            drift.append(f"active {self.active_count} != {active}")
+            self.active_count = active
+            self._active_tree = None
+        return drift
+
+    # --- Tanlash ---
+
+    def active_indices(self):
+        return [i for i, deleted in enumerate(self.deleted) if not deleted]
+
+    def iter_active(self, start=0):
+        deleted = self.deleted
+        for i in range(start, len(deleted)):
+            if not deleted[i]:
+                yield i
+
+    def iter_active_backward(self, end):
+        """
+        end dan oldingi faol so'zlar (teskari tartibda)
+        """
+        deleted = self.deleted
+        for i in range(min(end, len(deleted)) - 1, -1, -1):
+            if not deleted[i]:
+                yield i
+
+    # --- Sahifalash ---
+
+    def _build_active_tree(self):
+        # Fenwick daraxti: tree[j] - (j - lowbit(j), j] oraliqdagi faol so'zlar soni
+        size = len(self)
+        tree = array('I', bytes(4 * (size + 1)))
+        for j in range(1, size + 1):
+            tree[j] += 0 if self.deleted[j - 1] else 1
+            parent = j + (j & -j)
+            if parent <= size:
+                tree[parent] += tree[j]
+        self._active_tree = tree
+
+    def _tree_add(self, i, delta):
+        tree = self._active_tree
+        j = i + 1
+        while j < len(tree):
+            tree[j] += delta
+            j += j & -j
+
+    def nth_active(self, n):
+        """
+        n-chi (0 dan) faol so'zning indeksi yoki None - O(log n)
+        """
+        if n < 0 or n >= self.active_count:
+            return None
+        if self._active_tree is None:
+            self._build_active_tree()
+        tree = self._active_tree
+        position = 0
+        remaining = n + 1
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            nxt = position + step
+            if nxt < len(tree) and tree[nxt] < remaining:
+                position = nxt
+                remaining -= tree[nxt]
+            step >>= 1
+        return position
+
+    def sorted_order(self):
+        """
+        (kalitlar, indekslar) - barcha so'zlar alifbo tartibida (katalog o'zgarmaguncha keshlanadi)
+        """
+        # Shaxsiy so'zlar bo'lmasa - katalogning umumiy tartibi ishlatiladi (indeks = qator)
+        if not self.personal:
+            return self.catalog.sorted_rows()
+        if self._sorted is None or self._sorted[0] != len(self):
+            pairs = sorted((word_key(self.word(i)), i) for i in range(len(self)))
+            self._sorted = (len(self), [key for key, _ in pairs], [i for _, i in pairs])
+        return self._sorted[1], self._sorted[2]
+
+    def sorted_position(self, prefix):
+        """
+        Alifbo tartibida prefix bilan boshlanadigan birinchi o'rin
+        """
+        keys, _ = self.sorted_order()
+        return bisect.bisect_left(keys, word_key(prefix))
+
+    def sample_active(self, k):
+        """
+        O'chirilmagan so'zlardan k tasini tasodifiy tanlash
+        """
+        size = len(self)
+        k = min(k, self.active_count)
+        if k <= 0:
+            return []
+
+        # Ko'pchilik so'zlar faol bo'lsa - butun ro'yxatni qurmasdan O(k) tanlash
+        if self.active_count * 2 >= size and k * 4 <= self.active_count:
+            chosen = set()
+            result = []
+            while len(result) < k:
+                i = random.randrange(size)
+                if not self.deleted[i] and i not in chosen:
+                    chosen.add(i)
+                    result.append(i)
+            return result
+
+        return random.sample(self.active_indices(), k)
+
+    def sample_new(self, k, exclude=()):
+        """
+        Hali ko'rilmagan faol so'zlardan k tasini tasodifiy tanlash
+        """
+        size = len(self)
+        if k <= 0 or not size:
+            return []
+
+        # Avval tasodifiy urinishlar (odatda yangi so'zlar ko'p), keyin to'liq ro'yxat
+        chosen = set(exclude)
+        result = []
+        for _ in range(k * 8):
+            i = random.randrange(size)
+            if i not in chosen and not self.deleted[i] and not self.seen_count[i]:
+                chosen.add(i)
+                result.append(i)
+                if len(result) == k:
+                    return result
+
+        rest = [i for i in range(size)
+                if i not in chosen and not self.deleted[i] and not self.seen_count[i]]
+        return result + random.sample(rest, min(k - len(result), len(rest)))
+
+    def most_due(self, k, until=None):
+        """
+        Muddati eng yaqin (yoki o'tib ketgan) k ta so'z - O(k log n).
+        until berilsa, faqat shu vaqtgacha muddati kelganlari
+        """
+        if self._due_heap is None:
+            self._due_heap = [(due, i) for i, due in enumerate(self.due) if due and not self.deleted[i]]
+            heapq.heapify(self._due_heap)
+
+        heap = self._due_heap
+        result = []
+        valid = []
+        taken = set()
+        while heap and len(result) < k:
+            due, i = heapq.heappop(heap)
+            # Eskirgan, takroriy yoki o'chirilgan so'z yozuvlari tashlab yuboriladi
+            if due != self.due[i] or self.deleted[i] or i in taken:
+                continue
+            taken.add(i)
+            valid.append((due, i))
+            if until is not None and due > until:
+                break
+            result.append(i)
+        for entry in valid:
+            heapq.heappush(heap, entry)
+        return result
+
+    def nbytes(self):
+        """
+        Foydalanuvchiga tegishli xotira hajmini taxminiy hisoblash (katalogsiz)
+        """
+        size = len(self)
+        heap = len(self._due_heap) if self._due_heap is not None else 0
+        tree = 4 * size if self._active_tree is not None else 0
+        ordered = 90 * size if self._sorted is not None else 0
+        return 30 * size + 100 * len(self.last_seen) + 300 * len(self.personal) + 70 * heap + tree + ordered + 200
+
+    def to_dataframe(self):
+        """
+        Oflayn tahlil uchun pandas DataFrame (so'rov yo'lida ishlatilmaydi)
+        """
+        import pandas as pd
+        return pd.DataFrame([self.record(i) for i in range(len(self))])
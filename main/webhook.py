@@ -0,0 +1,163 @@
+import asyncio
+import hmac
+import json
+import os
+import secrets
+import signal
+import time
+from collections import deque
+from telegram import Update
+
+# Webhook sozlamalari
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+# Tashqi URL bo'lsa maxfiy kalit majburiy: berilmagan bo'lsa har ishga tushishda yangisi
+# yaratiladi va set_webhook ga yuboriladi (aks holda istalgan kishi soxta update yubora oladi)
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "") or (secrets.token_urlsafe(32) if WEBHOOK_URL else "")
+# Telegram bir vaqtda nechta ulanish ochishi mumkin (1-100)
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+# Qayta ishlash vaqti hisoboti necha soniyada bir marta chiqariladi
+WEBHOOK_LATENCY_REPORT_INTERVAL = float(os.getenv("WEBHOOK_LATENCY_REPORT_INTERVAL", "60"))
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+class LatencyReport:
+    """
+    Har bir update ni qayta ishlash vaqti: oxirgi natijalar bo'yicha percentil hisobot
+    """
+
+    def __init__(self, size=2048):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, seconds, failed=False):
+        self.samples.append(seconds)
+        self.count += 1
+        if failed:
+            self.errors += 1
+
+    def summary(self):
+        if not self.samples:
+            return {'count': self.count, 'errors': self.errors}
+        ordered = sorted(self.samples)
+
+        def percentile(p):
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_ms': round(sum(ordered) / len(ordered) * 1000, 2),
+            'p50_ms': round(percentile(0.50), 2),
+            'p95_ms': round(percentile(0.95), 2),
+            'p99_ms': round(percentile(0.99), 2),
+            'max_ms': round(ordered[-1] * 1000, 2)
+        }
+
+
+def create_webhook_app(application, path=WEBHOOK_PATH, secret=WEBHOOK_SECRET, latency=None):
+    """
+    Update larni qabul qiladigan aiohttp ilovasi. Update lar polling rejimidagi
+    bilan bir xil handlerlarga yuboriladi
+    """
+    # aiohttp faqat webhook rejimida kerak - polling rejimida yuklanmaydi
+    from aiohttp import web
+    latency = latency if latency is not None else LatencyReport()
+
+    async def process(update, received):
+        failed = False
+        try:
+            await application.update_processor.process_update(update, application.process_update(update))
+        except Exception as e:
+            failed = True
+            print(f"Update ni qayta ishlashda xato: {e}")
+        latency.observe(time.perf_counter() - received, failed)
+
+    async def receive_update(request):
+        received = time.perf_counter()
+        if secret and not hmac.compare_digest(request.headers.get(SECRET_HEADER, ''), secret):
+            return web.Response(status=403)
+        try:
+            data = await request.json()
+            update = Update.de_json(data, application.bot)
+        except Exception as e:
+            print(f"Noto'g'ri update: {e}")
+            return web.Response(status=400)
+
+        # Telegramga darhol javob qaytaramiz, qayta ishlash fonda davom etadi
+        application.create_task(process(update, received), update=update)
+        return web.Response()
+
+    async def latency_stats(request):
+        return web.json_response(latency.summary())
+
+    app = web.Application()
+    app['latency'] = latency
+    app.router.add_post(path, receive_update)
+    app.router.add_get(f"{path.rstrip('/')}/latency", latency_stats)
+    return app
+
+
+async def _report_latency(latency, interval):
+    while True:
+        await asyncio.sleep(interval)
+        if latency.samples:
+            print(f"⏱ Update lar: {json.dumps(latency.summary())}")
+
+
+async def serve_webhook(application, listen=WEBHOOK_LISTEN, port=WEBHOOK_PORT, path=WEBHOOK_PATH,
+                        url=WEBHOOK_URL, secret=WEBHOOK_SECRET, max_connections=WEBHOOK_MAX_CONNECTIONS,
+                        allowed_updates=Update.ALL_TYPES):
+    """
+    Botni webhook rejimida ishga tushirish va to'xtash signalini kutish
+    """
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass
+
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+
+    # WEBHOOK_URL berilmagan bo'lsa (mahalliy sinov) Telegramda ro'yxatdan o'tkazilmaydi
+    if url:
+        await application.bot.set_webhook(
+            url=url.rstrip('/') + path,
+            secret_token=secret or None,
+            max_connections=max_connections,
+            allowed_updates=allowed_updates
+        )
+
+    from aiohttp import web
+    webhook_app = create_webhook_app(application, path, secret)
+    runner = web.AppRunner(webhook_app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, listen, port)
+
+    await application.start()
+    await site.start()
+    reporter = asyncio.create_task(_report_latency(webhook_app['latency'], WEBHOOK_LATENCY_REPORT_INTERVAL))
+    print(f"🌐 Webhook server: http://{listen}:{port}{path}")
+
+    try:
+        await stop_event.wait()
+    finally:
+        reporter.cancel()
+        await runner.cleanup()
+        await application.stop()
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+        print(f"⏱ Update lar: {json.dumps(webhook_app['latency'].summary())}")
+
+
+def run_webhook(application, **kwargs):
+    asyncio.run(serve_webhook(application, **kwargs))
@@ -0,0 +1,95 @@
+import os
+import unicodedata
+
+# Taklif qilish uchun so'zning eng kichik uzunligi (qisqa so'zlarda xatolar ko'p)
+SUGGEST_MIN_LENGTH = int(os.getenv("SUGGEST_MIN_LENGTH", "4"))
+
+# Apostrof variantlari (o' / o‘ / o’ / oʻ) bitta belgiga keltiriladi
+APOSTROPHES = str.maketrans({
+    '‘': "'", '’': "'", 'ʻ': "'", 'ʼ': "'",
+    '`': "'", '´': "'", 'ʹ': "'", '′': "'"
+})
+
+
+def normalize_word(word):
+    """
+    Qidiruv kaliti: Unicode NFKC, apostroflar bir xil, kichik harf, ortiqcha bo'shliqlarsiz
+    """
+    text = unicodedata.normalize('NFKC', str(word)).translate(APOSTROPHES)
+    return ' '.join(text.casefold().split())
+
+
+def edit_distance(a, b, limit=2):
+    """
+    Damerau-Levenshtein masofasi (qo'shni harflar almashinuvi bilan).
+    limit dan oshsa limit + 1 qaytariladi
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(key):
+    # Bitta harfi o'chirilgan barcha variantlar (symmetric delete)
+    return {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+class FuzzyIndex:
+    """
+    Xato yozilgan so'zlar uchun indeks (symmetric delete, masofa 1):
+    har bir kalit va uning bitta harfi o'chirilgan variantlari saqlanadi.
+    "recieve" -> "receive" kabi almashinuvlar ham topiladi
+    """
+
+    __slots__ = ('_variants',)
+
+    def __init__(self, keys=()):
+        self._variants = {}
+        for key in keys:
+            self.add(key)
+
+    def add(self, key):
+        if len(key) < SUGGEST_MIN_LENGTH:
+            return
+        self._variants.setdefault(key, set()).add(key)
+        for variant in _deletes(key):
+            self._variants.setdefault(variant, set()).add(key)
+
+    def candidates(self, key):
+        found = set(self._variants.get(key, ()))
+        for variant in _deletes(key):
+            found.update(self._variants.get(variant, ()))
+        return found
+
+    def suggest(self, word):
+        """
+        Eng yaqin kalit (yoki None). Aniq moslik taklif qilinmaydi
+        """
+        key = normalize_word(word)
+        if len(key) < SUGGEST_MIN_LENGTH:
+            return None
+
+        best = None
+        for candidate in self.candidates(key):
+            if candidate == key:
+                return None
+            distance = edit_distance(key, candidate, limit=1)
+            if distance > 1:
+                continue
+            # Birinchi harfi bir xil va uzunligi yaqin bo'lganlar afzal
+            rank = (distance, candidate[0] != key[0], abs(len(candidate) - len(key)), candidate)
+            if best is None or rank < best[0]:
+                best = (rank, candidate)
+        return best[1] if best is not None else None
@@ -0,0 +1,273 @@
+import asyncio
+import glob
+import hmac
+import json
+import os
+import secrets
+import signal
+import sys
+import httpx
+from telegram import Update
+from webhook import WEBHOOK_URL, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET, SECRET_HEADER
+
+# Ko'p jarayonli rejim: WORKERS > 1 bo'lsa asosiy jarayon update larni qabul qilib,
+# foydalanuvchi ID si bo'yicha workerlarga taqsimlaydi (har bir foydalanuvchi -
+# doim bitta workerda: sessiya, kesh va lug'at yozuvlari shu jarayonga tegishli)
+WORKERS = int(os.getenv("WORKERS", "1"))
+# Workerlar shu portdan boshlab mahalliy webhook serverlarini ochadi
+WORKER_BASE_PORT = int(os.getenv("WORKER_BASE_PORT", "8100"))
+# Worker jarayonida o'rnatiladi (worker o'zi boshqa workerlarni ishga tushirmaydi)
+WORKER_ID = os.getenv("WORKER_ID")
+# Bitta workerga yuborishni kutayotgan update lar soni (to'lsa qabul qilish sekinlashadi)
+WORKER_QUEUE_SIZE = int(os.getenv("WORKER_QUEUE_SIZE", "1000"))
+# getUpdates uzun so'rovi (soniya)
+POLL_TIMEOUT = int(os.getenv("POLL_TIMEOUT", "30"))
+
+# Workerlar orasida bo'linadigan umumiy limitlar (Telegram va tarjima provayderlari)
+SHARED_LIMITS = (
+    ('OUTBOX_GLOBAL_RATE', '28'),
+    ('OUTBOX_GLOBAL_BURST', '30'),
+    ('GOOGLE_RATE', '5'),
+    ('GOOGLE_BURST', '20'),
+    ('MYMEMORY_DAILY_QUOTA', '1000'),
+)
+
+WORKER_PATH = '/update'
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+
+
+def update_user_id(data):
+    """
+    Update dan foydalanuvchi ID sini topish (message, callback_query va boshqalar)
+    """
+    for key, value in data.items():
+        if not isinstance(value, dict):
+            continue
+        for field in ('from', 'user'):
+            user = value.get(field)
+            if isinstance(user, dict) and 'id' in user:
+                return int(user['id'])
+        chat = value.get('chat')
+        if isinstance(chat, dict) and 'id' in chat:
+            return int(chat['id'])
+    return 0
+
+
+def worker_environment(index, count, secret):
+    """
+    Worker jarayoni muhiti: mahalliy webhook, alohida jurnal va bo'lingan limitlar
+    """
+    environment = dict(os.environ)
+    environment.update({
+        'WORKER_ID': str(index),
+        'BOT_MODE': 'webhook',
+        'WEBHOOK_URL': '',
+        'WEBHOOK_LISTEN': '127.0.0.1',
+        'WEBHOOK_PORT': str(WORKER_BASE_PORT + index),
+        'WEBHOOK_PATH': WORKER_PATH,
+        'WEBHOOK_SECRET': secret,
+        'JOURNAL_FILE': f"user_vocabulary.w{index}.journal",
+    })
+    # Metrikalar: har bir worker o'z portida (asosiy port + 1 + index)
+    metrics_port = int(os.getenv("METRICS_PORT", "9100"))
+    environment['METRICS_PORT'] = str(metrics_port + 1 + index if metrics_port else 0)
+    for name, default in SHARED_LIMITS:
+        environment[name] = str(float(os.getenv(name, default)) / count)
+    return environment
+
+
+def compact_journals():
+    """
+    Oldingi ishga tushirishdan qolgan barcha jurnallarni snapshotlarga qo'shish
+    (workerlar soni o'zgargan bo'lsa ham foydalanuvchi yozuvlari yo'qolmaydi)
+    """
+    from storage import FileStorage, STORAGE_BACKEND
+    if STORAGE_BACKEND != 'file':
+        return
+    # Eskisidan boshlab - bitta foydalanuvchi bir nechta jurnalda bo'lsa, oxirgisi ustun
+    for path in sorted(glob.glob('user_vocabulary*.journal'), key=os.path.getmtime):
+        FileStorage(journal_file=path).close()
+
+
+class Dispatcher:
+    """
+    Update larni qabul qilib, user_id % N bo'yicha workerlarga yuborish.
+    Har bir worker uchun alohida navbat - bitta foydalanuvchining update lari tartibi saqlanadi
+    """
+
+    def __init__(self, token, api_url, count=WORKERS):
+        self.token = token
+        self.api_url = api_url
+        self.count = count
+        self.secret = secrets.token_hex(16)
+        self.queues = [asyncio.Queue(WORKER_QUEUE_SIZE) for _ in range(count)]
+        self.processes = [None] * count
+        self.stopping = asyncio.Event()
+        self.client = None
+        self.forwarded = 0
+        # Worker qabul qilmagan (4xx) va to'xtash paytida yetkazilmagan update lar
+        self.rejected = 0
+        self.lost = 0
+
+    async def dispatch(self, data):
+        worker = update_user_id(data) % self.count
+        await self.queues[worker].put(data)
+
+    async def forward(self, index):
+        url = f"http://127.0.0.1:{WORKER_BASE_PORT + index}{WORKER_PATH}"
+        queue = self.queues[index]
+        while True:
+            data = await queue.get()
+            delay = 0.1
+            status = None
+            # Worker ishga tushayotgan yoki qayta ishga tushayotgan bo'lsa - kutib qayta yuboramiz
+            while True:
+                try:
+                    response = await self.client.post(url, json=data, headers={SECRET_HEADER: self.secret})
+                    status = response.status_code
+                    if status < 500:
+                        break
+                except httpx.HTTPError:
+                    status = None
+                if self.stopping.is_set() and self.processes[index] is None:
+                    break
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 5)
+            if status is not None and status < 300:
+                self.forwarded += 1
+            elif status is not None and status < 500:
+                # Qayta yuborish foyda bermaydi (noto'g'ri update yoki kalit) - qayd qilamiz
+                self.rejected += 1
+                print(f"⚠️ Worker {index} update {data.get('update_id')} ni rad etdi: HTTP {status}")
+            else:
+                self.lost += 1
+            queue.task_done()
+
+    async def start_worker(self, index):
+        self.processes[index] = await asyncio.create_subprocess_exec(
+            sys.executable, MAIN_SCRIPT, env=worker_environment(index, self.count, self.secret)
+        )
+
+    async def supervise(self, index):
+        # To'xtab qolgan workerni qayta ishga tushirish
+        while not self.stopping.is_set():
+            await self.start_worker(index)
+            code = await self.processes[index].wait()
+            if self.stopping.is_set():
+                break
+            print(f"⚠️ Worker {index} to'xtadi (kod {code}), qayta ishga tushirilmoqda")
+            await asyncio.sleep(1)
+        self.processes[index] = None
+
+    async def wait_ready(self, timeout=60):
+        # Workerlar webhook serverini ochguncha update qabul qilinmaydi
+        deadline = asyncio.get_running_loop().time() + timeout
+        for index in range(self.count):
+            while asyncio.get_running_loop().time() < deadline and not self.stopping.is_set():
+                try:
+                    _, writer = await asyncio.open_connection('127.0.0.1', WORKER_BASE_PORT + index)
+                    writer.close()
+                    break
+                except OSError:
+                    await asyncio.sleep(0.2)
+
+    async def poll(self):
+        """
+        getUpdates orqali update larni olish (polling rejimi)
+        """
+        base = f"{self.api_url}{self.token}"
+        await self.client.post(f"{base}/deleteWebhook")
+        offset = None
+        while not self.stopping.is_set():
+            params = {'timeout': POLL_TIMEOUT, 'allowed_updates': json.dumps(Update.ALL_TYPES)}
+            if offset is not None:
+                params['offset'] = offset
+            try:
+                response = await self.client.post(f"{base}/getUpdates", data=params, timeout=POLL_TIMEOUT + 10)
+                updates = response.json().get('result') or []
+            except Exception as e:
+                print(f"getUpdates xatosi: {e}")
+                await asyncio.sleep(1)
+                continue
+            for data in updates:
+                offset = data['update_id'] + 1
+                await self.dispatch(data)
+
+    async def serve_webhook(self):
+        """
+        Telegram webhook ni asosiy jarayonda qabul qilish (webhook rejimi)
+        """
+        from aiohttp import web
+        async def receive_update(request):
+            if WEBHOOK_SECRET and not hmac.compare_digest(request.headers.get(SECRET_HEADER, ''), WEBHOOK_SECRET):
+                return web.Response(status=403)
+            try:
+                data = await request.json()
+            except Exception as e:
+                print(f"Noto'g'ri update: {e}")
+                return web.Response(status=400)
+            await self.dispatch(data)
+            return web.Response()
+
+        app = web.Application()
+        app.router.add_post(WEBHOOK_PATH, receive_update)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, WEBHOOK_LISTEN, WEBHOOK_PORT).start()
+        if WEBHOOK_URL:
+            params = {'url': WEBHOOK_URL.rstrip('/') + WEBHOOK_PATH,
+                      'allowed_updates': json.dumps(Update.ALL_TYPES)}
+            if WEBHOOK_SECRET:
+                params['secret_token'] = WEBHOOK_SECRET
+            await self.client.post(f"{self.api_url}{self.token}/setWebhook", data=params)
+        print(f"🌐 Webhook server: http://{WEBHOOK_LISTEN}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+        try:
+            await self.stopping.wait()
+        finally:
+            await runner.cleanup()
+
+    async def run(self, mode):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stopping.set)
+            except NotImplementedError:
+                pass
+
+        self.client = httpx.AsyncClient(timeout=httpx.Timeout(10.0))
+        supervisors = [asyncio.create_task(self.supervise(index)) for index in range(self.count)]
+        forwarders = [asyncio.create_task(self.forward(index)) for index in range(self.count)]
+        await self.wait_ready()
+        ingress = asyncio.create_task(self.serve_webhook() if mode == 'webhook' else self.poll())
+        print(f"⚙️ {self.count} ta worker ishga tushirildi")
+        try:
+            await self.stopping.wait()
+        finally:
+            ingress.cancel()
+            await asyncio.gather(ingress, return_exceptions=True)
+            # Qabul qilingan update larni workerlarga yetkazib, keyin ularni to'xtatamiz
+            try:
+                await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self.queues)), 10)
+            except asyncio.TimeoutError:
+                print("⚠️ Ba'zi update lar workerlarga yetkazilmadi")
+            for task in forwarders:
+                task.cancel()
+            for process in self.processes:
+                if process is not None and process.returncode is None:
+                    process.send_signal(signal.SIGTERM)
+            await asyncio.gather(*supervisors, return_exceptions=True)
+            await self.client.aclose()
+            print(f"📦 Workerlarga yuborilgan update lar: {self.forwarded}, "
+                  f"rad etilgan: {self.rejected}, yetkazilmagan: {self.lost}")
+
+
+def is_dispatcher():
+    return WORKERS > 1 and WORKER_ID is None
+
+
+def run_dispatcher(token, api_url, mode):
+    compact_journals()
+    # Oflayn lug'atni workerlardan oldin bir marta yig'amiz (ular faqat o'qiydi)
+    from dictionary import get_dictionary
+    get_dictionary()
+    asyncio.run(Dispatcher(token, api_url).run(mode))
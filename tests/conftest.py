@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# Bot modullari main/ papkasida (paket emas) - testlar ularni to'g'ridan-to'g'ri import qiladi
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main'))
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # Modullar nisbiy yo'llarga yozadi - har bir test o'z vaqtinchalik papkasida
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
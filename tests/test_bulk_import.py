@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+import bulk_import
+import translation
+from bulk_import import parse_bulk_text, translate_missing
+from outbox import TokenBucket
+from providers import ProviderRouter, TranslateLimitReached
+from translation_cache import TranslationCache
+
+BURST = 20
+
+
+@pytest.fixture
+def limited(monkeypatch, tmp_path):
+    calls = []
+
+    async def fake_provider(word, source_lang, target_lang):
+        calls.append(word)
+        return f"{word}-uz"
+
+    # Daqiqasiga 6 ta tarjima, zaxira - BURST ta
+    router = ProviderRouter([('fake', fake_provider, TokenBucket(1000, 1000))], user_rate=0.1, user_burst=BURST)
+    cache = TranslationCache(path=str(tmp_path / 'cache.db'))
+    monkeypatch.setattr(translation, 'provider_router', router)
+    monkeypatch.setattr(translation, 'translation_cache', cache)
+    monkeypatch.setattr(translation, 'lookup_dictionary', lambda word: None)
+    yield router, cache, calls
+    cache.close()
+
+
+def test_bulk_import_over_user_limit_defers_rest(limited):
+    router, cache, calls = limited
+    cache.set('qqcached', 'keshdan')
+    words = [f"qqword{n}" for n in range(50)] + ['book', 'qqcached']
+    entries = parse_bulk_text("\n".join(words))
+
+    deferred = asyncio.run(translate_missing(entries, user_id=1, concurrency=4))
+
+    translated = [entry for entry in entries if entry['translation']]
+    # Zaxiradagi tarmoq tarjimalari, kichik lug'at va kesh limitdan qat'i nazar ishlaydi
+    assert len(calls) == BURST
+    assert len(translated) == BURST + 2
+    assert {'book', 'qqcached'} <= {entry['word'] for entry in translated}
+    # Qolganlari jim tashlab yuborilmaydi - alohida qaytariladi
+    assert len(deferred) == 50 - BURST
+    assert all(not entry['translation'] for entry in deferred)
+    assert {entry['word'] for entry in deferred} | {entry['word'] for entry in translated} == set(words)
+    assert router.user_wait(1, len(deferred)) > 0
+
+
+def test_translate_word_reports_limit(limited):
+    router, _, _ = limited
+    for n in range(BURST):
+        assert asyncio.run(translation.translate_word(f"qqsingle{n}", user_id=7)) == f"qqsingle{n}-uz"
+    with pytest.raises(TranslateLimitReached) as error:
+        asyncio.run(translation.translate_word('qqmore', user_id=7))
+    assert 0 < error.value.retry_after <= 10
+    # Boshqa foydalanuvchi byudjeti alohida
+    assert asyncio.run(translation.translate_word('qqmore', user_id=8)) == 'qqmore-uz'
+
+
+def test_no_limit_without_user(limited):
+    entries = parse_bulk_text("\n".join(f"qqfree{n}" for n in range(BURST + 5)))
+    assert asyncio.run(bulk_import.translate_missing(entries)) == []
+    assert all(entry['translation'] for entry in entries)
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+import dictionary
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    # Har bir test lug'atni joriy (vaqtinchalik) papkadan qaytadan ochadi
+    monkeypatch.setattr(dictionary, '_dictionary', None)
+    monkeypatch.setattr(dictionary, '_dictionary_missing', False)
+    yield
+    if dictionary._dictionary is not None:
+        dictionary._dictionary.close()
+
+
+def write_source(text, mtime=None):
+    with open('lugat.csv', 'w', encoding='utf-8') as f:
+        f.write(text)
+    if mtime is not None:
+        os.utime('lugat.csv', (mtime, mtime))
+
+
+def reopen():
+    dictionary._dictionary.close()
+    dictionary._dictionary = None
+    return dictionary.get_dictionary()
+
+
+def test_auto_build_includes_simple_dict(fresh):
+    write_source("english,uzbek\nhouse,uy\napple,olma (meva)\n")
+    compiled = dictionary.get_dictionary()
+    assert compiled.get('house') == 'uy'
+    # Manbadagi tarjima ustun, qolganlari SIMPLE_DICT dan
+    assert compiled.get('apple') == 'olma (meva)'
+    assert compiled.get('book') == 'kitob'
+
+
+def test_rebuild_when_source_is_newer(fresh):
+    write_source("house,uy\n", mtime=1_000_000_000)
+    assert dictionary.get_dictionary().get('house') == 'uy'
+
+    # Manba o'zgarmagan - fayl qayta yig'ilmaydi
+    built = os.path.getmtime(dictionary.DICTIONARY_FILE)
+    assert reopen().get('house') == 'uy'
+    assert os.path.getmtime(dictionary.DICTIONARY_FILE) == built
+
+    write_source("house,uy\nriver,daryo\n", mtime=built + 10)
+    assert reopen().get('river') == 'daryo'
+
+
+def test_missing_sources(fresh):
+    assert dictionary.get_dictionary() is None
+    assert not os.path.exists(dictionary.DICTIONARY_FILE)
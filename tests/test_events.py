@@ -0,0 +1,92 @@
+import asyncio
+
+from events import ANSWER, VIEW, EventLog, FileEventSink, summarize
+
+
+class MemorySink:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.closed = False
+
+    def write(self, events):
+        if self.fail:
+            raise OSError("disk to'la")
+        self.batches.append(list(events))
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def events(self):
+        return [event for batch in self.batches for event in batch]
+
+
+def test_flush_by_batch_size():
+    async def scenario():
+        sink = MemorySink()
+        log = EventLog(sink, batch_size=5, flush_interval=60)
+        log.start()
+        for n in range(12):
+            log.record(VIEW, 1, word_id=n)
+        await log._flushing
+        written = [len(batch) for batch in sink.batches]
+        await log.stop()
+        return written, sink
+
+    written, sink = asyncio.run(scenario())
+    assert written[0] >= 5
+    assert [event['word_id'] for event in sink.events] == list(range(12))
+
+
+def test_flush_by_interval():
+    async def scenario():
+        sink = MemorySink()
+        log = EventLog(sink, batch_size=100, flush_interval=0.05)
+        log.start()
+        log.record(ANSWER, 1, correct=True)
+        before = len(sink.events)
+        await asyncio.sleep(0.12)
+        after = len(sink.events)
+        await log.stop()
+        return before, after
+
+    assert asyncio.run(scenario()) == (0, 1)
+
+
+def test_stop_drains_buffer(tmp_path):
+    sink = FileEventSink(str(tmp_path / 'events.log'))
+
+    async def scenario():
+        log = EventLog(sink, batch_size=100, flush_interval=60)
+        log.start()
+        for n in range(30):
+            log.record(ANSWER, n % 3, correct=n % 2 == 0)
+        await log.stop()
+        return log
+
+    log = asyncio.run(scenario())
+    assert log.written == 30 and log._buffer == []
+    counters = summarize(sink)
+    assert sorted(counters) == ['0', '1', '2']
+    assert sum(c['answers'] for c in counters.values()) == 30
+    assert sum(c['correct'] for c in counters.values()) == 15
+
+
+def test_records_before_start_are_bounded():
+    sink = MemorySink()
+    log = EventLog(sink, batch_size=10)
+    for n in range(95):
+        log.record(VIEW, 1, word_id=n)
+    # start() chaqirilmagan - to'lgan paketlar darhol yoziladi
+    assert len(log._buffer) < 10
+    assert log.written == 90
+    assert [event['word_id'] for event in sink.events] == list(range(90))
+
+
+def test_failing_sink_before_start_drops_beyond_limit():
+    log = EventLog(MemorySink(fail=True), batch_size=2)
+    for n in range(500):
+        log.record(VIEW, 1, word_id=n)
+    assert len(log._buffer) <= 2 * 50 + 2
+    assert log.dropped + len(log._buffer) == 500
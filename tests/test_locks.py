@@ -0,0 +1,69 @@
+import asyncio
+
+from locks import KeyedLock
+
+
+def test_same_key_runs_in_arrival_order():
+    async def scenario():
+        locks = KeyedLock()
+        order = []
+
+        async def task(n):
+            async with locks.lock('user'):
+                order.append(('start', n))
+                await asyncio.sleep(0)
+                order.append(('end', n))
+
+        await asyncio.gather(*(task(n) for n in range(5)))
+        return order, locks.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == [(event, n) for n in range(5) for event in ('start', 'end')]
+    assert stats == {'keys': 0, 'waiting': 0}
+
+
+def test_different_keys_run_in_parallel():
+    async def scenario():
+        locks = KeyedLock()
+        inside = asyncio.Event()
+        release = asyncio.Event()
+
+        async def holder():
+            async with locks.lock(1):
+                inside.set()
+                await release.wait()
+
+        async def other(key):
+            async with locks.lock(key):
+                return key
+
+        first = asyncio.create_task(holder())
+        await inside.wait()
+        # Boshqa kalit birinchi qulf bo'shashini kutmaydi
+        result = await asyncio.wait_for(other(2), 1)
+        waiter = asyncio.create_task(other(1))
+        await asyncio.sleep(0)
+        busy = locks.stats()
+        release.set()
+        await asyncio.gather(first, waiter)
+        return result, busy, locks.stats()
+
+    result, busy, idle = asyncio.run(scenario())
+    assert result == 2
+    assert busy == {'keys': 1, 'waiting': 1}
+    assert idle == {'keys': 0, 'waiting': 0}
+
+
+def test_lock_released_on_error():
+    async def scenario():
+        locks = KeyedLock()
+        try:
+            async with locks.lock('user'):
+                raise ValueError
+        except ValueError:
+            pass
+        async with locks.lock('user'):
+            pass
+        return locks.stats()
+
+    assert asyncio.run(scenario()) == {'keys': 0, 'waiting': 0}
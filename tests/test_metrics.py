@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    # Test metrikalari botning umumiy ro'yxatiga qo'shilmasligi uchun
+    monkeypatch.setattr(metrics, '_metrics', [])
+    monkeypatch.setattr(metrics, '_collectors', [])
+
+
+def parse(text):
+    """
+    Prometheus matn formati: {'nom{label}': qiymat}, HELP/TYPE qatorlari alohida
+    """
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            types[name] = kind
+        elif line and not line.startswith('#'):
+            key, value = line.rsplit(' ', 1)
+            samples[key] = float(value)
+    return samples, types
+
+
+def test_counter_histogram_and_collector_rendering(registry):
+    errors = metrics.Counter('t_errors_total', "Xatolar", ('handler',))
+    latency = metrics.Histogram('t_seconds', "Vaqt", ('handler',), buckets=(0.1, 1.0))
+    errors.inc('button')
+    errors.inc('button', amount=2)
+    latency.observe(0.05, 'message')
+    latency.observe(0.5, 'message')
+    latency.observe(3.0, 'message')
+    metrics.register_collector('t_queue', lambda: {'depth': 4, 'ratio': 0.5, 'on': True, 'name': 'x'}, "Navbat")
+    metrics.register_collector('t_broken', lambda: 1 / 0)
+
+    text = metrics.render()
+    samples, types = parse(text)
+    assert text.endswith('\n')
+    assert '# HELP t_errors_total Xatolar' in text
+    assert types == {'t_errors_total': 'counter', 't_seconds': 'histogram',
+                     't_queue_depth': 'gauge', 't_queue_ratio': 'gauge'}
+    assert samples == {
+        't_errors_total{handler="button"}': 3,
+        't_seconds_bucket{handler="message",le="0.1"}': 1,
+        't_seconds_bucket{handler="message",le="1.0"}': 2,
+        't_seconds_bucket{handler="message",le="+Inf"}': 3,
+        't_seconds_sum{handler="message"}': 3.55,
+        't_seconds_count{handler="message"}': 3,
+        't_queue_depth': 4,
+        't_queue_ratio': 0.5,
+    }
+
+
+def message_update(user_id, text, replies):
+    async def reply_text(text, **kwargs):
+        replies.append(text)
+    message = SimpleNamespace(text=text, chat_id=user_id, reply_text=reply_text)
+    return SimpleNamespace(effective_user=SimpleNamespace(id=user_id), effective_message=message,
+                           message=message, callback_query=None, effective_chat=SimpleNamespace(id=user_id))
+
+
+def test_handler_call_visible_on_metrics_endpoint():
+    from aiohttp import web
+    from aiohttp.test_utils import TestClient, TestServer
+    import main
+
+    key = 'lugat_handler_seconds_count{handler="message",branch="prompt"}'
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get(metrics.METRICS_PATH, metrics.handle_metrics)
+        async with TestClient(TestServer(app)) as client:
+            async def scrape():
+                response = await client.get(metrics.METRICS_PATH)
+                assert response.status == 200
+                assert response.content_type == 'text/plain'
+                return parse(await response.text())
+
+            before, _ = await scrape()
+            replies = []
+            await main.handle_message(message_update(555, 'hello', replies), None)
+            after, types = await scrape()
+            return before, after, types, replies
+
+    before, after, types, replies = asyncio.run(scenario())
+    assert replies and "'hello'" in replies[0]
+    assert after[key] == before.get(key, 0) + 1
+    assert after[key.replace('_count', '_bucket').replace('}', ',le="+Inf"}')] == after[key]
+    assert types['lugat_handler_seconds'] == 'histogram'
+    assert types['lugat_handler_errors_total'] == 'counter'
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from telegram.error import RetryAfter
+
+from outbox import (OutboxRateLimiter, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, TokenBucket,
+                    retry_seconds)
+
+
+def send(limiter, chat_id, result=None, priority=None, endpoint='sendMessage', callback=None):
+    async def default():
+        return result
+    return limiter.process_request(callback or default, (), {}, endpoint, {'chat_id': chat_id}, priority)
+
+
+def timed(coroutine_factory):
+    async def scenario():
+        started = time.monotonic()
+        result = await coroutine_factory()
+        return result, time.monotonic() - started
+    return asyncio.run(scenario())
+
+
+def test_token_bucket():
+    bucket = TokenBucket(10, 2)
+    assert bucket.delay() == 0
+    bucket.take()
+    bucket.take()
+    assert bucket.delay() == pytest.approx(0.1, abs=0.02)
+    # Band qilingan tokenlar uchun kutish navbat bilan o'sadi
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.02)
+
+
+def test_global_bucket_spaces_sends_across_chats():
+    limiter = OutboxRateLimiter(global_rate=20, global_burst=2, chat_rate=100, chat_burst=100)
+    results, elapsed = timed(lambda: asyncio.gather(*(send(limiter, chat, chat) for chat in range(6))))
+    assert results == list(range(6))
+    # 2 tasi darhol, qolgan 4 tasi 1/20 s oraliq bilan
+    assert 0.18 <= elapsed < 0.5
+    assert limiter.stats()['sent'] == 6 and limiter.stats()['queue_depth'] == 0
+
+
+def test_chat_bucket_limits_one_chat_only():
+    limiter = OutboxRateLimiter(global_rate=1000, global_burst=1000, chat_rate=10, chat_burst=1)
+    _, same_chat = timed(lambda: asyncio.gather(*(send(limiter, 1) for _ in range(3))))
+    assert 0.18 <= same_chat < 0.5
+    _, other_chats = timed(lambda: asyncio.gather(*(send(limiter, chat) for chat in range(2, 12))))
+    assert other_chats < 0.05
+
+
+def test_group_chats_use_group_rate():
+    limiter = OutboxRateLimiter(global_rate=1000, global_burst=1000, chat_rate=100, chat_burst=100,
+                                group_rate=10)
+    _, elapsed = timed(lambda: asyncio.gather(send(limiter, -100), send(limiter, -100)))
+    assert 0.08 <= elapsed < 0.3
+
+
+def test_unlimited_endpoints_not_throttled():
+    limiter = OutboxRateLimiter(global_rate=1, global_burst=1)
+    _, elapsed = timed(lambda: asyncio.gather(*(send(limiter, None, endpoint='getUpdates') for _ in range(5))))
+    assert elapsed < 0.05
+
+
+def test_background_sends_yield_to_interactive():
+    async def scenario():
+        limiter = OutboxRateLimiter(global_rate=50, global_burst=1, chat_rate=1000, chat_burst=1000)
+        order = []
+
+        def record(name):
+            async def callback():
+                order.append(name)
+            return callback
+
+        # Birinchi yuborish tokenni oladi, keyingilar navbatda kutadi
+        await send(limiter, 0, callback=record('first'))
+        tasks = [asyncio.create_task(send(limiter, n, priority=PRIORITY_BACKGROUND, callback=record(f"bg{n}")))
+                 for n in range(1, 4)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(send(limiter, 9, priority=PRIORITY_INTERACTIVE, callback=record('reply'))))
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(scenario())
+    assert order == ['first', 'reply', 'bg1', 'bg2', 'bg3']
+
+
+def test_retry_after_pauses_and_retries_once():
+    calls = []
+
+    async def callback():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise RetryAfter(timedelta(milliseconds=200))
+        return 'ok'
+
+    limiter = OutboxRateLimiter(global_rate=1000, global_burst=1000, chat_rate=1000, chat_burst=1000)
+    result, _ = timed(lambda: send(limiter, 5, callback=callback))
+    assert result == 'ok'
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.19
+    assert limiter.stats()['retries'] == 1 and limiter.stats()['sent'] == 1
+
+
+def test_retry_after_gives_up_after_max_retries():
+    calls = []
+
+    async def callback():
+        calls.append(1)
+        raise RetryAfter(timedelta(milliseconds=10))
+
+    limiter = OutboxRateLimiter(global_rate=1000, global_burst=1000, max_retries=1)
+    with pytest.raises(RetryAfter):
+        asyncio.run(send(limiter, 5, callback=callback))
+    assert len(calls) == 2
+
+
+def test_retry_seconds():
+    assert retry_seconds(RetryAfter(timedelta(seconds=1.5))) == 1.5
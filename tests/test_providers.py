@@ -0,0 +1,60 @@
+import asyncio
+
+from outbox import TokenBucket
+from providers import HALF_OPEN, OPEN, ProviderError, ProviderRouter
+
+
+def make_router(function):
+    return ProviderRouter([('flaky', function, TokenBucket(1000, 1000)),
+                           ('backup', function, TokenBucket(1000, 1000))])
+
+
+def open_breaker(router, name):
+    health = router.health[name]
+    health._open()
+    # Sinov vaqti keldi
+    health.opened_at -= health.open_seconds + 1
+    return health
+
+
+def test_unexpected_error_during_probe_reopens_breaker():
+    async def broken(*args):
+        raise KeyError('data')
+
+    router = make_router(broken)
+    health = open_breaker(router, 'flaky')
+    assert router.plan()[0] == 'flaky' and health.state == HALF_OPEN
+
+    assert asyncio.run(router.call('flaky', 'word')) == (None, False)
+    assert not health.probing
+    assert health.state == OPEN and health.errors == 1
+    assert router.plan() == ['backup']
+
+    # Keyingi sinov vaqti kelganda provayder yana tekshiriladi
+    health.opened_at -= health.open_seconds + 1
+    assert 'flaky' in router.plan()
+
+
+def test_probe_success_closes_breaker():
+    calls = []
+
+    async def recovered(*args):
+        calls.append(args)
+        return 'ok'
+
+    router = make_router(recovered)
+    health = open_breaker(router, 'flaky')
+    router.plan()
+    assert asyncio.run(router.call('flaky', 'word')) == ('ok', True)
+    assert not health.probing and health.state != OPEN
+
+
+def test_provider_error_counts_as_failure():
+    async def failing(*args):
+        raise ProviderError('HTTP 503')
+
+    router = make_router(failing)
+    for _ in range(10):
+        asyncio.run(router.call('flaky', 'word'))
+    assert router.health['flaky'].state == OPEN
+    assert router.plan() == ['backup']
@@ -0,0 +1,56 @@
+import numpy as np
+
+from quiz import DUMMY_OPTIONS, QUIZ_OPTIONS, build_quiz
+from vocab import Catalog, UserVocabulary
+
+
+def make_vocab(pairs):
+    catalog = Catalog()
+    for n, (word, translation) in enumerate(pairs):
+        catalog.append(n + 1, word, translation)
+    return UserVocabulary(catalog)
+
+
+def assert_valid(question):
+    options = question['options']
+    assert len(options) == QUIZ_OPTIONS
+    assert len(set(options)) == QUIZ_OPTIONS
+    assert options[question['answer']] == question['translation']
+    assert options.count(question['translation']) == 1
+
+
+def test_distractors_distinct_and_never_the_answer():
+    # Takroriy tarjimalar va bir xil so'zlar ham variantlarda takrorlanmasligi kerak
+    pairs = [(f"word{n}", f"tr{n % 7}") for n in range(40)] + [('Apple', 'olma'), ('apple', 'olma2')]
+    vocab = make_vocab(pairs)
+    for similar in (True, False):
+        for seed in range(20):
+            quiz = build_quiz(vocab, list(range(len(vocab))), similar=similar, rng=np.random.default_rng(seed))
+            assert len(quiz) == len(vocab)
+            for question in quiz:
+                assert_valid(question)
+            apple = quiz[-2]
+            assert 'olma2' not in apple['options']
+
+
+def test_deleted_words_not_used_as_distractors():
+    vocab = make_vocab([(f"word{n}", f"tr{n}") for n in range(10)])
+    for i in range(2, 10):
+        vocab.update(i, {'deleted': True})
+    vocab.update(9, {'deleted': False})
+    vocab.update(8, {'deleted': False})
+    quiz = build_quiz(vocab, [0], rng=np.random.default_rng(1))
+    assert set(quiz[0]['options']) == {'tr0', 'tr1', 'tr8', 'tr9'}
+
+
+def test_small_vocabulary_falls_back_to_dummy_options():
+    for size in (1, 2, QUIZ_OPTIONS - 1):
+        vocab = make_vocab([(f"word{n}", f"tr{n}") for n in range(size)])
+        quiz = build_quiz(vocab, list(range(size)), rng=np.random.default_rng(size))
+        for question in quiz:
+            assert_valid(question)
+            assert set(question['options']) == {question['translation'], *DUMMY_OPTIONS}
+
+
+def test_empty_question_list():
+    assert build_quiz(make_vocab([('a', 'b')]), []) == []
@@ -0,0 +1,91 @@
+import pytest
+
+from scheduler import (DAY, QUALITY_CORRECT, QUALITY_WRONG, SRS_DEFAULT_EASE, SRS_FIRST_DELAY,
+                       SRS_LEARNED_INTERVAL, SRS_MIN_EASE, SRS_RELEARN_DELAY, introduce,
+                       pick_learn_words, pick_test_words, review)
+from vocab import Catalog, UserVocabulary
+
+NOW = 1700000000.0
+
+
+@pytest.fixture
+def vocab():
+    catalog = Catalog()
+    catalog.append(1, 'apple', 'olma')
+    return UserVocabulary(catalog)
+
+
+def answer(vocab, quality, now=NOW):
+    changes = review(vocab, 0, quality, now)
+    vocab.update(0, changes)
+    return changes
+
+
+def test_correct_answers_grow_interval(vocab):
+    first = answer(vocab, QUALITY_CORRECT)
+    assert first['interval'] == 1.0
+    assert first['due'] == NOW + DAY
+    assert first['seen_count'] == 1 and first['correct_count'] == 1
+
+    assert answer(vocab, QUALITY_CORRECT)['interval'] == 6.0
+    ease = vocab.ease[0]
+    third = answer(vocab, QUALITY_CORRECT)
+    assert third['interval'] == pytest.approx(6.0 * ease, abs=1e-3)
+    assert vocab.correct_count[0] == 3
+
+
+def test_ease_changes_with_quality(vocab):
+    # Sifat 4 - ease o'zgarmaydi, 3 - kamayadi, 5 - ortadi
+    assert answer(vocab, QUALITY_CORRECT)['ease'] == SRS_DEFAULT_EASE
+    assert answer(vocab, 3)['ease'] < SRS_DEFAULT_EASE
+    assert 'correct_count' not in review(vocab, 0, 3, NOW)
+    assert review(vocab, 0, 5, NOW)['ease'] > vocab.ease[0]
+
+
+def test_wrong_answer_resets_interval(vocab):
+    answer(vocab, QUALITY_CORRECT)
+    answer(vocab, QUALITY_CORRECT)
+    wrong = answer(vocab, QUALITY_WRONG)
+    assert wrong['interval'] == 0.0
+    assert wrong['due'] == NOW + SRS_RELEARN_DELAY
+    assert wrong['learned'] is False
+    assert vocab.correct_count[0] == 2
+
+    for _ in range(20):
+        answer(vocab, QUALITY_WRONG)
+    assert vocab.ease[0] == pytest.approx(SRS_MIN_EASE)
+
+
+def test_learned_after_long_interval(vocab):
+    intervals = []
+    while not vocab.learned[0]:
+        intervals.append(answer(vocab, QUALITY_CORRECT)['interval'])
+        assert len(intervals) < 10
+    assert intervals[-1] >= SRS_LEARNED_INTERVAL
+    assert all(interval < SRS_LEARNED_INTERVAL for interval in intervals[:-1])
+    assert vocab.learned_count == 1
+
+    answer(vocab, QUALITY_WRONG)
+    assert not vocab.learned[0] and vocab.learned_count == 0
+
+
+def test_introduce_schedules_without_grading(vocab):
+    changes = introduce(vocab, 0, NOW)
+    vocab.update(0, changes)
+    assert changes['due'] == NOW + SRS_FIRST_DELAY
+    assert 'ease' not in changes and 'interval' not in changes and 'learned' not in changes
+    assert vocab.seen_count[0] == 1 and vocab.correct_count[0] == 0
+
+    # Ko'rilgan so'z testga chiqadi, birinchi to'g'ri javob - SM-2 ning birinchi qadami
+    assert pick_test_words(vocab, 1) == [0]
+    assert answer(vocab, QUALITY_CORRECT, NOW + SRS_FIRST_DELAY)['interval'] == 1.0
+
+
+def test_introduce_keeps_existing_schedule(vocab):
+    answer(vocab, QUALITY_CORRECT)
+    due = vocab.due[0]
+    changes = introduce(vocab, 0, NOW + DAY)
+    assert 'due' not in changes
+    vocab.update(0, changes)
+    assert vocab.due[0] == due and vocab.interval[0] == 1.0
+    assert pick_learn_words(vocab, 1, NOW + DAY) == [0]
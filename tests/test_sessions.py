@@ -0,0 +1,100 @@
+import time
+
+from sessions import SessionStore
+from storage import FileStorage
+
+
+class CountingStorage(FileStorage):
+    def __init__(self, directory):
+        super().__init__(directory=str(directory))
+        self.saved = []
+
+    def save_sessions(self, sessions):
+        self.saved.append(sorted(sessions))
+        super().save_sessions(sessions)
+
+
+def words(count):
+    return [{'id': n, 'word': f"w{n}"} for n in range(count)]
+
+
+def test_lru_eviction_by_count_writes_back(tmp_path):
+    store = SessionStore(CountingStorage(tmp_path), max_users=2)
+    store[1] = {'step': 1}
+    store[2] = {'step': 2}
+    assert 1 in store  # 1 - eng yangi, 2 - eng eski
+    store[3] = {'step': 3}
+    assert len(store) == 2
+    assert list(store._sessions) == [1, 3]
+    assert store.storage.saved == [[2]]
+
+
+def test_lru_eviction_by_bytes(tmp_path):
+    store = SessionStore(CountingStorage(tmp_path), max_bytes=2000)
+    store[1] = {'words_to_learn': words(4)}
+    store[2] = {'step': 2}
+    assert list(store._sessions) == [2]
+    assert store.stats()['bytes'] <= 2000
+
+    # Sessiya o'sganda ham byudjet qayta hisoblanadi
+    store[2]['test_words'] = words(4)
+    store.flush()
+    assert list(store._sessions) == [2]
+    store[3] = {'step': 3}
+    assert list(store._sessions) == [3]
+
+
+def test_idle_sessions_expire(tmp_path):
+    store = SessionStore(CountingStorage(tmp_path), idle_ttl=0.05)
+    store[1] = {'step': 1}
+    store[2] = {'step': 2}
+    time.sleep(0.06)
+    assert store[2]['step'] == 2
+    store.evict_idle()
+    assert list(store._sessions) == [2]
+    assert store.storage.saved == [[1]]
+
+
+def test_evicted_session_restored_from_disk(tmp_path):
+    store = SessionStore(CountingStorage(tmp_path), max_users=1)
+    store[1] = {'step': 1, 'words_to_learn': words(2)}
+    store[2] = {'step': 2}
+    assert list(store._sessions) == [2]
+
+    assert store[1] == {'step': 1, 'words_to_learn': words(2)}
+    assert store.restored == 1
+    # Qayta ishga tushgandan keyin ham diskdan tiklanadi
+    store.flush()
+    restarted = SessionStore(CountingStorage(tmp_path))
+    assert restarted.get(2) == {'step': 2}
+    assert restarted.get(3) is None
+
+
+def test_expired_session_not_restored(tmp_path):
+    store = SessionStore(CountingStorage(tmp_path), max_age=0)
+    store[1] = {'step': 1}
+    store.flush()
+    store._sessions.clear()
+    time.sleep(0.01)
+    assert 1 not in store
+
+
+def test_reads_do_not_mark_dirty(tmp_path):
+    store = SessionStore(CountingStorage(tmp_path))
+    store[1] = {'step': 1, 'mode': True}
+    store.flush()
+    assert store.storage.saved == [[1]]
+
+    for _ in range(3):
+        assert store[1]['step'] == 1 and store[1].get('mode')
+        assert 1 in store
+    store.flush()
+    assert store.stats()['dirty'] == 0
+    assert store.storage.saved == [[1]]
+
+    store[1]['step'] += 1
+    store[1].pop('mode')
+    assert store.stats()['dirty'] == 1
+    store.flush()
+    assert store.storage.saved == [[1], [1]]
+    assert SessionStore(CountingStorage(tmp_path))[1] == {'step': 2}
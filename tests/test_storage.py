@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+import pytest
+
+import storage
+from storage import FileStorage, SQLiteStorage, migrate_files_to_sqlite
+
+
+def make_storage(directory):
+    return FileStorage(directory=str(directory))
+
+
+def add_words(store, *words):
+    return store.add_catalog_words([
+        {'word': word, 'translation': f"{word}-tr", 'example': '', 'added_date': f"2024-01-0{n + 1}"}
+        for n, word in enumerate(words)
+    ])
+
+
+def catalog_rows(store):
+    return list(store.load_catalog().records())
+
+
+def user_rows(store, user_id):
+    vocab = store.load_user_vocabulary(user_id)
+    return [vocab.record(i) for i in range(len(vocab))]
+
+
+def test_journal_replayed_after_restart(tmp_path):
+    store = make_storage(tmp_path)
+    ids = [w['id'] for w in add_words(store, 'apple', 'book')]
+    store.update_user_progress(1, ids[0], {'seen_count': 1})
+    store.update_user_progress(1, ids[0], {'seen_count': 2, 'learned': True})
+    store.update_user_progress(2, ids[1], {'deleted': True})
+    store.sync_journal()
+
+    # close() chaqirilmadi - jarayon to'satdan to'xtagandek
+    restarted = make_storage(tmp_path)
+    assert restarted.load_user_overlay(1)['progress'][str(ids[0])] == {'seen_count': 2, 'learned': True}
+    assert restarted.load_user_overlay(2)['progress'][str(ids[1])] == {'deleted': True}
+    assert sorted(restarted.list_users()) == ['1', '2']
+
+
+def test_torn_journal_tail_is_ignored(tmp_path):
+    store = make_storage(tmp_path)
+    word_id = add_words(store, 'apple')[0]['id']
+    store.update_user_progress(1, word_id, {'seen_count': 1})
+    store.sync_journal()
+    with open(store.journal_file, 'a', encoding='utf-8') as f:
+        f.write('{"seq": 99999999999999999999, "user": "1", "id": ')
+
+    restarted = make_storage(tmp_path)
+    assert restarted.load_user_overlay(1)['progress'][str(word_id)] == {'seen_count': 1}
+
+    # Keyingi yozuv uzilgan qator bilan qo'shilib ketmasligi kerak
+    restarted.update_user_progress(1, word_id, {'seen_count': 2})
+    restarted.sync_journal()
+    again = make_storage(tmp_path)
+    assert again.load_user_overlay(1)['progress'][str(word_id)] == {'seen_count': 2}
+
+
+def test_compaction_writes_snapshots_and_clears_journal(tmp_path):
+    store = make_storage(tmp_path)
+    word_id = add_words(store, 'apple')[0]['id']
+    store.update_user_progress(1, word_id, {'seen_count': 3})
+    store.close()
+
+    with open(store.journal_file, encoding='utf-8') as f:
+        assert f.read() == ''
+    with open(store._user_path(1), encoding='utf-8') as f:
+        assert json.load(f)['progress'] == {str(word_id): {'seen_count': 3}}
+    assert make_storage(tmp_path).load_user_overlay(1)['progress'] == {str(word_id): {'seen_count': 3}}
+
+
+def test_crash_during_compaction_keeps_every_change(tmp_path, monkeypatch):
+    store = make_storage(tmp_path)
+    ids = [w['id'] for w in add_words(store, 'apple', 'book')]
+    store.update_user_progress(1, ids[0], {'seen_count': 1})
+    store.update_user_progress(2, ids[1], {'seen_count': 1})
+    # Snapshotdan keyin bekor qilingan o'zgarish: qayta qo'llansa eski qiymat qaytadi
+    store.update_user_progress(1, ids[1], {'deleted': True})
+    store.update_user_progress(1, ids[1], {'deleted': False})
+
+    # Birinchi snapshot yozilgandan keyin jarayon "o'ladi" - jurnal tozalanmay qoladi
+    saved = []
+    original = storage.write_file_atomic
+
+    def crashing_write(path, data):
+        if saved:
+            raise KeyboardInterrupt
+        original(path, data)
+        saved.append(path)
+
+    monkeypatch.setattr(storage, 'write_file_atomic', crashing_write)
+    with pytest.raises(KeyboardInterrupt):
+        store.compact(force=True)
+    monkeypatch.setattr(storage, 'write_file_atomic', original)
+    assert len(saved) == 1
+    with open(store.journal_file, encoding='utf-8') as f:
+        assert len(f.read().splitlines()) == 4
+
+    restarted = make_storage(tmp_path)
+    first = restarted.load_user_overlay(1)['progress']
+    assert first[str(ids[0])] == {'seen_count': 1}
+    assert first[str(ids[1])] == {'deleted': False}
+    assert restarted.load_user_overlay(2)['progress'] == {str(ids[1]): {'seen_count': 1}}
+
+    # Snapshotdagi jurnal nuqtasi tufayli eski yozuvlar yangi o'zgarishni bosib ketmaydi
+    restarted.update_user_progress(1, ids[1], {'deleted': True})
+    restarted.close()
+    final = make_storage(tmp_path)
+    assert final.load_user_overlay(1)['progress'][str(ids[1])] == {'deleted': True}
+    assert final.load_user_overlay(2)['progress'] == {str(ids[1]): {'seen_count': 1}}
+
+
+def test_idle_journal_synced_after_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'JOURNAL_FSYNC_INTERVAL', 0.05)
+    synced = []
+    fsync = storage.os.fsync
+    monkeypatch.setattr(storage.os, 'fsync', lambda fd: (synced.append(fd), fsync(fd)))
+
+    async def scenario():
+        store = make_storage(tmp_path)
+        ids = [w['id'] for w in add_words(store, 'apple')]
+        store.sync_journal()
+        synced.clear()
+        # Oxirgi fsync yaqinda bo'lgan - yozuv kutadi, keyingi yozuv esa kelmaydi
+        store.update_user_progress(1, ids[0], {'seen_count': 1})
+        pending = store._unsynced
+        await asyncio.sleep(0.12)
+        return pending, store._unsynced, store
+
+    pending, unsynced, store = asyncio.run(scenario())
+    assert pending == 1 and unsynced == 0
+    assert len(synced) == 1
+    assert store._sync_timer is None
+
+
+def test_migrate_files_to_sqlite_round_trip(tmp_path):
+    source = make_storage(tmp_path)
+    ids = [w['id'] for w in add_words(source, 'apple', 'book', 'cat')]
+    source.save_user_overlay(1, {
+        'progress': {str(ids[0]): {'seen_count': 2, 'learned': True}},
+        'words': [{'id': -1, 'word': 'olma', 'translation': 'apple', 'example': '',
+                   'added_date': '2024-02-01', 'seen_count': 1}],
+    })
+    # Jurnalda qolgan (snapshotga qo'shilmagan) o'zgarishlar ham ko'chirilishi kerak
+    source.update_user_progress(1, ids[2], {'deleted': True})
+    source.update_user_progress(2, ids[1], {'correct_count': 1, 'last_seen': '2024-03-01T10:00:00'})
+
+    target = SQLiteStorage(str(tmp_path / 'vocabulary.db'))
+    assert migrate_files_to_sqlite(source, target) == (3, 2)
+
+    assert catalog_rows(target) == catalog_rows(source)
+    for user_id in ('1', '2'):
+        assert user_rows(target, user_id) == user_rows(source, user_id)
+
+    # Qayta ishga tushirish katalogni ikki marta ko'chirmaydi
+    assert migrate_files_to_sqlite(source, target)[0] == 0
+    assert len(catalog_rows(target)) == 3
+    target.close()
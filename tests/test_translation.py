@@ -0,0 +1,149 @@
+import asyncio
+
+import httpx
+import pytest
+
+import translation
+from outbox import TokenBucket
+from providers import ProviderError, ProviderRouter
+from translation_cache import TranslationCache
+
+
+def mymemory_body(text, status=200):
+    return {'responseStatus': status, 'responseData': {'translatedText': text}}
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path):
+    """
+    Provayderlar soxta transport orqali: handlers[host] - so'rovga javob funksiyasi
+    """
+    handlers = {}
+    requests = []
+
+    def respond(request):
+        requests.append(request)
+        return handlers[request.url.host](request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+    cache = TranslationCache(path=str(tmp_path / 'cache.db'))
+    router = ProviderRouter([
+        ('google', lambda *args: translation.translate_word_google(*args), TokenBucket(1000, 1000)),
+        ('mymemory', lambda *args: translation.translate_word_my_memory(*args), TokenBucket(1000, 1000)),
+    ])
+    monkeypatch.setattr(translation, '_http_client', client)
+    monkeypatch.setattr(translation, 'translation_cache', cache)
+    monkeypatch.setattr(translation, 'provider_router', router)
+    monkeypatch.setattr(translation, 'lookup_dictionary', lambda word: None)
+    monkeypatch.setattr(translation, 'TRANSLATE_HEDGED', False)
+    yield handlers, requests
+    cache.close()
+
+
+GOOGLE = 'translate.googleapis.com'
+MYMEMORY = 'api.mymemory.translated.net'
+
+
+def test_google_malformed_body_falls_back_to_mymemory(api):
+    handlers, requests = api
+    handlers[GOOGLE] = lambda request: httpx.Response(200, json={'error': 'quota'})
+    handlers[MYMEMORY] = lambda request: httpx.Response(200, json=mymemory_body('daraxt'))
+
+    with pytest.raises(ProviderError):
+        asyncio.run(translation.translate_word_google('tree'))
+    assert asyncio.run(translation.translate_word('tree')) == 'daraxt'
+    assert [request.url.host for request in requests] == [GOOGLE, GOOGLE, MYMEMORY]
+    assert translation.provider_router.health['google'].errors == 1
+
+
+def test_shared_client_is_pooled_and_recreated_after_close(monkeypatch, tmp_path):
+    monkeypatch.setattr(translation, '_http_client', None)
+    monkeypatch.setattr(translation, 'translation_cache', TranslationCache(path=str(tmp_path / 'cache.db')))
+    client = translation.get_http_client()
+    assert translation.get_http_client() is client
+    pool = client._transport._pool
+    assert pool._max_connections == translation.HTTP_MAX_CONNECTIONS
+    assert pool._max_keepalive_connections == translation.HTTP_MAX_KEEPALIVE
+
+    asyncio.run(translation.close_http_client())
+    assert client.is_closed and translation._http_client is None
+    fresh = translation.get_http_client()
+    assert fresh is not client and not fresh.is_closed
+    asyncio.run(translation.close_http_client())
+
+
+def test_requests_reuse_one_client(api):
+    handlers, requests = api
+    handlers[GOOGLE] = lambda request: httpx.Response(200, json=[[[request.url.params['q'][::-1]]]])
+    client = translation._http_client
+
+    async def scenario():
+        return await asyncio.gather(*(translation.translate_word(word) for word in ('one', 'two', 'three')))
+
+    assert asyncio.run(scenario()) == ['eno', 'owt', 'eerht']
+    assert translation._http_client is client
+    assert len(requests) == 3
+
+
+def test_google_http_error_falls_back_to_mymemory(api):
+    handlers, requests = api
+    handlers[GOOGLE] = lambda request: httpx.Response(503, text='unavailable')
+    handlers[MYMEMORY] = lambda request: httpx.Response(200, json=mymemory_body('daryo; soy'))
+
+    assert asyncio.run(translation.translate_word('river')) == 'daryo'
+    assert [request.url.host for request in requests] == [GOOGLE, MYMEMORY]
+    health = translation.provider_router.health
+    assert health['google'].errors == 1 and health['mymemory'].errors == 0
+    assert translation.translation_cache.get('river') == (True, 'daryo')
+
+
+def test_google_timeout_falls_back_to_mymemory(api):
+    handlers, requests = api
+
+    def timeout(request):
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    handlers[GOOGLE] = timeout
+    handlers[MYMEMORY] = lambda request: httpx.Response(200, json=mymemory_body('tog'))
+
+    assert asyncio.run(translation.translate_word('mountain')) == 'tog'
+    assert translation.provider_router.health['google'].errors == 1
+
+
+def test_slow_google_hedged_by_mymemory(api, monkeypatch):
+    handlers, requests = api
+    monkeypatch.setattr(translation, 'TRANSLATE_HEDGED', True)
+    monkeypatch.setattr(translation, 'TRANSLATE_HEDGE_DELAY', 0.02)
+
+    async def slow(request):
+        await asyncio.sleep(1)
+        return httpx.Response(200, json=[[['kech']]])
+
+    handlers[GOOGLE] = slow
+    handlers[MYMEMORY] = lambda request: httpx.Response(200, json=mymemory_body('bulut'))
+
+    assert asyncio.run(translation.translate_word('cloud')) == 'bulut'
+    google = translation.provider_router.health['google']
+    # Bekor qilingan so'rov xato hisoblanmaydi
+    assert google.errors == 0 and google.probing is False
+
+
+def test_all_providers_fail_uses_simple_dict_without_caching(api):
+    handlers, requests = api
+    handlers[GOOGLE] = lambda request: httpx.Response(500)
+    handlers[MYMEMORY] = lambda request: httpx.Response(200, text='<html>not json</html>')
+
+    assert asyncio.run(translation.translate_word('apple')) == 'olma'
+    assert asyncio.run(translation.translate_word('zebra')) is None
+    # Hech bir provayder javob bermadi - "topilmadi" keshlanmaydi
+    assert translation.translation_cache.get('zebra') == (False, None)
+    assert translation.provider_router.health['mymemory'].errors == 2
+
+
+def test_mymemory_quota_warning_is_provider_error(api):
+    handlers, _ = api
+    handlers[MYMEMORY] = lambda request: httpx.Response(
+        200, json=mymemory_body('MYMEMORY WARNING: YOU USED ALL AVAILABLE FREE TRANSLATIONS', status=429))
+
+    with pytest.raises(ProviderError):
+        asyncio.run(translation.translate_word_my_memory('tree'))
@@ -0,0 +1,70 @@
+import time
+
+from translation_cache import TranslationCache
+
+
+def make_cache(tmp_path, **kwargs):
+    return TranslationCache(path=str(tmp_path / 'cache.db'), **kwargs)
+
+
+def test_memory_lru_evicts_oldest(tmp_path):
+    cache = make_cache(tmp_path, max_size=2)
+    cache.set('apple', 'olma')
+    cache.set('book', 'kitob')
+    assert cache.get('apple') == (True, 'olma')  # apple - eng yangi
+    cache.set('cat', 'mushuk')
+    assert list(cache._memory) == [('apple', 'en', 'uz'), ('cat', 'en', 'uz')]
+    assert cache.stats()['memory_hits'] == 1
+
+    # Xotiradan chiqqan yozuv diskdan o'qiladi va yana xotiraga qaytadi
+    assert cache.get('book') == (True, 'kitob')
+    assert cache.stats()['disk_hits'] == 1
+    assert ('book', 'en', 'uz') in cache._memory
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set('Apple', 'olma')
+    cache.set('apple', 'olma', source_lang='en', target_lang='ru')
+    cache.close()
+
+    restarted = make_cache(tmp_path)
+    assert restarted.get('  APPLE ') == (True, 'olma')
+    assert restarted.get('apple', target_lang='ru') == (True, 'olma')
+    assert restarted.get('apple', target_lang='de') == (False, None)
+    assert restarted.stats()['disk_hits'] == 2 and restarted.stats()['misses'] == 1
+    # Xotirada bor kalitlar qayta yuklanmaydi
+    assert restarted.preload() == 0
+    restarted.close()
+    assert make_cache(tmp_path).preload() == 2
+
+
+def test_keys_use_word_index_normalization(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set('O‘zbek', 'uzbek')
+    assert cache.get("o'zbek") == (True, 'uzbek')
+    assert cache.get('Oʻzbek') == (True, 'uzbek')
+
+
+def test_ttl_expiry(tmp_path):
+    cache = make_cache(tmp_path, ttl=0.05)
+    cache.set('apple', 'olma')
+    assert cache.get('apple') == (True, 'olma')
+    time.sleep(0.06)
+    assert cache.get('apple') == (False, None)
+    assert cache._memory == {}
+    assert cache.purge_expired() == 1
+
+
+def test_negative_caching(tmp_path):
+    cache = make_cache(tmp_path, negative_ttl=0.05)
+    cache.set('qwzx', None)
+    assert cache.get('qwzx') == (True, None)
+    cache.close()
+
+    restarted = make_cache(tmp_path, negative_ttl=0.05)
+    assert restarted.get('qwzx') == (True, None)
+    assert restarted.stats()['negative_hits'] == 1
+    # Salbiy natija qisqa muddat saqlanadi
+    time.sleep(0.06)
+    assert restarted.get('qwzx') == (False, None)
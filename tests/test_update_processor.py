@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+
+from update_processor import UserUpdateProcessor, update_key
+
+
+def make_update(user_id):
+    return SimpleNamespace(effective_user=SimpleNamespace(id=user_id), effective_chat=None)
+
+
+def test_update_key():
+    assert update_key(make_update(5)) == 5
+    assert update_key(SimpleNamespace(effective_user=None, effective_chat=SimpleNamespace(id=-1))) == -1
+    assert update_key(object()) is None
+
+
+def test_same_user_serialized_other_users_parallel():
+    async def scenario():
+        processor = UserUpdateProcessor(8)
+        events = []
+        running = {}
+
+        async def handle(user_id, n):
+            running[user_id] = running.get(user_id, 0) + 1
+            events.append((user_id, n, running[user_id], len([v for v in running.values() if v])))
+            await asyncio.sleep(0.01)
+            running[user_id] -= 1
+
+        # Application kabi: har bir update alohida vazifada, kelgan tartibida
+        tasks = [asyncio.create_task(processor.process_update(make_update(user_id), handle(user_id, n)))
+                 for n in range(4) for user_id in (1, 2)]
+        await asyncio.gather(*tasks)
+        return events, processor.stats()
+
+    events, stats = asyncio.run(scenario())
+    for user_id in (1, 2):
+        mine = [event for event in events if event[0] == user_id]
+        assert [n for _, n, _, _ in mine] == [0, 1, 2, 3]
+        assert all(concurrent == 1 for _, _, concurrent, _ in mine)
+    # Ikki foydalanuvchi bir vaqtda ishlagan
+    assert max(users for _, _, _, users in events) == 2
+    assert stats == {'keys': 0, 'waiting': 0, 'running': 0}
+
+
+def test_backlog_of_one_user_does_not_block_others():
+    async def scenario():
+        processor = UserUpdateProcessor(4)
+        finished = {}
+
+        async def handle(name, seconds):
+            await asyncio.sleep(seconds)
+            finished[name] = asyncio.get_running_loop().time()
+
+        started = asyncio.get_running_loop().time()
+        # 1-foydalanuvchining 8 ta update i navbatda, keyin 2-foydalanuvchining bittasi
+        tasks = [asyncio.create_task(processor.process_update(make_update(1), handle(('a', n), 0.05)))
+                 for n in range(8)]
+        await asyncio.sleep(0)
+        busy = processor.stats()
+        tasks.append(asyncio.create_task(processor.process_update(make_update(2), handle('b', 0.01))))
+        await asyncio.gather(*tasks)
+        return finished['b'] - started, finished[('a', 7)] - started, busy
+
+    b_elapsed, a_elapsed, busy = asyncio.run(scenario())
+    # Navbatdagi update lar umumiy limitdan joy olmaydi: ishlayotgani bitta
+    assert busy == {'keys': 1, 'waiting': 7, 'running': 1}
+    assert b_elapsed < 0.04
+    assert a_elapsed >= 0.4
@@ -0,0 +1,76 @@
+import random
+
+from scheduler import QUALITY_CORRECT, QUALITY_WRONG, review
+from storage import FileStorage
+from user_cache import UserVocabularyCache
+
+USERS = (1, 2)
+
+
+def recount(storage, user_id):
+    # To'liq qayta hisoblash: diskdagi snapshot va jurnaldan yangi ko'rinish
+    vocab = storage.load_user_vocabulary(user_id)
+    active = [i for i in range(len(vocab)) if not vocab.deleted[i]]
+    recent = sorted(active, key=lambda i: vocab.added_date(i) or '', reverse=True)[:5]
+    return {
+        'learned': sum(vocab.learned),
+        'active': len(active),
+        'deleted': len(vocab) - len(active),
+        'recent': [vocab.word(i) for i in recent],
+    }
+
+
+def incremental(vocab):
+    return {
+        'learned': vocab.learned_count,
+        'active': vocab.active_count,
+        'deleted': vocab.deleted_count,
+        'recent': [vocab.word(i) for i in vocab.recent_words(5)],
+    }
+
+
+def test_incremental_stats_match_full_recount(tmp_path):
+    random.seed(3)
+    storage = FileStorage(directory=str(tmp_path))
+    cache = UserVocabularyCache(storage)
+    added = 0
+    now = 1700000000.0
+
+    def add(count):
+        nonlocal added
+        storage.add_catalog_words([
+            {'word': f"word{added + n}", 'translation': 't', 'example': '',
+             'added_date': f"2024-01-01T00:{(added + n) // 60:02d}:{(added + n) % 60:02d}"}
+            for n in range(count)
+        ])
+        added += count
+
+    add(40)
+    for step in range(400):
+        user_id = random.choice(USERS)
+        vocab = cache.get(user_id)
+        action = random.random()
+        if action < 0.1:
+            add(random.randint(1, 3))
+        elif action < 0.3:
+            i = random.randrange(len(vocab))
+            cache.update_word(user_id, vocab.word_id(i), {'deleted': not vocab.deleted[i]})
+        elif action < 0.33:
+            storage.delete_catalog_word(vocab.word(random.randrange(len(vocab))))
+        else:
+            i = random.randrange(len(vocab))
+            now += 86400 * random.randint(1, 30)
+            quality = QUALITY_CORRECT if random.random() < 0.8 else QUALITY_WRONG
+            cache.update_word(user_id, vocab.word_id(i), review(vocab, i, quality, now))
+
+        for other in USERS:
+            vocab = cache.get(other)
+            assert incremental(vocab) == recount(storage, other), f"step {step}, user {other}"
+
+    # Tekshiruv faqat foydalanuvchi hisoblagichlariga tegadi - umumiy katalogga emas
+    catalog = storage.load_catalog()
+    ring = list(catalog.recent)
+    for user_id in USERS:
+        assert cache.get(user_id).verify_stats() == []
+    assert list(catalog.recent) == ring
+    assert sum(cache.get(user_id).learned_count for user_id in USERS) > 0
@@ -0,0 +1,64 @@
+import random
+
+from vocab import Catalog, UserVocabulary
+
+
+def make_vocab(size, personal=0):
+    catalog = Catalog()
+    for n in range(size):
+        catalog.append(n + 1, f"word{n}", f"tr{n}", '', f"2024-01-01T00:00:{n % 60:02d}")
+    words = [{'id': -(n + 1), 'word': f"own{n}", 'translation': ''} for n in range(personal)]
+    return UserVocabulary(catalog, words)
+
+
+def assert_pages_match(vocab):
+    active = vocab.active_indices()
+    assert vocab.active_count == len(active)
+    assert [vocab.nth_active(n) for n in range(len(active))] == active
+    assert vocab.nth_active(len(active)) is None
+    assert vocab.nth_active(-1) is None
+
+
+def test_nth_active_matches_scan_under_deletes():
+    random.seed(7)
+    vocab = make_vocab(300, personal=5)
+    assert_pages_match(vocab)
+    for _ in range(200):
+        i = random.randrange(len(vocab))
+        vocab.update(i, {'deleted': not vocab.deleted[i]})
+        n = random.randrange(vocab.active_count + 1)
+        active = vocab.active_indices()
+        assert vocab.nth_active(n) == (active[n] if n < len(active) else None)
+    assert_pages_match(vocab)
+
+
+def test_nth_active_after_catalog_grows():
+    vocab = make_vocab(10)
+    vocab.update(3, {'deleted': True})
+    assert_pages_match(vocab)
+    for n in range(10, 25):
+        vocab.catalog.append(n + 1, f"word{n}", f"tr{n}")
+    assert vocab.sync_catalog(vocab.catalog)
+    vocab.update(20, {'deleted': True})
+    assert_pages_match(vocab)
+
+
+def test_nth_active_all_deleted():
+    vocab = make_vocab(4)
+    for i in range(4):
+        vocab.update(i, {'deleted': True})
+    assert vocab.nth_active(0) is None
+
+
+def test_verify_stats_fixes_user_counters_only():
+    vocab = make_vocab(50)
+    vocab.update(1, {'learned': True})
+    vocab.update(2, {'deleted': True})
+    assert vocab.verify_stats() == []
+
+    ring = list(vocab.catalog.recent)
+    vocab.learned_count += 3
+    vocab.active_count -= 1
+    assert len(vocab.verify_stats()) == 2
+    assert (vocab.learned_count, vocab.active_count) == (1, 49)
+    assert list(vocab.catalog.recent) == ring
@@ -0,0 +1,37 @@
+import importlib
+
+import pytest
+
+import webhook
+
+
+@pytest.fixture(autouse=True)
+def restore_webhook(monkeypatch):
+    yield
+    # Boshqa testlar uchun modul asl muhit bilan qayta yuklanadi
+    monkeypatch.undo()
+    importlib.reload(webhook)
+
+
+def reload_webhook(monkeypatch, **environment):
+    for name in ('WEBHOOK_URL', 'WEBHOOK_SECRET'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in environment.items():
+        monkeypatch.setenv(name, value)
+    return importlib.reload(webhook)
+
+
+def test_secret_generated_for_public_url(monkeypatch):
+    module = reload_webhook(monkeypatch, WEBHOOK_URL='https://example.com')
+    first = module.WEBHOOK_SECRET
+    assert len(first) >= 32
+    # Telegram faqat A-Z, a-z, 0-9, _ va - belgilarini qabul qiladi
+    assert all(c.isalnum() or c in '_-' for c in first)
+    assert reload_webhook(monkeypatch, WEBHOOK_URL='https://example.com').WEBHOOK_SECRET != first
+
+
+def test_configured_secret_kept(monkeypatch):
+    assert reload_webhook(monkeypatch, WEBHOOK_URL='https://example.com',
+                          WEBHOOK_SECRET='abc').WEBHOOK_SECRET == 'abc'
+    # Mahalliy server (tashqi URL siz) - kalit talab qilinmaydi
+    assert reload_webhook(monkeypatch).WEBHOOK_SECRET == ''
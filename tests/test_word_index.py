@@ -0,0 +1,40 @@
+from word_index import FuzzyIndex, edit_distance, normalize_word
+
+KEYS = ['receive', 'apple', 'application', 'book', 'bookshelf', "o'zbek"]
+
+
+def test_suggest_single_typo():
+    index = FuzzyIndex(KEYS)
+    assert index.suggest('recieve') == 'receive'   # almashinuv
+    assert index.suggest('aple') == 'apple'        # tushib qolgan harf
+    assert index.suggest('applle') == 'apple'      # ortiqcha harf
+    assert index.suggest('appla') == 'apple'       # almashtirilgan harf
+
+
+def test_suggest_no_match():
+    index = FuzzyIndex(KEYS)
+    assert index.suggest('apple') is None          # aniq moslik
+    assert index.suggest('orange') is None
+    assert index.suggest('aplpe x') is None
+    assert index.suggest('bok') is None            # juda qisqa
+
+
+def test_suggest_normalizes_input():
+    index = FuzzyIndex(KEYS)
+    assert index.suggest('  RECIEVE ') == 'receive'
+    assert index.suggest('oʻzbekk') == "o'zbek"
+
+
+def test_add_and_short_keys():
+    index = FuzzyIndex()
+    index.add('cat')
+    assert index.candidates('cat') == set()
+    index.add('house')
+    assert index.suggest('hous') == 'house'
+
+
+def test_edit_distance():
+    assert edit_distance('receive', 'recieve') == 1
+    assert edit_distance('apple', 'apple') == 0
+    assert edit_distance('apple', 'orange', limit=2) == 3
+    assert normalize_word(' O‘zbek  Tili ') == "o'zbek tili"
@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+import httpx
+
+from workers import Dispatcher, update_user_id
+
+
+def test_update_user_id():
+    assert update_user_id({'update_id': 1, 'message': {'from': {'id': 42}, 'chat': {'id': 7}}}) == 42
+    assert update_user_id({'update_id': 2, 'callback_query': {'from': {'id': 5}}}) == 5
+    assert update_user_id({'update_id': 3, 'my_chat_member': {'chat': {'id': -100}}}) == -100
+    assert update_user_id({'update_id': 4}) == 0
+
+
+def test_forward_counts_rejected_separately():
+    statuses = {1: [200], 2: [403], 3: [502, 503, 200]}
+
+    def respond(request):
+        return httpx.Response(statuses[json.loads(request.content)['update_id']].pop(0))
+
+    async def scenario():
+        dispatcher = Dispatcher('token', 'http://api/bot', count=1)
+        dispatcher.client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+        forwarder = asyncio.create_task(dispatcher.forward(0))
+        for update_id in statuses:
+            await dispatcher.dispatch({'update_id': update_id, 'message': {'from': {'id': 1}}})
+        await asyncio.wait_for(dispatcher.queues[0].join(), 5)
+        forwarder.cancel()
+        await dispatcher.client.aclose()
+        return dispatcher
+
+    dispatcher = asyncio.run(scenario())
+    # 5xx qayta yuboriladi, 4xx - yo'q, lekin muvaffaqiyat deb ham hisoblanmaydi
+    assert (dispatcher.forwarded, dispatcher.rejected, dispatcher.lost) == (2, 1, 0)
+    assert all(not remaining for remaining in statuses.values())